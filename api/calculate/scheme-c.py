@@ -1,43 +1,16 @@
 from http.server import BaseHTTPRequestHandler
-import json
 import sys
 import os
 
 # 添加后端模块路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'ies_backend'))
 
-from app.models import SchemeCRequest
-from app.core.solver import SchemeCSolver
+# 冷启动只加载标准库与轻量校验，求解器在首个请求时导入 (见 app/serverless.py)
+from app.serverless import compute_scheme_c, handle_post, send_preflight
 
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
-        content_length = int(self.headers.get('Content-Length', 0))
-        body = self.rfile.read(content_length)
-        
-        try:
-            data = json.loads(body.decode('utf-8'))
-            req = SchemeCRequest(**data)
-            
-            solver = SchemeCSolver()
-            result = solver.solve(req)
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(result).encode())
-            
-        except Exception as e:
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": str(e)}).encode())
+        handle_post(self, compute_scheme_c)
     
     def do_OPTIONS(self):
-        """处理 CORS 预检请求"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        send_preflight(self)
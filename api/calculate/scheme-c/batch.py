@@ -0,0 +1,16 @@
+from http.server import BaseHTTPRequestHandler
+import sys
+import os
+
+# 添加后端模块路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'ies_backend'))
+
+# 冷启动只加载标准库与轻量校验，求解器在首个请求时导入 (见 app/serverless.py)
+from app.serverless import handle_batch_post, send_preflight
+
+class handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        handle_batch_post(self)
+    
+    def do_OPTIONS(self):
+        send_preflight(self)
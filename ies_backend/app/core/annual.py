@@ -0,0 +1,159 @@
+# app/core/annual.py
+# 全年 8760 小时运行模拟：逐时读入烟气 / 负荷时序数据 (CSV 或 NDJSON)，
+# 每个时刻以上一时刻的排烟温度为初始猜测热启动求解，逐时输出结果并累计年度指标
+# 流式处理：只保留上一时刻的解与累计量，内存与时序长度无关
+
+import csv
+import json
+
+from app.core.solver import SchemeCSolver, SolverState
+from app.validation import RequestValidationError, validate_scheme_c
+
+class RowDecoder:
+    """
+    时序数据逐行解码 -> dict
+    fmt="csv": 首个非空行为表头，空单元格视为未给出 (沿用基准参数)
+    fmt="ndjson": 每行一个 JSON 对象
+    """
+    def __init__(self, fmt="ndjson"):
+        if fmt not in ("csv", "ndjson"):
+            raise ValueError(f"不支持的时序格式: {fmt} (可选: csv, ndjson)")
+        self.fmt = fmt
+        self.header = None
+
+    def decode(self, line):
+        """
+        返回 dict；空行与 CSV 表头返回 None
+        """
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.strip():
+            return None
+        if self.fmt == "ndjson":
+            return json.loads(line)
+        values = next(csv.reader([line]))
+        if self.header is None:
+            self.header = [name.strip() for name in values]
+            return None
+        return {name: value for name, value in zip(self.header, values) if value.strip() != ""}
+
+class AnnualAggregates:
+    """
+    年度累计指标 (逐时累加，step_hours 为每个时间步的小时数)
+    """
+    def __init__(self, step_hours=1.0):
+        self.step_hours = step_hours
+        self.hours = 0
+        self.converged_hours = 0
+        self.source_limited_hours = 0
+        self.error_hours = 0
+        self.recovered_heat_kwh = 0.0
+        self.delivered_heat_kwh = 0.0
+        self.condensed_water_kg = 0.0
+        self.peak_load_kw = 0.0
+        self.iterations_total = 0
+        self.warm_started_hours = 0
+
+    def add(self, record):
+        self.hours += 1
+        if "error" in record:
+            self.error_hours += 1
+            return
+        result = record["result"]
+        if "is_source_limited" not in result:
+            self.converged_hours += 1
+        elif result["is_source_limited"]:
+            self.source_limited_hours += 1
+        self.recovered_heat_kwh += result["source_total_kw"] * self.step_hours
+        self.delivered_heat_kwh += record["delivered_kw"] * self.step_hours
+        self.condensed_water_kg += record["condensed_water_kg_h"] * self.step_hours
+        self.peak_load_kw = max(self.peak_load_kw, record["delivered_kw"])
+        self.iterations_total += result["iterations"]
+        self.warm_started_hours += record["warm_start"]
+
+    def snapshot(self) -> dict:
+        solved = self.hours - self.error_hours
+        return {
+            "hours": self.hours,
+            "converged_hours": self.converged_hours,
+            "source_limited_hours": self.source_limited_hours,
+            "error_hours": self.error_hours,
+            "recovered_heat_mwh": round(self.recovered_heat_kwh / 1000.0, 3),
+            "delivered_heat_mwh": round(self.delivered_heat_kwh / 1000.0, 3),
+            "condensed_water_t": round(self.condensed_water_kg / 1000.0, 3),
+            "peak_load_kw": round(self.peak_load_kw, 1),
+            "iterations_mean": round(self.iterations_total / solved, 3) if solved else 0.0,
+            "warm_started_hours": self.warm_started_hours,
+        }
+
+class AnnualSimulation:
+    def __init__(self, base=None, solver=None, warm_start=True, step_hours=1.0):
+        """
+        base: 各时刻共用的 SchemeCRequest 字段 (时序行中的同名字段覆盖之)
+        warm_start: 以上一时刻收敛的排烟温度与残差斜率热启动 (SolverState)
+        step_hours: 每行代表的小时数 (累计能量 / 析水量用)
+        """
+        self.base = dict(base or {})
+        self.solver = solver or SchemeCSolver()
+        self.warm_start = warm_start
+        self.aggregates = AnnualAggregates(step_hours)
+        self.state = SolverState()
+
+    def step(self, hour, row) -> dict:
+        """
+        求解一个时刻，返回逐时记录并计入累计量
+        {"hour", "timestamp"?, "result", "delivered_kw", "condensed_water_kg_h", "warm_start"} 或 {"hour", "error"}
+        """
+        record = {"hour": hour}
+        if "timestamp" in row:
+            record["timestamp"] = row["timestamp"]
+        try:
+            req = validate_scheme_c({**self.base, **row})
+            warm = self.warm_start and self.state.t_source_out is not None
+            result = self.solver.solve(req, state=self.state if self.warm_start else None)
+        except RequestValidationError as e:
+            record.update({"error": "请求参数无效", "detail": e.errors})
+        except Exception as e:
+            record["error"] = str(e)
+
+        if "error" in record:
+            self.state.reset()
+            self.aggregates.add(record)
+            return record
+
+        if "is_source_limited" in result:
+            # 热源不足：按实际出水温度计算供热量 (与求解器反算出水温度的比热一致)
+            delivered_kw = req.sink_flow_kg_h * 4.187 * (result["actual_sink_out"] - req.sink_in_temp) / 3600.0
+            water = result.get("water_condensation")
+        else:
+            delivered_kw = result["target_load_kw"]
+            # 收敛结果本身不含析水量，此处按求得的排烟温度补算
+            water = self.solver.calculate_condensation(req, result["required_source_out"])
+
+        record.update({
+            "result": result,
+            "delivered_kw": round(delivered_kw, 1),
+            "condensed_water_kg_h": water["condensed_water"] if water else 0.0,
+            "warm_start": warm,
+        })
+        self.aggregates.add(record)
+        return record
+
+    def reject(self, message) -> dict:
+        """
+        记录一个无法解析的时刻 (计为错误小时，下一时刻冷启动)
+        """
+        record = {"hour": self.aggregates.hours, "error": message}
+        self.state.reset()
+        self.aggregates.add(record)
+        return record
+
+    def run(self, rows):
+        """
+        生成器：逐时返回记录；累计量见 self.aggregates.snapshot()
+        """
+        for hour, row in enumerate(rows):
+            yield self.step(hour, row)
+
+    def summary(self) -> dict:
+        return self.aggregates.snapshot()
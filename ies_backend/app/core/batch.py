@@ -0,0 +1,322 @@
+# app/core/batch.py
+# 方案C 批量求解器：N 个请求按列 (NumPy 数组) 传入，逐通道同时求根
+# 结果与 SchemeCSolver.solve 逐个求解在容差 (tolerance) 内一致
+
+import time
+
+import numpy as np
+
+from app.core import vectorized as vec
+from app.core.fuels import fuel_ids, fuel_table
+from app.core.telemetry import ITERATION_BUCKETS, SOLVER_TELEMETRY, WALL_TIME_BUCKETS
+from app.validation import REQUIRED, SCHEME_C_FIELDS
+
+# 列定义: 字段名 -> 默认值 (与 SchemeCRequest 一致，None 表示必填)
+SCHEME_C_COLUMNS = {
+    name: (None if default is REQUIRED else default) for name, _, default in SCHEME_C_FIELDS
+}
+
+_STRING_COLUMNS = ("mode", "strategy", "fuel_type", "recovery_type")
+
+def columns_from_requests(requests):
+    """
+    将 SchemeCRequest (或同字段的 dict) 列表转换为列字典
+    """
+    columns = {name: [] for name in SCHEME_C_COLUMNS}
+    for req in requests:
+        for name, default in SCHEME_C_COLUMNS.items():
+            if isinstance(req, dict):
+                value = req.get(name, default)
+            else:
+                value = getattr(req, name, default)
+            columns[name].append(value)
+    return columns
+
+def to_records(result):
+    """
+    将批量结果列还原为与 SchemeCSolver.solve 相同结构的 dict 列表
+    (收敛通道不含 actual_sink_out / is_source_limited / water_condensation)
+    """
+    records = []
+    for i in range(len(result["converged"])):
+        record = {
+            "status": "converged",
+            "iterations": int(result["iterations"][i]),
+            "residual": round(float(result["residual"][i]), 3),
+            "method": result["method"],
+            "target_load_kw": float(result["target_load_kw"][i]),
+            "required_source_out": float(result["required_source_out"][i]),
+            "final_cop": float(result["final_cop"][i]),
+            "source_total_kw": float(result["source_total_kw"][i]),
+        }
+        if not result["converged"][i]:
+            record["actual_sink_out"] = float(result["actual_sink_out"][i])
+            record["is_source_limited"] = bool(result["is_source_limited"][i])
+            if not np.isnan(result["condensed_water"][i]):
+                record["water_condensation"] = {
+                    "condensed_water": float(result["condensed_water"][i]),
+                    "initial_water": float(result["initial_water"][i]),
+                    "final_water": float(result["final_water"][i]),
+                }
+        records.append(record)
+    return records
+
+def _fuel_arrays(fuel_type):
+    """
+    燃料列 (燃料名或整数 ID) -> (ID, 露点基准, 单位烟气潜热, 固定 H2O 体积分数, 是否计算析水)
+    物性取自编译后的燃料注册表 (app.core.fuels)，未知燃料与标量版一致
+    按组成计算 H2O 分数的燃料 (如天然气)，固定分数以 NaN 标记
+    """
+    ids = fuel_ids(fuel_type)
+    table = fuel_table()
+    return ids, table["dew_point_ref"][ids], table["latent_per_m3"][ids], table["h2o_vol_percent"][ids], \
+        table["condensing"][ids]
+
+class BatchSchemeCSolver:
+    def __init__(self, tolerance=0.5, max_iter=1000, xtol=1e-6, telemetry=None):
+        self.tolerance = tolerance
+        self.max_iter = max_iter
+        self.xtol = xtol
+        # 遥测 (默认进程级实例)：每个通道按一次求解计数，耗时取整批耗时按通道均摊
+        self.telemetry = telemetry or SOLVER_TELEMETRY
+
+    def _prepare(self, columns):
+        """
+        列字典 -> 定长 NumPy 数组 (标量自动广播，缺省列取默认值)
+        """
+        n = None
+        for name in SCHEME_C_COLUMNS:
+            value = columns.get(name)
+            if value is not None and np.ndim(value) > 0:
+                n = len(value)
+                break
+        if n is None:
+            raise ValueError("批量求解至少需要一列数组输入")
+
+        cols = {}
+        for name, default in SCHEME_C_COLUMNS.items():
+            value = columns.get(name, default)
+            if value is None:
+                raise ValueError(f"缺少必填列: {name}")
+            if name == "fuel_type" and np.asarray(value).dtype.kind in "iu":
+                # 燃料列也可直接传整数 ID (见 app.core.fuels)
+                arr = np.asarray(value, dtype=np.intp)
+            elif name in _STRING_COLUMNS:
+                arr = np.asarray(value, dtype=object)
+            elif name == "is_manual_cop":
+                arr = np.asarray(value, dtype=bool)
+            else:
+                arr = np.asarray(value, dtype=float)
+            if arr.ndim == 0:
+                arr = np.full(n, arr.item(), dtype=arr.dtype)
+            if arr.shape != (n,):
+                raise ValueError(f"列 {name} 长度为 {arr.shape}，应为 ({n},)")
+            cols[name] = arr
+        return cols
+
+    def solve(self, columns, full_condensation=False):
+        """
+        批量求解方案C
+        columns: 字段名 -> 数组或标量 (见 SCHEME_C_COLUMNS)
+        full_condensation: 为 True 时，收敛通道也计算析水量 (标量版收敛结果不含析水)
+        返回: 字段名 -> 数组 (不存在的字段以 NaN 填充)
+        """
+        start = time.perf_counter()
+        c = self._prepare(columns)
+        n = len(c["sink_in_temp"])
+
+        is_steam = c["mode"] == 'STEAM'
+        is_gen = c["strategy"] == 'STRATEGY_GEN'
+        is_absorption = c["recovery_type"] == 'ABSORPTION_HP'
+        manual = np.logical_and(c["is_manual_cop"], c["manual_cop"] > 0)
+        fuel, dew_ref, latent_per_m3, h2o_fixed, has_condensation = _fuel_arrays(c["fuel_type"])
+
+        # 目标负荷 (蒸汽预热模式限制 98°C)
+        effective_sink_target = np.where(is_steam, np.minimum(c["sink_out_target"], 98.0), c["sink_out_target"])
+        h_in = vec.enthalpy(c["sink_in_temp"], False)
+        h_out = vec.enthalpy(effective_sink_target, is_steam)
+        q_sink_target_kw = (c["sink_flow_kg_h"] * (h_out - h_in)) / 3600.0
+
+        # 供热计算使用默认过量空气系数 1.2 的露点 (与标量版一致)
+        heat_dew_point = vec.adjusted_dew_point(dew_ref, 1.2)
+        t_cond = effective_sink_target + 5.0
+
+        def balance(idx, t_out):
+            if manual.all():
+                cop = c["manual_cop"][idx]
+            else:
+                cycle_cop, _, _ = vec.cop(
+                    t_out - 5.0, t_cond[idx], c["efficiency"][idx],
+                    is_steam[idx], is_gen[idx], is_absorption[idx]
+                )
+                cop = np.where(manual[idx], c["manual_cop"][idx], cycle_cop)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cop_factor = np.where(cop > 1.0, (cop - 1) / cop, 0.0)
+            needed = q_sink_target_kw[idx] * cop_factor
+            avail = vec.flue_heat_release(
+                c["source_in_temp"][idx], t_out, c["source_flow_vol"][idx],
+                heat_dew_point[idx], latent_per_m3[idx]
+            )
+            return cop, avail, needed
+
+        def residual(idx, t_out):
+            _, avail, needed = balance(idx, t_out)
+            return avail - needed
+
+        lo = np.maximum(5.0, c["source_out_target"])
+        hi = c["source_in_temp"]
+        root, fx, iterations, converged, bracketed = self._find_roots(residual, lo, hi)
+
+        # === 收敛通道 ===
+        t_final = np.where(converged, root, lo)
+        all_idx = np.arange(n)
+        cop, avail, _ = balance(all_idx, t_final)
+
+        # === 未收敛通道：按用户指定排烟温度 (下限 5°C) 计算 ===
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cop_factor = np.where(cop > 1.0, (cop - 1) / cop, 0.0)
+            max_load_kw = np.where(cop_factor > 0, avail / cop_factor, 0.0)
+            actual_delta_t = (max_load_kw * 3600.0) / (c["sink_flow_kg_h"] * 4.187)
+        has_load = np.logical_and(max_load_kw > 0, c["sink_flow_kg_h"] > 0)
+        actual_sink_out = np.where(
+            has_load,
+            np.minimum(c["sink_in_temp"] + actual_delta_t, effective_sink_target),
+            effective_sink_target
+        )
+        is_source_limited = max_load_kw < q_sink_target_kw * 0.95
+
+        # === 水分析出 ===
+        wants_water = np.logical_and(has_condensation, np.logical_or(~converged, full_condensation))
+        excess_air = c["excess_air"]
+        condensation_dew_point = vec.adjusted_dew_point(dew_ref, excess_air)
+        # 按烟气组成计算 H2O 分数 (理论烟气 + 过量空气，见 app.core.fuels.derive)
+        table = fuel_table()
+        co2, h2o, n2 = table["co2"][fuel], table["h2o"][fuel], table["n2"][fuel]
+        total_vol = co2 + h2o + n2 + (excess_air - 1.0) * table["excess_o2"][fuel] + (excess_air - 1.0) * table["excess_n2"][fuel]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            h2o_vol_percent = np.where(np.isnan(h2o_fixed), (h2o / total_vol) * 100, h2o_fixed)
+        condensed, initial, final = vec.water_condensation(
+            c["source_in_temp"], t_final, c["source_flow_vol"], h2o_vol_percent, condensation_dew_point
+        )
+        # 大气压力修正 (析出量 > 0 时)
+        pressure_ratio = vec.atmospheric_pressure(c["altitude"]) / 101.325
+        condensed = np.where(condensed > 0, np.round(condensed * (1.0 + (pressure_ratio - 1.0) * 0.02), 2), condensed)
+
+        source_limited = np.logical_and(~converged, is_source_limited)
+        self._record(iterations, converged, bracketed, source_limited, time.perf_counter() - start)
+
+        nan = np.full(n, np.nan)
+        return {
+            "converged": converged,
+            "iterations": iterations,
+            "residual": fx,
+            "method": "illinois",
+            "target_load_kw": np.where(converged, np.round(q_sink_target_kw, 1), np.round(max_load_kw, 1)),
+            "required_source_out": np.round(t_final, 2),
+            "final_cop": cop,
+            "source_total_kw": np.round(avail, 1),
+            "actual_sink_out": np.where(converged, nan, np.round(actual_sink_out, 1)),
+            "is_source_limited": source_limited,
+            "condensed_water": np.where(wants_water, condensed, nan),
+            "initial_water": np.where(wants_water, initial, nan),
+            "final_water": np.where(wants_water, final, nan),
+        }
+
+    def _record(self, iterations, converged, bracketed, source_limited, wall_time):
+        """
+        按通道汇总本批求解统计，一次并入遥测 (与逐个 SchemeCSolver.solve 的计数口径一致)
+        """
+        n = len(iterations)
+        if not n:
+            return
+        fallback = ~converged
+        per_lane = wall_time / n
+        wall_time_buckets = [0] * (len(WALL_TIME_BUCKETS) + 1)
+        wall_time_buckets[int(np.searchsorted(WALL_TIME_BUCKETS, per_lane, side="left"))] = n
+        self.telemetry.merge({
+            "solves": n,
+            "converged": int(converged.sum()),
+            "fallback": int(fallback.sum()),
+            "fallback_no_root": int(np.logical_and(fallback, ~bracketed).sum()),
+            "source_limited": int(source_limited.sum()),
+            "iterations_total": int(iterations.sum()),
+            "iterations_max": int(iterations.max()),
+            "wall_time_total": wall_time,
+            "wall_time_max": per_lane,
+            "iterations_buckets": np.bincount(np.searchsorted(ITERATION_BUCKETS, iterations, side="left"),
+                                              minlength=len(ITERATION_BUCKETS) + 1).tolist(),
+            "wall_time_buckets": wall_time_buckets,
+        })
+
+    def _find_roots(self, residual, lo, hi):
+        """
+        逐通道 Illinois 法 (与 rootfind.illinois 判据一致)
+        residual(idx, x) 只对活动通道 idx 求值
+        返回 (root, residual, iterations, converged, bracketed)
+        bracketed: 端点处已收敛或端点异号 (区间内有根)；为 False 的未收敛通道即快速失败
+        """
+        n = len(lo)
+        tol = self.tolerance
+        all_idx = np.arange(n)
+
+        root = lo.copy()
+        fx = residual(all_idx, lo)
+        iterations = np.ones(n, dtype=np.int32)
+        converged = np.abs(fx) < tol
+        bracketed = converged.copy()
+
+        # 上端点
+        idx = np.nonzero(np.logical_and(~converged, hi > lo))[0]
+        f_hi = residual(idx, hi[idx])
+        iterations[idx] += 1
+        hit = np.abs(f_hi) < tol
+        root[idx[hit]] = hi[idx[hit]]
+        fx[idx[hit]] = f_hi[hit]
+        converged[idx[hit]] = True
+
+        # 端点同号：无根，快速失败 (保留残差较小的端点)
+        f_lo_sel = fx[idx]
+        same_sign = np.logical_and(~hit, (f_lo_sel > 0) == (f_hi > 0))
+        bracketed[idx[~same_sign]] = True
+        better_hi = np.logical_and(same_sign, np.abs(f_hi) < np.abs(f_lo_sel))
+        root[idx[better_hi]] = hi[idx[better_hi]]
+        fx[idx[better_hi]] = f_hi[better_hi]
+
+        keep = np.logical_and(~hit, ~same_sign)
+        idx = idx[keep]
+        a, fa = lo[idx].copy(), f_lo_sel[keep].copy()
+        b, fb = hi[idx].copy(), f_hi[keep].copy()
+        side = np.zeros(len(idx), dtype=np.int8)
+
+        while len(idx) and iterations[idx[0]] < self.max_iter:
+            # 区间已收缩仍未满足容差 (残差间断)：失败
+            collapsed = np.abs(b - a) <= self.xtol
+            if collapsed.any():
+                live = ~collapsed
+                idx, a, fa, b, fb, side = idx[live], a[live], fa[live], b[live], fb[live], side[live]
+                if not len(idx):
+                    break
+
+            x = (a * fb - b * fa) / (fb - fa)
+            fxi = residual(idx, x)
+            iterations[idx] += 1
+            root[idx] = x
+            fx[idx] = fxi
+
+            done = np.abs(fxi) < tol
+            converged[idx[done]] = True
+
+            same_as_b = (fxi > 0) == (fb > 0)
+            # 与 b 同号: 替换 b，若连续两次则 fa 减半
+            fa = np.where(np.logical_and(same_as_b, side == -1), fa * 0.5, fa)
+            fb = np.where(np.logical_and(~same_as_b, side == 1), fb * 0.5, fb)
+            b = np.where(same_as_b, x, b)
+            fb = np.where(same_as_b, fxi, fb)
+            a = np.where(same_as_b, a, x)
+            fa = np.where(same_as_b, fa, fxi)
+            side = np.where(same_as_b, -1, 1).astype(np.int8)
+
+            live = ~done
+            idx, a, fa, b, fb, side = idx[live], a[live], fa[live], b[live], fb[live], side[live]
+
+        return root, fx, iterations, converged, bracketed
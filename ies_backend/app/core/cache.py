@@ -0,0 +1,216 @@
+# app/core/cache.py
+# 结果缓存：LRU + TTL，键为请求字段的规范化 (可量化) 哈希，可选 SQLite 磁盘持久化
+# 磁盘层按条目数封顶 (最早写入的先删)，过期条目与超出上限的条目在启动时及每写入 disk_maxsize / 16 条时清理
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.cycles import calculate_cop
+from app.core.solver import SchemeCSolver
+from app.core.steam import PROPERTY_MODEL
+
+def request_fields(req) -> dict:
+    """
+    请求对象 -> 字段字典 (兼容 pydantic 模型、dict 与普通对象)
+    """
+    if isinstance(req, dict):
+        return dict(req)
+    if hasattr(req, "model_dump"):
+        return req.model_dump()
+    return dict(vars(req))
+
+class ResultCache:
+    def __init__(self, maxsize=4096, ttl=None, quantum=None, path=None, disk_maxsize=100_000):
+        """
+        maxsize: 内存中最多保留的条目数 (LRU 淘汰)
+        ttl: 条目有效期 (秒)，None 表示不过期
+        quantum: 浮点字段量化步长，float 或 {字段名: 步长}；None 表示按原值精确匹配
+        path: SQLite 文件路径，设置后条目写入磁盘，重启后仍可命中
+        disk_maxsize: 磁盘中最多保留的条目数 (超出时删除最早写入的条目，清理间隔内最多超出约 1/16)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.quantum = quantum
+        self.path = path
+        self.disk_maxsize = disk_maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (created, json 文本)
+        self._db = None
+        self._prune_every = max(1, disk_maxsize // 16)
+        self._writes = 0
+        self.hits = self.misses = self.evictions = self.expirations = self.disk_hits = self.disk_evictions = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache (key TEXT PRIMARY KEY, created REAL, value TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS result_cache_created ON result_cache (created)")
+            self._prune()
+            self._db.commit()
+
+    def _quantize(self, name, value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return value
+        value = float(value)  # 20 与 20.0 视为同一键
+        if self.quantum is None:
+            return value
+        step = self.quantum.get(name) if isinstance(self.quantum, dict) else self.quantum
+        if not step:
+            return value
+        return round(value / step) * step
+
+    def make_key(self, namespace, fields, config=None) -> str:
+        """
+        规范化键: 命名空间 + 排序后的 (量化) 字段 + 求解器配置
+        """
+        canonical = {name: self._quantize(name, value) for name, value in fields.items()}
+        text = json.dumps([namespace, canonical, config], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _expired(self, created, now):
+        return self.ttl is not None and now - created > self.ttl
+
+    def get(self, key):
+        """
+        命中返回结果副本，未命中返回 None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry[0], now):
+                    del self._entries[key]
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(entry[1])
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT created, value FROM result_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[0], now):
+                    self._store(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return json.loads(row[1])
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        text = json.dumps(value, separators=(",", ":"))
+        created = time.time()
+        with self._lock:
+            self._store(key, created, text)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO result_cache (key, created, value) VALUES (?, ?, ?)",
+                    (key, created, text),
+                )
+                self._writes += 1
+                if self._writes % self._prune_every == 0:
+                    self._prune()
+                self._db.commit()
+
+    def _prune(self):
+        """
+        删除磁盘中的过期条目与超出 disk_maxsize 的最早条目 (调用方持有锁并提交)
+        """
+        if self.ttl:
+            self._db.execute("DELETE FROM result_cache WHERE created < ?", (time.time() - self.ttl,))
+        # 第 disk_maxsize 新的条目之前写入的全部删除 (按 created 索引，不做全表计数)
+        cursor = self._db.execute(
+            "DELETE FROM result_cache WHERE created < "
+            "(SELECT created FROM result_cache ORDER BY created DESC LIMIT 1 OFFSET ?)",
+            (self.disk_maxsize - 1,),
+        )
+        self.disk_evictions += max(cursor.rowcount, 0)
+
+    def _store(self, key, created, text):
+        self._entries[key] = (created, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM result_cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "quantum": self.quantum,
+                "disk_path": self.path,
+                "disk_maxsize": self.disk_maxsize if self.path else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "disk_evictions": self.disk_evictions,
+            }
+
+class CachedSchemeCSolver:
+    """
+    带缓存的 SchemeCSolver (接口与 solve 相同)
+    trace=True 的请求需要真实迭代轨迹，不走缓存
+    """
+    def __init__(self, cache, solver=None):
+        self.cache = cache
+        self.solver = solver or SchemeCSolver()
+        self._config = {
+            "tolerance": self.solver.tolerance,
+            "max_iter": self.solver.max_iter,
+            "method": self.solver.method,
+            "properties": PROPERTY_MODEL,  # 物性模型变更后旧的持久化结果不再命中
+        }
+
+    def key(self, req, sensitivities=False) -> str:
+        # 含灵敏度的结果单独缓存
+        namespace = "scheme_c_sensitivities" if sensitivities else "scheme_c"
+        return self.cache.make_key(namespace, request_fields(req), self._config)
+
+    def solve(self, req, trace=False, sensitivities=False):
+        if trace:
+            return self.solver.solve(req, trace=True, sensitivities=sensitivities)
+        key = self.key(req, sensitivities)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.solver.solve(req, sensitivities=sensitivities)
+            self.cache.put(key, result)
+        return result
+
+def cop_fields(evap_temp, cond_temp, efficiency, mode, strategy, recovery_type="MVR") -> dict:
+    """
+    calculate_cop 的参数 (缓存键 "cop" 命名空间的字段)
+    """
+    return {
+        "evap_temp": evap_temp, "cond_temp": cond_temp, "efficiency": efficiency,
+        "mode": mode, "strategy": strategy, "recovery_type": recovery_type,
+    }
+
+def cached_calculate_cop(cache, evap_temp, cond_temp, efficiency, mode, strategy, recovery_type="MVR"):
+    """
+    带缓存的 calculate_cop
+    """
+    fields = cop_fields(evap_temp, cond_temp, efficiency, mode, strategy, recovery_type)
+    key = cache.make_key("cop", fields)
+    result = cache.get(key)
+    if result is None:
+        result = calculate_cop(**fields)
+        cache.put(key, result)
+    return result
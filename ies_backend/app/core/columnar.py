@@ -0,0 +1,337 @@
+# app/core/columnar.py
+# 方案C 结果的列式容器与二进制文件格式
+# 逐条 dict (含嵌套的 water_condensation) 在百万条规模下占用数 GB 内存、JSON 编解码也慢；
+# 列式容器每个字段一个定长类型数组 (约 100 字节 / 条)，可直接写成二进制文件并以内存映射零拷贝读取
+#
+# 二进制格式 (小端):
+#   [0:8)    魔数 b"IESCOL\0\1"
+#   [8:16)   头部长度 (uint64)
+#   [16:..)  头部 JSON: {"version", "rows", "columns": [{"name", "dtype", "offset", "categories"?}], "meta"}
+#   数据区    从 16 + 头部长度 按 64 字节对齐处开始，各列连续存放 (offset 相对数据区，同样 64 字节对齐)
+# 字符串列 (method / error) 以 int32 编码存储 (-1 为空)，取值表在头部 categories 中
+# 状态码 (status): 0 收敛、1 热源限制、2 未收敛 (非热源限制)、3 出错
+
+import json
+import os
+import tempfile
+
+import numpy as np
+
+MAGIC = b"IESCOL\x00\x01"
+ALIGN = 64
+
+STATUS_CONVERGED, STATUS_SOURCE_LIMITED, STATUS_NOT_CONVERGED, STATUS_ERROR = range(4)
+STATUS_NAMES = ("converged", "source_limited", "not_converged", "error")
+
+# 列名 -> 存储类型 (按此顺序写入)
+RESULT_COLUMNS = {
+    "index": "<i8",
+    "status": "|u1",
+    "iterations": "<i4",
+    "residual": "<f8",
+    "method": "<i4",
+    "target_load_kw": "<f8",
+    "required_source_out": "<f8",
+    "final_cop": "<f8",
+    "source_total_kw": "<f8",
+    "actual_sink_out": "<f8",
+    "is_source_limited": "|b1",
+    "condensed_water": "<f8",
+    "initial_water": "<f8",
+    "final_water": "<f8",
+    "error": "<i4",
+}
+CATEGORICAL_COLUMNS = ("method", "error")
+_WATER_FIELDS = ("condensed_water", "initial_water", "final_water")
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+class _Encoder:
+    """
+    记录 / 批量结果 -> 各列数组 (字符串列的取值表在多次调用间共享)
+    """
+    def __init__(self):
+        self.categories = {name: {} for name in CATEGORICAL_COLUMNS}
+
+    def _code(self, name, value):
+        if value is None:
+            return -1
+        table = self.categories[name]
+        code = table.get(value)
+        if code is None:
+            code = table[value] = len(table)
+        return code
+
+    def records(self, records, start=0) -> dict:
+        """
+        records: SchemeCSolver.solve 的结果 dict，或批量 / 研究接口的 {"index", "result"} | {"index", "error"}
+        """
+        n = len(records)
+        cols = {name: np.zeros(n, dtype=dtype) for name, dtype in RESULT_COLUMNS.items()}
+        for name in RESULT_COLUMNS:
+            if cols[name].dtype.kind == "f":
+                cols[name][:] = np.nan
+        cols["method"][:] = -1
+        cols["error"][:] = -1
+        for k, record in enumerate(records):
+            if "result" in record or "error" in record:
+                cols["index"][k] = record.get("index", start + k)
+                if "error" in record:
+                    cols["status"][k] = STATUS_ERROR
+                    cols["error"][k] = self._code("error", str(record["error"]))
+                    continue
+                result = record["result"]
+            else:
+                cols["index"][k] = start + k
+                result = record
+            cols["iterations"][k] = result["iterations"]
+            cols["residual"][k] = result["residual"]
+            cols["method"][k] = self._code("method", result["method"])
+            for name in ("target_load_kw", "required_source_out", "final_cop", "source_total_kw"):
+                cols[name][k] = np.nan if result[name] is None else result[name]
+            if "is_source_limited" in result:
+                limited = bool(result["is_source_limited"])
+                cols["status"][k] = STATUS_SOURCE_LIMITED if limited else STATUS_NOT_CONVERGED
+                cols["is_source_limited"][k] = limited
+                cols["actual_sink_out"][k] = result["actual_sink_out"]
+                water = result.get("water_condensation")
+                if water:
+                    for name in _WATER_FIELDS:
+                        cols[name][k] = water[name]
+        return cols
+
+    def batch(self, result, start=0) -> dict:
+        """
+        result: BatchSchemeCSolver.solve 的列字典
+        """
+        converged = np.asarray(result["converged"], dtype=bool)
+        n = len(converged)
+        limited = np.asarray(result["is_source_limited"], dtype=bool)
+        cols = {
+            "index": np.arange(start, start + n, dtype="<i8"),
+            "status": np.where(converged, STATUS_CONVERGED,
+                               np.where(limited, STATUS_SOURCE_LIMITED, STATUS_NOT_CONVERGED)).astype("|u1"),
+            "method": np.full(n, self._code("method", result["method"]), dtype="<i4"),
+            "error": np.full(n, -1, dtype="<i4"),
+            "residual": np.round(np.asarray(result["residual"], dtype=float), 3),
+        }
+        for name, dtype in RESULT_COLUMNS.items():
+            if name not in cols:
+                cols[name] = np.asarray(result[name]).astype(dtype)
+        return cols
+
+    def tables(self) -> dict:
+        return {name: list(table) for name, table in self.categories.items()}
+
+class ResultColumns:
+    def __init__(self, columns, categories=None, meta=None):
+        """
+        columns: 列名 -> 等长数组 (见 RESULT_COLUMNS)；categories: 字符串列的取值表；meta: 附加信息 (如扫描网格)
+        """
+        self.columns = columns
+        self.categories = categories or {name: [] for name in CATEGORICAL_COLUMNS}
+        self.meta = meta or {}
+
+    @classmethod
+    def from_records(cls, records, meta=None):
+        encoder = _Encoder()
+        return cls(encoder.records(records), encoder.tables(), meta)
+
+    @classmethod
+    def from_batch(cls, result, meta=None):
+        encoder = _Encoder()
+        return cls(encoder.batch(result), encoder.tables(), meta)
+
+    def __len__(self):
+        return len(self.columns["index"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def decode(self, name) -> list:
+        """
+        字符串列 -> 字符串列表 (空为 None)
+        """
+        table = self.categories[name]
+        return [table[code] if code >= 0 else None for code in self.columns[name].tolist()]
+
+    def to_records(self) -> list:
+        """
+        还原为与 SchemeCSolver.solve 相同结构的 {"index", "result"} | {"index", "error"} 列表
+        """
+        cols = {name: values.tolist() for name, values in self.columns.items() if name not in CATEGORICAL_COLUMNS}
+        methods = self.decode("method")
+        errors = self.decode("error")
+        records = []
+        for k in range(len(self)):
+            status = cols["status"][k]
+            if status == STATUS_ERROR:
+                records.append({"index": cols["index"][k], "error": errors[k]})
+                continue
+            result = {
+                "status": "converged",
+                "iterations": cols["iterations"][k],
+                "residual": cols["residual"][k],
+                "method": methods[k],
+            }
+            for name in ("target_load_kw", "required_source_out", "final_cop", "source_total_kw"):
+                value = cols[name][k]
+                result[name] = None if value != value else value
+            if status != STATUS_CONVERGED:
+                result["actual_sink_out"] = cols["actual_sink_out"][k]
+                result["is_source_limited"] = cols["is_source_limited"][k]
+                if cols["condensed_water"][k] == cols["condensed_water"][k]:
+                    result["water_condensation"] = {name: cols[name][k] for name in _WATER_FIELDS}
+            records.append({"index": cols["index"][k], "result": result})
+        return records
+
+    def to_json(self) -> dict:
+        """
+        列式 JSON (数值列 NaN 转为 None，字符串列解码)
+        """
+        columns = {}
+        for name, values in self.columns.items():
+            if name in CATEGORICAL_COLUMNS:
+                columns[name] = self.decode(name)
+            elif values.dtype.kind == "f":
+                columns[name] = [None if v != v else v for v in values.tolist()]
+            else:
+                columns[name] = values.tolist()
+        return {"count": len(self), "status_names": list(STATUS_NAMES), "columns": columns, "meta": self.meta}
+
+    def _header(self):
+        offset = 0
+        specs = []
+        for name, dtype in RESULT_COLUMNS.items():
+            spec = {"name": name, "dtype": dtype, "offset": offset}
+            if name in CATEGORICAL_COLUMNS:
+                spec["categories"] = self.categories[name]
+            specs.append(spec)
+            offset = _align(offset + len(self) * np.dtype(dtype).itemsize)
+        header = {"version": 1, "rows": len(self), "status_names": list(STATUS_NAMES), "columns": specs,
+                  "meta": self.meta}
+        return json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def to_bytes(self) -> bytes:
+        header = self._header()
+        parts = [MAGIC, np.uint64(len(header)).astype("<u8").tobytes(), header]
+        size = 16 + len(header)
+        for name, dtype in RESULT_COLUMNS.items():
+            parts.append(b"\0" * (_align(size) - size))
+            data = np.ascontiguousarray(self.columns[name], dtype=dtype).tobytes()
+            parts.append(data)
+            size = _align(size) + len(data)
+        return b"".join(parts)
+
+    def write(self, path):
+        """
+        写入二进制文件 (先写临时文件再改名)
+        """
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        从二进制内容 (bytes / mmap / np.memmap) 构造，各列为指向 buffer 的只读视图 (不复制)
+        """
+        raw = np.frombuffer(buffer, dtype=np.uint8)
+        if raw[:8].tobytes() != MAGIC:
+            raise ValueError("不是列式结果文件 (魔数不符)")
+        header_len = int(raw[8:16].view("<u8")[0])
+        header = json.loads(raw[16:16 + header_len].tobytes().decode("utf-8"))
+        if header.get("version") != 1:
+            raise ValueError(f"不支持的列式结果版本: {header.get('version')}")
+        start = _align(16 + header_len)
+        rows = header["rows"]
+        columns, categories = {}, {}
+        for spec in header["columns"]:
+            columns[spec["name"]] = np.frombuffer(buffer, dtype=spec["dtype"], count=rows,
+                                                  offset=start + spec["offset"])
+            if "categories" in spec:
+                categories[spec["name"]] = spec["categories"]
+        return cls(columns, categories, header.get("meta"))
+
+    @classmethod
+    def open(cls, path):
+        """
+        以内存映射方式打开二进制文件 (零拷贝，按需分页读入)
+        """
+        return cls.from_buffer(np.memmap(path, dtype=np.uint8, mode="r"))
+
+class ColumnWriter:
+    """
+    逐块追加结果并写成二进制文件或字节流 (百万条研究、接口的列式响应用：各列先写入临时文件，内存只保留当前块)
+    """
+    def __init__(self, path=None, meta=None):
+        """
+        path: 目标文件 (close() 时写入)；为 None 时只用 iter_bytes() 取出内容，临时文件放在系统临时目录
+        """
+        self.path = path
+        self.meta = meta or {}
+        self.rows = 0
+        self._encoder = _Encoder()
+        directory = os.path.dirname(os.path.abspath(path)) if path else None
+        self._spill = {name: tempfile.TemporaryFile(dir=directory) for name in RESULT_COLUMNS}
+
+    def _append(self, cols):
+        for name, dtype in RESULT_COLUMNS.items():
+            self._spill[name].write(np.ascontiguousarray(cols[name], dtype=dtype).tobytes())
+        self.rows += len(cols["index"])
+
+    def append_records(self, records):
+        self._append(self._encoder.records(records, start=self.rows))
+
+    def append_batch(self, result):
+        self._append(self._encoder.batch(result, start=self.rows))
+
+    def iter_bytes(self, block_size=1 << 20):
+        """
+        生成器：逐块产出完整的二进制内容 (头部 + 各列)，结束或中途关闭时释放临时文件；之后不能再追加
+        """
+        try:
+            header = ResultColumns(
+                {name: np.empty(self.rows, dtype=dtype) for name, dtype in RESULT_COLUMNS.items()},
+                self._encoder.tables(), self.meta,
+            )._header()
+            yield MAGIC + np.uint64(len(header)).astype("<u8").tobytes() + header
+            size = 16 + len(header)
+            for name in RESULT_COLUMNS:
+                yield b"\0" * (_align(size) - size)
+                size = _align(size)
+                spill = self._spill[name]
+                spill.seek(0)
+                while True:
+                    block = spill.read(block_size)
+                    if not block:
+                        break
+                    yield block
+                    size += len(block)
+        finally:
+            self.discard()
+
+    def discard(self):
+        for spill in self._spill.values():
+            spill.close()
+
+    def close(self):
+        """
+        拼接各列写入目标文件
+        """
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            for block in self.iter_bytes():
+                f.write(block)
+        os.replace(tmp, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
@@ -29,5 +29,23 @@ FUEL_DB = {
         "theoreticalGasFactor": 12.0,
         "dewPointRef": 48.0,
         "maxLatentRatio": 0.06
+    },
+    'BIOMASS': {
+        "name": '生物质颗粒 (Biomass)',
+        "calorificValue": 17.5,      # MJ/kg
+        "co2Factor": 0.0,            # 碳中性
+        "theoreticalAirNeed": 5.0,
+        "theoreticalGasFactor": 6.0,
+        "dewPointRef": 40.0,
+        "maxLatentRatio": 0.08
+    },
+    'STEAM_PIPE': {
+        "name": '管道蒸汽 (Pipeline Steam)',
+        "calorificValue": 2700,      # kJ/kg (前端暂未换算单位，保持一致)
+        "co2Factor": 0.3,            # 假设热电联产分配
+        "theoreticalAirNeed": 0,     # 无燃烧产物
+        "theoreticalGasFactor": 0,
+        "dewPointRef": 0,
+        "maxLatentRatio": 0.0
     }
 }
\ No newline at end of file
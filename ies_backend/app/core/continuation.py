@@ -0,0 +1,124 @@
+# app/core/continuation.py
+# 连续求解 (continuation)：沿参数路径 (如 sink_flow_kg_h 递增) 依次求解，
+# 用前两步的解做线性预测作为初始猜测，用 SolverState 中的斜率做牛顿首步
+# 可选同时冷启动求解每一步，统计节省的迭代次数
+
+from app.core.solver import SchemeCSolver, SolverState
+from app.core.sweep import axis_values
+from app.core.telemetry import SolverTelemetry
+from app.validation import SCHEME_C_FIELDS, validate_scheme_c
+
+MAX_PATH_POINTS = 100_000  # 单次连续求解的最大步数
+
+# 可作为路径参数的数值字段
+PATH_PARAMETERS = tuple(name for name, kind, _ in SCHEME_C_FIELDS if kind is float)
+
+class ContinuationDriver:
+    def __init__(self, solver=None, predictor=True, compare=False):
+        """
+        predictor: 用前两步收敛解线性外推初始猜测 (否则直接用上一步的解)
+        compare: 每一步额外冷启动求解一次，用于统计节省的迭代次数
+        """
+        self.solver = solver or SchemeCSolver()
+        self.predictor = predictor
+        self.compare = compare
+        # 对照组使用独立遥测，避免重复计数
+        self._cold_solver = SchemeCSolver(
+            tolerance=self.solver.tolerance, max_iter=self.solver.max_iter,
+            method=self.solver.method, telemetry=SolverTelemetry()
+        )
+        self.reset()
+
+    def reset(self):
+        self.state = SolverState()
+        self._history = []  # 最近两步的 (参数值, 收敛排烟温度)
+        self.steps = 0
+        self.converged_steps = 0
+        self.iterations_total = 0
+        self.cold_iterations_total = 0
+
+    def _predict(self, value):
+        """
+        按参数值线性外推下一步的排烟温度；参数值未知或不足两步时返回 None (使用上一步的解)
+        """
+        if not self.predictor or len(self._history) < 2:
+            return None
+        (v0, t0), (v1, t1) = self._history
+        if value is None or v0 is None or v1 is None:
+            return 2 * t1 - t0
+        if v1 == v0:
+            return t1
+        return t1 + (t1 - t0) * (value - v1) / (v1 - v0)
+
+    def step(self, req, value=None) -> dict:
+        """
+        求解路径上的一步，返回 {"step", "value"?, "result", "warm_start", "cold_iterations"?}
+        """
+        guess = self._predict(value)
+        warm = guess is not None or self.state.t_source_out is not None
+        result = self.solver.solve(req, initial_guess=guess, state=self.state)
+
+        record = {"step": self.steps}
+        if value is not None:
+            record["value"] = value
+        record.update({"result": result, "warm_start": warm})
+
+        self.steps += 1
+        self.iterations_total += result["iterations"]
+        if self.state.t_source_out is not None:
+            self.converged_steps += 1
+            self._history = (self._history + [(value, self.state.t_source_out)])[-2:]
+        else:
+            self._history = []
+
+        if self.compare:
+            cold = self._cold_solver.solve(req)
+            record["cold_iterations"] = cold["iterations"]
+            self.cold_iterations_total += cold["iterations"]
+        return record
+
+    def run(self, requests, values=None):
+        """
+        生成器：依次求解 requests (与 values 一一对应的参数值可选)
+        """
+        values = list(values) if values is not None else None
+        for k, req in enumerate(requests):
+            yield self.step(req, values[k] if values is not None else None)
+
+    def summary(self) -> dict:
+        summary = {
+            "steps": self.steps,
+            "converged_steps": self.converged_steps,
+            "iterations_total": self.iterations_total,
+            "iterations_mean": round(self.iterations_total / self.steps, 3) if self.steps else 0.0,
+        }
+        if self.compare:
+            summary.update({
+                "cold_iterations_total": self.cold_iterations_total,
+                "cold_iterations_mean": round(self.cold_iterations_total / self.steps, 3) if self.steps else 0.0,
+                "saved_iterations": self.cold_iterations_total - self.iterations_total,
+                "speedup": round(self.cold_iterations_total / self.iterations_total, 2) if self.iterations_total else None,
+            })
+        return summary
+
+def continuation(base, parameter, axis, solver=None, predictor=True, compare=True):
+    """
+    沿单个参数路径连续求解
+    base: 基准请求 (dict)；parameter: 路径参数字段名；axis: 轴定义 (同参数扫描的 values / start+stop+step / start+stop+num)
+    返回 {"parameter", "values", "results", "summary"}
+    """
+    if parameter not in PATH_PARAMETERS:
+        raise ValueError(f"不支持的路径参数: {parameter} (可选: {', '.join(PATH_PARAMETERS)})")
+    values = [float(v) for v in axis_values(parameter, axis)]
+    if len(values) > MAX_PATH_POINTS:
+        raise ValueError(f"路径点数 {len(values)} 超过上限 {MAX_PATH_POINTS}")
+
+    driver = ContinuationDriver(solver, predictor=predictor, compare=compare)
+    requests = (validate_scheme_c({**base, parameter: value}) for value in values)
+    results = [record["result"] for record in driver.run(requests, values)]
+    return {
+        "parameter": parameter,
+        "values": values,
+        "results": results,
+        "summary": driver.summary(),
+    }
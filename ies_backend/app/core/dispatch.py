@@ -0,0 +1,150 @@
+# app/core/dispatch.py
+# 单次计算接口的异步调度：CPU 密集的求解交给有界进程池，事件循环不被阻塞
+#   - 准入控制: 在途求解数达到上限时直接拒绝 (Overloaded，接口返回 429 + Retry-After)
+#   - 合并请求 (singleflight): 键相同的并发请求共享同一次在途求解，只占一个名额
+#   - 遥测: 子进程中的求解统计随结果带回，在父进程的 SOLVER_TELEMETRY 中记录 (每次实际求解一次)
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.cycles import calculate_cop
+from app.core.solver import SchemeCSolver
+from app.core.telemetry import SOLVER_TELEMETRY, SolverTelemetry
+
+class Overloaded(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"求解队列已满，请 {retry_after} 秒后重试")
+        self.retry_after = retry_after
+
+class _CapturedTelemetry(SolverTelemetry):
+    """
+    子进程内的遥测：不计数，只收集 record 的参数带回父进程
+    """
+    def __init__(self, trace_sample_rate):
+        super().__init__(trace_sample_rate=trace_sample_rate)
+        self.records = []
+
+    def record(self, stats, trace=None):
+        self.records.append((stats, trace))
+
+# 子进程内复用的求解器 (按配置)
+_SOLVERS = {}
+
+def solve_scheme_c_task(req, config, trace_sample_rate, trace=False, sensitivities=False):
+    """
+    子进程任务: 求解方案C，返回 (结果, 遥测记录列表)
+    """
+    solver = _SOLVERS.get(config)
+    if solver is None:
+        tolerance, max_iter, method = config
+        solver = _SOLVERS[config] = SchemeCSolver(tolerance=tolerance, max_iter=max_iter, method=method)
+    solver.telemetry = _CapturedTelemetry(trace_sample_rate)
+    result = solver.solve(req, trace=trace, sensitivities=sensitivities)
+    return result, solver.telemetry.records
+
+def calculate_cop_task(fields):
+    """
+    子进程任务: calculate_cop (无遥测)
+    """
+    return calculate_cop(**fields), []
+
+class SolveDispatcher:
+    def __init__(self, workers, max_pending=None, telemetry=None):
+        """
+        workers: 进程数 (进程池在首次提交时创建)
+        max_pending: 在途求解数上限 (含排队)，默认 workers * 8
+        """
+        self.workers = max(1, workers)
+        self.max_pending = max_pending or self.workers * 8
+        self.telemetry = telemetry or SOLVER_TELEMETRY
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._inflight = {}  # 键 -> asyncio.Task
+        self.pending = 0
+        self.submitted = self.completed = self.coalesced = self.rejected = self.errors = 0
+        self.service_time_mean = 0.0  # 单次求解耗时 (秒，指数滑动平均)
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _reset_pool(self, pool):
+        # 子进程异常退出后进程池不可再用，下次提交时重建
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def retry_after(self) -> int:
+        """
+        按当前队列与平均求解耗时估算的重试等待 (秒，至少 1)
+        """
+        return max(1, math.ceil(self.pending * self.service_time_mean / self.workers))
+
+    async def _run(self, func, args):
+        pool = self._get_pool()
+        start = time.perf_counter()
+        try:
+            result, records = await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+        except BrokenProcessPool:
+            self._reset_pool(pool)
+            raise
+        elapsed = time.perf_counter() - start
+        self.service_time_mean = elapsed if not self.completed else 0.9 * self.service_time_mean + 0.1 * elapsed
+        self.completed += 1
+        for stats, trace in records:
+            self.telemetry.record(stats, trace)
+        return result
+
+    def _done(self, key, task):
+        self.pending -= 1
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+
+    async def submit(self, key, func, *args):
+        """
+        提交求解 (在事件循环中调用)；key 相同的在途请求直接共享结果，key 为 None 时不合并
+        超出 max_pending 时抛出 Overloaded
+        """
+        task = self._inflight.get(key) if key is not None else None
+        if task is not None:
+            self.coalesced += 1
+        else:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise Overloaded(self.retry_after())
+            task = asyncio.ensure_future(self._run(func, args))
+            self.pending += 1
+            self.submitted += 1
+            task.add_done_callback(lambda done, key=key: self._done(key, done))
+            if key is not None:
+                self._inflight[key] = task
+        # 某个调用方断开 (取消) 不影响共享同一求解的其他请求
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "inflight_keys": len(self._inflight),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "service_time_mean_ms": round(self.service_time_mean * 1000.0, 4),
+        }
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
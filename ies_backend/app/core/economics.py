@@ -0,0 +1,436 @@
+# app/core/economics.py
+# 系统经济性批量评估：移植自 src/models/System.js / Boiler.js / HeatPump.js
+# N 个情景 (电价、燃料价、燃料、拓扑、工况...) 按列 (NumPy 数组) 传入，一次计算全部 KPI
+#   - 方案 A/B (PARALLEL / COUPLED): 热泵完全替代锅炉 (runStandardSimulation)
+#   - 方案 C (RECOVERY): 锅炉烟气余热潜力 + 热泵源/汇限制 (runRecoverySimulation)
+# 与前端逐个计算的差异:
+#   - 热泵受汇侧限制时，实际排烟温度按烟气比热 0.00038 kWh/(m3·K) 反算 (前端此处为 NaN，显示时回落到目标排烟温度)
+#   - 燃料物性取燃料注册表 (app.core.fuels)；电能按 3.6 MJ/kWh、0.6101 kg/kWh；
+#     内置燃料中天然气 (0.11) 与生物质 (0.08) 计潜热 (与 Boiler.js 一致)，自定义燃料按其 max_latent_ratio
+
+import numpy as np
+
+from app.core import vectorized as vec
+from app.core.fuels import BUILTIN_FUEL_COUNT, fuel_ids, fuel_table, get_fuel
+from app.core.sweep import build_grid, to_jsonable
+
+MAX_SCENARIOS = 1_000_000       # 单次评估的最大情景数
+
+# 电能 (电价 / 电网碳排放因子，对应 JS FUEL_DB.ELECTRICITY)
+ELEC_CALORIFIC_VALUE = 3.6      # MJ/kWh
+ELEC_CO2_FACTOR = 0.6101        # kg/kWh
+PEF_FUEL = 1.05                 # 燃料一次能源因子
+CP_FLUE = 0.00038               # 烟气体积比热 kWh/(m3·K)
+SAFE_PREHEAT_LIMIT = 98.0       # 蒸汽补水预热时热泵出水上限 (°C)
+LATENT_FUELS = ("NATURAL_GAS", "BIOMASS")  # Boiler.calculateSourcePotential 中计潜热的内置燃料
+
+# 列定义: 字段名 -> 默认值 (与前端 store 初始状态一致)
+# fuel_cal_value / fuel_co2_value 为 None 时取燃料注册表的热值 / 碳排放因子
+ECONOMIC_COLUMNS = {
+    "topology": "RECOVERY",         # PARALLEL (方案A) / COUPLED (方案B) / RECOVERY (方案C)
+    "mode": "STEAM",                # WATER / STEAM
+    "strategy": "STRATEGY_PRE",     # STRATEGY_PRE / STRATEGY_GEN
+    "recovery_type": "MVR",         # MVR / ABSORPTION_HP (仅方案C)
+    "source_temp": 35.0,            # 方案 A/B: 环境 / 余热源入口温度
+    "source_out": 30.0,             # 方案 B: 余热源出口温度
+    "flue_in": 130.0,               # 方案 C: 初始排烟温度
+    "flue_out": 80.0,               # 方案 C: 目标排烟温度
+    "excess_air": 1.2,              # 过量空气系数
+    "target_temp": 2.5,             # 热水供水温度 / 蒸汽压力 (MPa)
+    "steam_pressure_type": "ABSOLUTE",  # 蒸汽压力类型: ABSOLUTE (绝对压力) / GAUGE (表压) / AUTO (见 STEAM_PRESSURE_TYPES)
+    "load_in": 70.0,                # 方案 C: 补水 / 回水温度
+    "load_out": 90.0,               # 方案 C: 热水目标温度
+    "load_value": 17500.0,          # 设计热负荷 kW
+    "perfection_degree": 0.45,      # 热力完善度
+    "is_manual_cop": False,
+    "manual_cop": 3.5,
+    "fuel_type": "NATURAL_GAS",
+    "fuel_cal_value": None,         # 低位热值 (MJ/单位；kWh 量级的数值自动换算)
+    "fuel_cal_unit": "MJ/unit",
+    "fuel_co2_value": None,         # 碳排放因子 (kg/单位；kgCO2/kWh 自动换算)
+    "fuel_co2_unit": "kgCO2/unit",
+    "elec_price": 0.7,              # 电价 元/kWh
+    "fuel_price": 4.0,              # 燃料单价 元/单位
+    "annual_hours": 6000.0,
+    "boiler_eff": 0.92,
+    "capex_hp": 2500.0,             # 热泵单位造价 元/kW
+    "capex_base": 200.0,            # 锅炉单位造价 元/kW
+    "altitude": 0.0,
+    "pef_elec": 2.5,                # 电网一次能源因子
+}
+
+_STRING_COLUMNS = ("topology", "mode", "strategy", "recovery_type", "steam_pressure_type",
+                   "fuel_type", "fuel_cal_unit", "fuel_co2_unit")
+TOPOLOGIES = ("PARALLEL", "COUPLED", "RECOVERY")
+# AUTO 沿用前端 getSatTempFromPressure 的猜测 (< 0.5 MPa 视为表压)，只用于与前端结果逐项对齐，须显式指定
+STEAM_PRESSURE_TYPES = ("ABSOLUTE", "GAUGE", "AUTO")
+
+# 结果列
+ECONOMIC_FIELDS = (
+    "cop", "lift", "recovered_kw", "drive_kw",
+    "baseline_cost_per_hour", "cost_per_hour", "hourly_saving", "annual_saving", "invest", "payback",
+    "baseline_co2", "current_co2", "co2_reduction", "per",
+    "site_eff_before", "site_eff_after", "per_before", "per_after",
+    "is_sink_limited", "actual_load_out", "actual_flue_out", "condensed_water",
+    "decision", "error_code",
+)
+
+# 决策等级 (对应 System._makeDecision)
+DECISION_NEGATIVE = 0    # 不推荐：热泵年运行成本更高
+DECISION_MARGINAL = 1    # 建议考虑：有收益但回收期 >= 4 年
+DECISION_STRONG = 2      # 强力推荐：回收期 < 4 年
+DECISION_LABELS = {
+    DECISION_NEGATIVE: "NEGATIVE",
+    DECISION_MARGINAL: "MARGINAL",
+    DECISION_STRONG: "STRONG",
+}
+
+# 错误码 (1~3 与 vectorized.cop 一致)
+ECON_FLUE_TOO_COLD = 4
+ECON_SINK_DELTA_TOO_SMALL = 5
+ECON_MASS_FLOW_INVALID = 6
+ECON_BASELINE_CO2_INVALID = 7
+ECON_UNKNOWN_TOPOLOGY = 8
+ERROR_MESSAGES = {
+    **{code: msg for code, msg in vec.COP_ERROR_MESSAGES.items() if msg},
+    ECON_FLUE_TOO_COLD: "排烟温度过低 (<5°C)，无回收价值",
+    ECON_SINK_DELTA_TOO_SMALL: "系统进出水温差过小，无法计算有效流量",
+    ECON_MASS_FLOW_INVALID: "Internal Error: System Mass Flow invalid",
+    ECON_BASELINE_CO2_INVALID: "基准CO2计算错误，无法计算减排率",
+    ECON_UNKNOWN_TOPOLOGY: "未知的系统拓扑",
+}
+
+def columns_from_scenarios(base, scenarios):
+    """
+    基准情景 + 逐行覆盖字段 -> 列字典
+    """
+    unknown = sorted({name for row in scenarios for name in row if name not in ECONOMIC_COLUMNS})
+    if unknown:
+        raise ValueError(f"不支持的情景字段: {', '.join(unknown)}")
+    base = {**ECONOMIC_COLUMNS, **base}
+    return {name: [row.get(name, base[name]) for row in scenarios] for name in ECONOMIC_COLUMNS}
+
+def _matches(values, predicate):
+    """
+    字符串列逐元素判断 (先去重，通常只有少数几种取值)
+    """
+    names, inverse = np.unique(values.astype(str), return_inverse=True)
+    return np.array([predicate(name) for name in names], dtype=bool)[inverse]
+
+class SystemEconomics:
+    def _prepare(self, columns):
+        """
+        列字典 -> 定长 NumPy 数组 (标量自动广播，缺省列取默认值；None 转为 NaN)
+        """
+        n = None
+        for name in ECONOMIC_COLUMNS:
+            value = columns.get(name)
+            if value is not None and np.ndim(value) > 0:
+                n = len(value)
+                break
+        if n is None:
+            n = 1
+        if n > MAX_SCENARIOS:
+            raise ValueError(f"情景数 {n} 超过上限 {MAX_SCENARIOS}")
+
+        unknown = [name for name in columns if name not in ECONOMIC_COLUMNS]
+        if unknown:
+            raise ValueError(f"不支持的情景字段: {', '.join(unknown)}")
+
+        cols = {}
+        for name, default in ECONOMIC_COLUMNS.items():
+            value = columns.get(name, default)
+            if name == "fuel_type" and np.asarray(value).dtype.kind in "iu":
+                arr = np.asarray(value, dtype=np.intp)
+            elif name in _STRING_COLUMNS:
+                arr = np.asarray(value, dtype=object)
+            elif name == "is_manual_cop":
+                arr = np.asarray(value, dtype=bool)
+            else:
+                arr = np.asarray(np.nan if value is None else value)
+                if arr.dtype == object:
+                    arr = np.array([np.nan if v is None else v for v in arr.ravel()], dtype=float).reshape(arr.shape)
+                arr = arr.astype(float)
+            if arr.ndim == 0:
+                arr = np.full(n, arr.item(), dtype=arr.dtype)
+            if arr.shape != (n,):
+                raise ValueError(f"列 {name} 长度为 {arr.shape}，应为 ({n},)")
+            cols[name] = arr
+        unknown = sorted(set(cols["steam_pressure_type"].astype(str)) - set(STEAM_PRESSURE_TYPES))
+        if unknown:
+            raise ValueError(f"不支持的蒸汽压力类型: {', '.join(unknown)} (应为 {' / '.join(STEAM_PRESSURE_TYPES)})")
+        return cols
+
+    def _fuel(self, c):
+        """
+        燃料列 -> (ID, 是否电能, 是否天然气, 有效热值, 有效碳排放因子, 有效燃料单价, 锅炉有效效率)
+        对应 System.simulate 的数据清洗与 Boiler 构造函数中的单位换算
+        """
+        ids = fuel_ids(c["fuel_type"])
+        table = fuel_table()
+        is_elec = ids == get_fuel("ELECTRICITY").id
+        is_ng = ids == get_fuel("NATURAL_GAS").id
+        default_lhv = np.where(is_elec, ELEC_CALORIFIC_VALUE, table["calorific_value"][ids])
+        default_co2 = np.where(is_elec, ELEC_CO2_FACTOR, table["co2_factor"][ids])
+
+        # 热值单位归一化: 明确为 kWh，或数值明显是 kWh 量级时乘 3.6
+        lhv = np.where(np.isnan(c["fuel_cal_value"]), default_lhv, c["fuel_cal_value"])
+        is_unit_kwh = _matches(c["fuel_cal_unit"], lambda unit: "kWh" in unit)
+        is_low = (is_ng & (lhv < 20)) | (lhv < default_lhv * 0.6)
+        lhv = np.where(is_unit_kwh | is_low, lhv * 3.6, lhv)
+
+        price = np.where(is_elec, c["elec_price"], c["fuel_price"])
+        co2 = np.where(np.isnan(c["fuel_co2_value"]), default_co2, c["fuel_co2_value"])
+        co2 = np.where(is_elec & (co2 < 0.3), ELEC_CO2_FACTOR, co2)
+        eff = np.where(is_elec & (c["boiler_eff"] < 0.95), 0.99, c["boiler_eff"])
+
+        # 碳排放因子: kg/kWh (或数值明显是 kWh 当量) -> kg/单位燃料
+        co2_unit_kwh = c["fuel_co2_unit"] == "kgCO2/kWh"
+        likely_kwh = ~co2_unit_kwh & (co2 < 1.0) & (co2 < default_co2 * 0.3)
+        co2 = np.where(co2_unit_kwh | likely_kwh, co2 * (lhv / 3.6), co2)
+        return ids, is_elec, is_ng, lhv, co2, price, eff
+
+    def _source_potential(self, c, ids, is_elec, lhv, eff):
+        """
+        对应 Boiler.calculateSourcePotential: (总潜力 kW, 标准状态烟气量 m3/h, 析水量 kg/h)
+        电能无烟气，潜力为 0
+        """
+        table = fuel_table()
+        alpha = np.where(c["excess_air"] == 0, 1.2, c["excess_air"])
+        input_kw = c["load_value"] / eff
+        fuel_rate = input_kw * 3.6 / lhv
+        flue_factor = table["theoretical_gas_factor"][ids] + (np.maximum(1.0, alpha) - 1.0) * \
+            table["theoretical_air_need"][ids]
+        flow_vol = np.where(is_elec, 0.0, fuel_rate * flue_factor)
+        flue_in, flue_out = c["flue_in"], c["flue_out"]
+        sensible = flow_vol * CP_FLUE * (flue_in - flue_out)
+
+        dew_point = vec.adjusted_dew_point(table["dew_point_ref"][ids], c["excess_air"])
+        has_latent = np.isin(ids, [get_fuel(key).id for key in LATENT_FUELS]) | (ids >= BUILTIN_FUEL_COUNT)
+        latent_ratio = np.where(has_latent, table["max_latent_ratio"][ids], 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cond_factor = np.clip((dew_point - flue_out) / (dew_point - 5), 0.0, 1.0)
+        latent = np.where(flue_out < dew_point, input_kw * latent_ratio * cond_factor, 0.0)
+
+        # H2O 体积分数: 按组成计算 (天然气) 或取固定值
+        h2o = table["h2o_vol_percent"][ids]
+        by_composition = np.isnan(h2o)
+        if by_composition.any():
+            extra = (alpha - 1.0) * (table["excess_o2"][ids] + table["excess_n2"][ids])
+            total_vol = table["co2"][ids] + table["h2o"][ids] + table["n2"][ids] + extra
+            with np.errstate(divide="ignore", invalid="ignore"):
+                h2o = np.where(by_composition, table["h2o"][ids] / total_vol * 100, h2o)
+        water = vec.water_condensation(flue_in, flue_out, flow_vol, h2o, dew_point)[0]
+        total = np.where(is_elec, 0.0, sensible + latent)
+        return total, flow_vol, np.where(is_elec, np.nan, water)
+
+    def evaluate(self, columns) -> dict:
+        """
+        批量评估
+        columns: 字段名 -> 数组或标量 (见 ECONOMIC_COLUMNS)
+        返回: 字段名 -> 数组 (见 ECONOMIC_FIELDS；出错情景的数值列为 NaN，decision 为 -1)
+        """
+        c = self._prepare(columns)
+        n = len(c["load_value"])
+        topology = c["topology"]
+        recovery = topology == "RECOVERY"
+        parallel = topology == "PARALLEL"
+        known = np.isin(topology, TOPOLOGIES)
+        is_steam = c["mode"] == "STEAM"
+        is_gen = c["strategy"] == "STRATEGY_GEN"
+        is_preheat = c["strategy"] == "STRATEGY_PRE"
+        is_abs = recovery & (c["recovery_type"] == "ABSORPTION_HP")
+        load = c["load_value"]
+        boiler_eff = c["boiler_eff"]
+        pef_elec = np.where(c["pef_elec"] == 0, 2.5, c["pef_elec"])
+
+        ids, is_elec, is_ng, lhv, co2_factor, price, eff = self._fuel(c)
+
+        # 基准: 锅炉单独供热 (Boiler.calculateBaseline)
+        fuel_rate = load / eff * 3.6 / lhv
+        baseline_cost = fuel_rate * price
+        baseline_co2 = fuel_rate * co2_factor
+
+        # 目标温度 (蒸汽模式按饱和温度)
+        atm = vec.atmospheric_pressure(c["altitude"])
+        gauge = np.where(c["steam_pressure_type"] == "GAUGE", True,
+                         np.where(c["steam_pressure_type"] == "ABSOLUTE", False, c["target_temp"] < 0.5))
+        sat_target = vec.sat_temp_from_pressure(c["target_temp"], atm, gauge=gauge.astype(bool))
+        sys_target = np.where(is_steam, sat_target, np.where(recovery, c["load_out"], c["target_temp"]))
+
+        # 方案C 热汇: 系统流量与热泵出水上限
+        h_target = vec.enthalpy(sys_target, is_steam)
+        h_in = vec.enthalpy(c["load_in"], False)
+        flow_ok = h_target > h_in + 1.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mass_flow = np.where(flow_ok, load / (h_target - h_in), 0.0)
+        hp_target = np.where(is_steam & is_preheat, np.minimum(sys_target, SAFE_PREHEAT_LIMIT), sys_target)
+
+        # 蒸发 / 冷凝温度
+        t_evap = np.where(recovery, c["flue_out"] - 5.0,
+                          np.where(parallel, c["source_temp"] - 10.0, c["source_out"] - 5.0))
+        t_cond = np.where(recovery, hp_target, sys_target) + 5.0
+        cop, lift, cop_error = vec.cop(t_evap, t_cond, c["perfection_degree"], is_steam, is_gen, is_abs)
+        manual = c["is_manual_cop"] & (c["manual_cop"] > 0)
+        cop = np.where(manual, c["manual_cop"], cop)
+        lift = np.where(manual, t_cond - t_evap, lift)
+        cop_error = np.where(manual, vec.COP_OK, cop_error)
+
+        # === 方案C: 烟气余热回收 (HeatPump.simulate) ===
+        source_total, flow_vol, condensed_water = self._source_potential(c, ids, is_elec, lhv, eff)
+        cop_ratio = np.where(cop > 1, cop / np.maximum(cop - 1, 1e-12), 1.0)
+        q_source_limit = source_total * cop_ratio
+        q_sink_limit = mass_flow * (vec.enthalpy(hp_target, False) - h_in)
+        recovered = np.minimum(q_source_limit, q_sink_limit)
+        drive = recovered / cop
+        with np.errstate(divide="ignore", invalid="ignore"):
+            load_out_actual = np.minimum((h_in + recovered / mass_flow) / 4.187, hp_target)
+            q_evap = np.where(is_abs, recovered / cop_ratio, recovered - drive)
+            sink_limited_flue = np.minimum(c["flue_in"] - q_evap / (flow_vol * CP_FLUE), c["flue_in"])
+        flue_out_actual = np.where(q_evap >= source_total - 0.1, c["flue_out"], sink_limited_flue)
+        is_sink_limited = recovered < q_source_limit - 1.0
+
+        # 经济性 (runRecoverySimulation)
+        saved_cost = recovered / boiler_eff * 3.6 / lhv * price
+        drive_fuel_units = drive / boiler_eff * 3.6 / lhv
+        drive_cost = np.where(is_abs, drive_fuel_units * price, drive * c["elec_price"])
+        drive_co2 = np.where(is_abs, drive_fuel_units * co2_factor, drive * ELEC_CO2_FACTOR)
+        drive_primary = np.where(is_abs, drive / boiler_eff * PEF_FUEL, drive * pef_elec)
+        rec_hourly = saved_cost - drive_cost
+        rec_invest = recovered * c["capex_hp"]
+        boiler_co2 = (load - recovered) / boiler_eff * 3.6 / lhv * co2_factor
+        rec_co2 = boiler_co2 + drive_co2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rec_per = np.where(drive_primary > 0, recovered / drive_primary, 0.0)
+
+        # 耦合数据 (_calculateCouplingData)
+        boiler_input = (load - recovered) / boiler_eff
+        site_input = np.where(is_abs, boiler_input + drive / boiler_eff, boiler_input + drive)
+        primary_input = np.where(is_abs, (boiler_input + drive / boiler_eff) * PEF_FUEL,
+                                 boiler_input * PEF_FUEL + drive * pef_elec)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            site_eff_after = load / site_input
+            per_after = load / primary_input
+
+        # === 方案 A/B: 热泵完全替代锅炉 (runStandardSimulation) ===
+        power_input = load / cop
+        hp_cost = power_input * c["elec_price"]
+        std_co2 = power_input * ELEC_CO2_FACTOR
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std_per = np.where(power_input * pef_elec > 0, load / (power_input * pef_elec), 0.0)
+        std_invest = load * (c["capex_hp"] - c["capex_base"])
+
+        # === 合并 ===
+        hourly_saving = np.where(recovery, rec_hourly, baseline_cost - hp_cost)
+        annual_saving = hourly_saving * c["annual_hours"]
+        invest = np.where(recovery, rec_invest, std_invest)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            payback = np.where(annual_saving > 0, invest / annual_saving, 99.0)
+            current_co2 = np.where(recovery, rec_co2, std_co2)
+            co2_reduction = (baseline_co2 - current_co2) / baseline_co2 * 100
+
+        decision = np.where(annual_saving > 0, np.where(payback < 4.0, DECISION_STRONG, DECISION_MARGINAL),
+                            DECISION_NEGATIVE).astype(np.int8)
+
+        # 错误 (按前端判定顺序，先命中者优先)
+        error = np.select(
+            [
+                ~known,
+                recovery & (c["flue_in"] < 5.0),
+                recovery & ~flow_ok,
+                recovery & ~(mass_flow > 0),
+                cop_error != vec.COP_OK,
+                ~recovery & ~(baseline_co2 > 0),
+            ],
+            [
+                ECON_UNKNOWN_TOPOLOGY, ECON_FLUE_TOO_COLD, ECON_SINK_DELTA_TOO_SMALL,
+                ECON_MASS_FLOW_INVALID, cop_error, ECON_BASELINE_CO2_INVALID,
+            ],
+            vec.COP_OK,
+        ).astype(np.int8)
+        failed = error != vec.COP_OK
+
+        nan = np.full(n, np.nan)
+        result = {
+            "cop": cop,
+            "lift": lift,
+            "recovered_kw": np.where(recovery, recovered, load),
+            "drive_kw": np.where(recovery, drive, power_input),
+            "baseline_cost_per_hour": baseline_cost,
+            "cost_per_hour": np.where(recovery, baseline_cost - rec_hourly, hp_cost),
+            "hourly_saving": hourly_saving,
+            "annual_saving": annual_saving,
+            "invest": invest,
+            "payback": payback,
+            "baseline_co2": baseline_co2,
+            "current_co2": current_co2,
+            "co2_reduction": co2_reduction,
+            "per": np.where(recovery, rec_per, std_per),
+            "site_eff_before": np.where(recovery, boiler_eff * 100, nan),
+            "site_eff_after": np.where(recovery, site_eff_after * 100, nan),
+            "per_before": np.where(recovery, boiler_eff / PEF_FUEL, nan),
+            "per_after": np.where(recovery, per_after, nan),
+            "actual_load_out": np.where(recovery, np.round(load_out_actual, 1), nan),
+            "actual_flue_out": np.where(recovery, np.round(flue_out_actual, 1), nan),
+            "condensed_water": np.where(recovery, condensed_water, nan),
+        }
+        for name, values in result.items():
+            result[name] = np.where(failed, np.nan, values)
+        result["is_sink_limited"] = recovery & is_sink_limited & ~failed
+        result["decision"] = np.where(failed, -1, decision).astype(np.int8)
+        result["error_code"] = error
+        return result
+
+def _summary(result):
+    """
+    情景对比摘要: 决策分布、错误分布、年收益最高 / 回收期最短的情景序号
+    """
+    ok = result["error_code"] == vec.COP_OK
+    summary = {
+        "valid": int(ok.sum()),
+        "decisions": {label: int((result["decision"] == code).sum()) for code, label in DECISION_LABELS.items()},
+        "errors": {str(code): int((result["error_code"] == code).sum())
+                   for code in ERROR_MESSAGES if (result["error_code"] == code).any()},
+    }
+    if ok.any():
+        index = np.flatnonzero(ok)
+        summary["best_annual_saving"] = int(index[np.argmax(result["annual_saving"][ok])])
+        summary["shortest_payback"] = int(index[np.argmin(result["payback"][ok])])
+    return summary
+
+def economics_batch(base=None, scenarios=None, axes=None, fields=None, engine=None):
+    """
+    经济性批量评估入口
+    base: 基准情景 (dict，缺省字段取 ECONOMIC_COLUMNS 默认值)
+    scenarios: 逐个情景的覆盖字段 (dict 列表)；axes: 扫描轴 (全因子网格，见 app.core.sweep)，二者择一
+    fields: 返回的结果列，默认全部
+    """
+    fields = list(fields or ECONOMIC_FIELDS)
+    unknown = [name for name in fields if name not in ECONOMIC_FIELDS]
+    if unknown:
+        raise ValueError(f"未知的结果字段: {', '.join(unknown)}")
+    base = dict(base or {})
+    if scenarios and axes:
+        raise ValueError("scenarios 与 axes 只能二选一")
+
+    response = {}
+    if axes:
+        grid_axes, shape, columns = build_grid(base, axes, ECONOMIC_COLUMNS)
+        response["shape"] = list(shape)
+        response["axes"] = {name: to_jsonable(values) for name, values in grid_axes.items()}
+    elif scenarios:
+        if len(scenarios) > MAX_SCENARIOS:
+            raise ValueError(f"情景数 {len(scenarios)} 超过上限 {MAX_SCENARIOS}")
+        columns = columns_from_scenarios(base, scenarios)
+    else:
+        columns = base
+
+    result = (engine or SystemEconomics()).evaluate(columns)
+    response.update({
+        "count": int(len(result["error_code"])),
+        "columns": {name: to_jsonable(result[name]) for name in fields},
+        "summary": _summary(result),
+        "decisions": {str(code): label for code, label in DECISION_LABELS.items()},
+        "errors": {str(code): msg for code, msg in ERROR_MESSAGES.items()},
+    })
+    return response
@@ -0,0 +1,210 @@
+# app/core/fuels.py
+# 编译后的燃料注册表：由 constants.FUEL_DB 生成定长 (slotted) 记录与整数 ID
+#   - 标量求解: get_fuel(key) 一次字典查找得到记录，派生量 (露点、H2O 体积分数) 按 (燃料, 过量空气系数) 缓存
+#   - 批量求解: fuel_ids(列) 将燃料名 (或整数 ID) 映射为 ID 数组，fuel_table() 给出按 ID 索引的物性数组
+#   - 自定义燃料: register_fuel(...) 注册 (可给出完整烟气组成)，注册时重建数组与缓存，不影响求解热路径
+#
+# 与旧版逐次判断的行为一致:
+#   - 只有天然气有烟气潜热 (160 kJ/m3 烟气)；H2O 分数天然气按化学计量随过量空气变化，煤 8%、柴油 12%、其他 10%
+#   - 电能 (ELECTRICITY)、管道蒸汽 (STEAM_PIPE) 无水分析出；未知燃料按天然气物性，但无潜热、H2O 取 10%
+#   - 生物质 (BIOMASS)、管道蒸汽的物性与前端 FUEL_DB 一致
+
+from functools import lru_cache
+
+from app.core.constants import FUEL_DB
+from app.core.physics import calculate_adjusted_dew_point
+
+class FuelRecord:
+    """
+    燃料物性记录
+    composition: 单位燃料的烟气组成 (co2, h2o, n2, 每单位过量空气系数的 O2, N2)，
+                 给定时 H2O 体积分数随过量空气系数计算，否则取固定的 h2o_vol_percent
+    """
+    __slots__ = (
+        "id", "key", "name", "calorific_value", "co2_factor", "theoretical_air_need",
+        "theoretical_gas_factor", "dew_point_ref", "max_latent_ratio", "latent_per_m3",
+        "h2o_vol_percent", "composition", "condensing",
+    )
+
+    def __init__(self, id, key, name, calorific_value, co2_factor, theoretical_air_need, theoretical_gas_factor,
+                 dew_point_ref, max_latent_ratio, latent_per_m3=0.0, h2o_vol_percent=10.0, composition=None,
+                 condensing=True):
+        self.id = id
+        self.key = key
+        self.name = name
+        self.calorific_value = calorific_value        # MJ/单位燃料
+        self.co2_factor = co2_factor                  # kg/单位燃料
+        self.theoretical_air_need = theoretical_air_need
+        self.theoretical_gas_factor = theoretical_gas_factor
+        self.dew_point_ref = dew_point_ref            # 绝热燃烧露点 (°C)
+        self.max_latent_ratio = max_latent_ratio
+        self.latent_per_m3 = latent_per_m3            # 单位烟气最大可回收潜热 (kJ/m3)
+        self.h2o_vol_percent = h2o_vol_percent        # 固定 H2O 体积分数 (%)，composition 给定时不使用
+        self.composition = composition
+        self.condensing = condensing                  # 是否计算水分析出
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class FuelDerived:
+    """
+    (燃料, 过量空气系数) 的派生量
+    """
+    __slots__ = ("dew_point", "h2o_vol_percent")
+
+    def __init__(self, dew_point, h2o_vol_percent):
+        self.dew_point = dew_point                    # 修正后的露点 (°C)
+        self.h2o_vol_percent = h2o_vol_percent        # 烟气中 H2O 体积分数 (%)
+
+# 天然气: CH4 + 2O2 -> CO2 + 2H2O (理论烟气 + 过量空气)
+NATURAL_GAS_COMPOSITION = (1.0, 2.0, 7.52, 2.0, 7.52)
+
+_FUELS = []      # ID -> 记录
+_BY_KEY = {}     # 燃料名 -> 记录
+
+def _from_fuel_db(key, data, **overrides):
+    fields = {
+        "name": data["name"],
+        "calorific_value": data["calorificValue"],
+        "co2_factor": data["co2Factor"],
+        "theoretical_air_need": data["theoreticalAirNeed"],
+        "theoretical_gas_factor": data["theoreticalGasFactor"],
+        "dew_point_ref": data["dewPointRef"],
+        "max_latent_ratio": data["maxLatentRatio"],
+    }
+    fields.update(overrides)
+    return FuelRecord(len(_FUELS), key, **fields)
+
+def _add(record):
+    _FUELS.append(record)
+    if record.key is not None:
+        _BY_KEY[record.key] = record
+    return record
+
+_BUILTIN_OVERRIDES = {
+    'NATURAL_GAS': {"latent_per_m3": 160.0, "composition": NATURAL_GAS_COMPOSITION},
+    'COAL': {"h2o_vol_percent": 8.0},
+    'DIESEL': {"h2o_vol_percent": 12.0},
+    'STEAM_PIPE': {"condensing": False},
+}
+for _key, _data in FUEL_DB.items():
+    _add(_from_fuel_db(_key, _data, **_BUILTIN_OVERRIDES.get(_key, {})))
+# 电能热源：沿用天然气物性 (FUEL_DB 中无此项)，无潜热、无水分析出
+_add(_from_fuel_db('ELECTRICITY', FUEL_DB['NATURAL_GAS'], name='电能 (Electricity)', condensing=False))
+# 未知燃料：沿用天然气物性，无潜热，H2O 取 10%
+UNKNOWN_FUEL = _add(_from_fuel_db(None, FUEL_DB['NATURAL_GAS'], name='未知燃料 (Unknown)'))
+BUILTIN_FUEL_COUNT = len(_FUELS)
+
+def get_fuel(key) -> FuelRecord:
+    """
+    燃料名 / 整数 ID / 记录 -> 记录 (未知燃料返回 UNKNOWN_FUEL)
+    """
+    if isinstance(key, FuelRecord):
+        return key
+    if isinstance(key, int) and not isinstance(key, bool):
+        return _FUELS[key] if 0 <= key < len(_FUELS) else UNKNOWN_FUEL
+    return _BY_KEY.get(key, UNKNOWN_FUEL)
+
+def list_fuels():
+    return [record.to_dict() for record in _FUELS]
+
+def derive(fuel, excess_air) -> FuelDerived:
+    """
+    计算派生量 (不缓存；excess_air 可为对偶数，见 app.core.sensitivity)
+    """
+    dew_point = calculate_adjusted_dew_point(fuel.dew_point_ref, excess_air)
+    if fuel.composition is None:
+        return FuelDerived(dew_point, fuel.h2o_vol_percent)
+    co2, h2o, n2, excess_o2, excess_n2 = fuel.composition
+    total_vol = co2 + h2o + n2 + (excess_air - 1.0) * excess_o2 + (excess_air - 1.0) * excess_n2
+    return FuelDerived(dew_point, (h2o / total_vol) * 100)
+
+@lru_cache(maxsize=4096)
+def _derived_cached(fuel_id, excess_air):
+    return derive(_FUELS[fuel_id], excess_air)
+
+def fuel_derived(fuel, excess_air=1.2) -> FuelDerived:
+    """
+    (燃料, 过量空气系数) 的派生量，普通数值按参数缓存
+    """
+    if isinstance(excess_air, (int, float)):
+        return _derived_cached(fuel.id, excess_air)
+    return derive(fuel, excess_air)
+
+def register_fuel(key, name, calorific_value, dew_point_ref, latent_per_m3=0.0, h2o_vol_percent=10.0,
+                  composition=None, co2_factor=0.0, theoretical_air_need=0.0, theoretical_gas_factor=0.0,
+                  max_latent_ratio=0.0, condensing=True) -> FuelRecord:
+    """
+    注册自定义燃料 (同名时覆盖，沿用原 ID)，返回记录
+    composition: {"co2", "h2o", "n2", "excess_o2", "excess_n2"} (单位燃料的烟气组成，m3)，
+                 给定时 H2O 体积分数按过量空气系数计算，否则取 h2o_vol_percent
+    """
+    if not key or not isinstance(key, str):
+        raise ValueError("燃料名必须为非空字符串")
+    if not calorific_value > 0:
+        raise ValueError(f"燃料 {key} 的热值必须大于 0")
+    if composition is not None:
+        missing = [part for part in ("co2", "h2o", "n2", "excess_o2", "excess_n2") if part not in composition]
+        if missing:
+            raise ValueError(f"燃料 {key} 的烟气组成缺少: {', '.join(missing)}")
+        composition = tuple(float(composition[part]) for part in ("co2", "h2o", "n2", "excess_o2", "excess_n2"))
+        if min(composition) < 0 or not composition[1] > 0:
+            raise ValueError(f"燃料 {key} 的烟气组成不能为负，且 h2o 必须大于 0")
+
+    existing = _BY_KEY.get(key)
+    fuel_id = existing.id if existing is not None else len(_FUELS)
+    record = FuelRecord(
+        fuel_id, key, name, float(calorific_value), float(co2_factor), float(theoretical_air_need),
+        float(theoretical_gas_factor), float(dew_point_ref), float(max_latent_ratio),
+        latent_per_m3=float(latent_per_m3), h2o_vol_percent=float(h2o_vol_percent),
+        composition=composition, condensing=condensing,
+    )
+    if existing is not None:
+        _FUELS[fuel_id] = record
+        _BY_KEY[key] = record
+    else:
+        _add(record)
+    # 物性变化：清空派生量缓存与批量数组
+    _derived_cached.cache_clear()
+    fuel_table.cache_clear()
+    return record
+
+@lru_cache(maxsize=1)
+def fuel_table() -> dict:
+    """
+    按 ID 索引的物性数组 (批量求解用)
+    h2o_vol_percent 对按组成计算 H2O 的燃料为 NaN (组成见 co2/h2o/n2/excess_o2/excess_n2 列)
+    """
+    import numpy as np
+
+    nan = float("nan")
+    table = {
+        "calorific_value": np.array([f.calorific_value for f in _FUELS]),
+        "co2_factor": np.array([f.co2_factor for f in _FUELS]),
+        "theoretical_air_need": np.array([f.theoretical_air_need for f in _FUELS]),
+        "theoretical_gas_factor": np.array([f.theoretical_gas_factor for f in _FUELS]),
+        "max_latent_ratio": np.array([f.max_latent_ratio for f in _FUELS]),
+        "dew_point_ref": np.array([f.dew_point_ref for f in _FUELS]),
+        "latent_per_m3": np.array([f.latent_per_m3 for f in _FUELS]),
+        "h2o_vol_percent": np.array([nan if f.composition else f.h2o_vol_percent for f in _FUELS]),
+        "condensing": np.array([f.condensing for f in _FUELS], dtype=bool),
+    }
+    for k, part in enumerate(("co2", "h2o", "n2", "excess_o2", "excess_n2")):
+        table[part] = np.array([f.composition[k] if f.composition else nan for f in _FUELS])
+    return table
+
+def fuel_ids(values):
+    """
+    燃料列 (燃料名或整数 ID) -> ID 数组；未知燃料名映射为 UNKNOWN_FUEL.id
+    """
+    import numpy as np
+
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iu":
+        if arr.size and (arr.min() < 0 or arr.max() >= len(_FUELS)):
+            raise ValueError(f"燃料 ID 超出范围 (0 ~ {len(_FUELS) - 1})")
+        return arr.astype(np.intp)
+    # 先去重再逐个查表 (通常只有少数几种燃料)
+    names, inverse = np.unique(arr.astype(str), return_inverse=True)
+    lookup = np.array([get_fuel(str(name)).id for name in names], dtype=np.intp)
+    return lookup[inverse].reshape(arr.shape)
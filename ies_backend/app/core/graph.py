@@ -0,0 +1,252 @@
+# app/core/graph.py
+# 方案C 计算的依赖图 (DAG)：每个中间量是一个命名节点，声明所依赖的请求字段 / 上游节点，结果按节点缓存
+# 会话 (SchemeCSession) 保存上一次的输入与节点值，再次求解时只重算受变化字段影响的节点:
+#   - 只改 altitude: 只重算大气压力、析水量 (只在未收敛时需要) 与结果，根与目标负荷复用
+#   - 只改 sink_flow_kg_h: 重算目标负荷、根与结果，露点 / H2O 分数 / 大气压力复用
+# 节点按需求值 (未收敛分支才会用到的析水量在收敛时不计算)；节点读取未声明的依赖会直接报错
+# 结果与 SchemeCSolver.solve 逐字节一致
+# 会话表 (SessionStore) 按会话 ID 保存 SchemeCSession，超出上限时淘汰最久未用的会话
+
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from app.core.fuels import fuel_derived, get_fuel
+from app.core.physics import calculate_atmospheric_pressure
+from app.core.solver import SchemeCSolver
+from app.validation import SCHEME_C_FIELDS
+
+class Node:
+    __slots__ = ("name", "inputs", "func", "doc")
+
+    def __init__(self, name, inputs, func, doc=""):
+        """
+        inputs: 依赖的请求字段 / 节点名；func(get) 通过 get(名称) 读取依赖
+        """
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.func = func
+        self.doc = doc
+
+class Graph:
+    def __init__(self, fields, nodes):
+        """
+        fields: 输入字段名；nodes: Node 列表 (须按拓扑序给出，只能依赖前面的节点)
+        """
+        self.fields = tuple(fields)
+        self.nodes = {}
+        for node in nodes:
+            if node.name in self.nodes or node.name in self.fields:
+                raise ValueError(f"节点名重复: {node.name}")
+            unknown = [name for name in node.inputs if name not in self.fields and name not in self.nodes]
+            if unknown:
+                raise ValueError(f"节点 {node.name} 的依赖未定义 (或不在其前): {', '.join(unknown)}")
+            self.nodes[node.name] = node
+        # 字段 -> 受影响的节点 (传递闭包，按拓扑序)
+        self.affected = {}
+        for field in self.fields:
+            dirty = {field}
+            for node in self.nodes.values():
+                if dirty.intersection(node.inputs):
+                    dirty.add(node.name)
+            self.affected[field] = tuple(name for name in self.nodes if name in dirty)
+
+    def describe(self) -> dict:
+        return {
+            "fields": list(self.fields),
+            "nodes": [{"name": node.name, "inputs": list(node.inputs), "doc": node.doc} for node in self.nodes.values()],
+        }
+
+class GraphState:
+    """
+    一组输入上的节点缓存
+    """
+    def __init__(self, graph):
+        self.graph = graph
+        self.inputs = {}
+        self.values = {}
+
+    def update(self, fields) -> list:
+        """
+        写入新的输入，清除受影响节点的缓存，返回变化的字段名
+        """
+        changed = [name for name in self.graph.fields
+                   if name not in self.inputs or self.inputs[name] != fields[name]]
+        for name in changed:
+            self.inputs[name] = fields[name]
+            for node in self.graph.affected[name]:
+                self.values.pop(node, None)
+        return changed
+
+    def evaluate(self, name, log=None):
+        """
+        节点值 (按需求值上游节点)；log 为 {"recomputed": [], "reused": []} 时记录本次求值经过的节点
+        """
+        if name in self.graph.fields:
+            return self.inputs[name]
+        if name in self.values:
+            if log is not None and name not in log["recomputed"] and name not in log["reused"]:
+                log["reused"].append(name)
+            return self.values[name]
+
+        node = self.graph.nodes[name]
+
+        def get(dependency):
+            if dependency not in node.inputs:
+                raise KeyError(f"节点 {name} 读取了未声明的依赖 {dependency}")
+            return self.evaluate(dependency, log)
+
+        value = node.func(get)
+        self.values[name] = value
+        if log is not None:
+            log["recomputed"].append(name)
+        return value
+
+def _view(get, names):
+    """
+    只含指定字段的请求视图 (传给 SchemeCSolver 的内部方法，读取其余字段会报 AttributeError)
+    """
+    return SimpleNamespace(**{name: get(name) for name in names})
+
+_COP_FIELDS = ("efficiency", "mode", "strategy", "recovery_type", "is_manual_cop", "manual_cop")
+_SOURCE_FIELDS = ("source_in_temp", "source_out_target", "source_flow_vol", "fuel_type")
+
+def scheme_c_graph(solver) -> Graph:
+    """
+    方案C 依赖图 (节点函数调用 solver 的内部方法，保证与 SchemeCSolver.solve 一致)
+    """
+    def root(get):
+        req = _view(get, _SOURCE_FIELDS + _COP_FIELDS)
+        start = time.perf_counter()
+        result, evaluations = solver._find_root(req, get("effective_sink_target"), get("q_sink_target_kw"))
+        cop, q_source_avail = evaluations[result["root"]][:2] if result["converged"] else (None, None)
+        return result, cop, q_source_avail, (time.perf_counter() - start) * 1000.0
+
+    def water_condensation(get):
+        if not get("fuel").condensing:
+            return None
+        req = _view(get, ("source_in_temp", "source_flow_vol"))
+        return solver._condensation(
+            req, max(5.0, get("source_out_target")), get("fuel_derived"), get("atmospheric_pressure")
+        )
+
+    def result(get):
+        found, cop, q_source_avail, _ = get("root")
+        if found["converged"]:
+            return solver._converged_result(found, cop, q_source_avail, get("q_sink_target_kw"))
+        req = _view(get, _SOURCE_FIELDS + _COP_FIELDS + ("sink_in_temp", "sink_flow_kg_h"))
+        return solver._fallback_result(
+            req, found, get("effective_sink_target"), get("q_sink_target_kw"),
+            water_condensation=get("water_condensation"),
+        )
+
+    return Graph([name for name, _, _ in SCHEME_C_FIELDS], [
+        Node("effective_sink_target", ("sink_out_target", "mode"),
+             lambda get: solver._effective_sink_target(_view(get, ("sink_out_target", "mode"))),
+             "有效目标水温 (蒸汽预热模式限制 98°C)"),
+        Node("q_sink_target_kw", ("effective_sink_target", "sink_in_temp", "sink_flow_kg_h", "mode"),
+             lambda get: solver._sink_load(_view(get, ("sink_in_temp", "sink_flow_kg_h", "mode")),
+                                           get("effective_sink_target")),
+             "目标负荷 (kW)"),
+        Node("fuel", ("fuel_type",), lambda get: get_fuel(get("fuel_type")), "燃料物性记录"),
+        Node("fuel_derived", ("fuel", "excess_air"), lambda get: fuel_derived(get("fuel"), get("excess_air")),
+             "修正露点与烟气 H2O 体积分数"),
+        Node("actual_dew_point", ("fuel_derived",), lambda get: get("fuel_derived").dew_point, "修正露点 (°C)"),
+        Node("h2o_vol_percent", ("fuel_derived",), lambda get: get("fuel_derived").h2o_vol_percent,
+             "烟气 H2O 体积分数 (%)"),
+        Node("atmospheric_pressure", ("altitude",), lambda get: calculate_atmospheric_pressure(get("altitude")),
+             "当地大气压力 (kPa)"),
+        Node("max_source_potential", ("source_in_temp", "source_flow_vol", "fuel_type"),
+             lambda get: solver.calculate_flue_heat_release(
+                 get("source_in_temp"), 5.0, get("source_flow_vol"), get("fuel_type")),
+             "排烟降至 5°C 时的最大可回收热量 (kW)"),
+        Node("root", ("effective_sink_target", "q_sink_target_kw") + _SOURCE_FIELDS + _COP_FIELDS, root,
+             "能量平衡求根 (排烟温度、根处 COP 与可供热量)"),
+        Node("water_condensation",
+             ("fuel", "fuel_derived", "atmospheric_pressure", "source_in_temp", "source_out_target", "source_flow_vol"),
+             water_condensation, "目标排烟温度下的析水量 (仅未收敛时使用)"),
+        Node("result", ("root", "effective_sink_target", "q_sink_target_kw", "water_condensation",
+                        "sink_in_temp", "sink_flow_kg_h") + _SOURCE_FIELDS + _COP_FIELDS, result,
+             "与 SchemeCSolver.solve 相同的结果"),
+    ])
+
+# 可在会话结果中返回取值的标量节点
+VALUE_NODES = ("effective_sink_target", "q_sink_target_kw", "actual_dew_point", "h2o_vol_percent",
+               "atmospheric_pressure", "max_source_potential")
+
+class SchemeCSession:
+    def __init__(self, solver=None):
+        self.solver = solver or SchemeCSolver()
+        self.graph = scheme_c_graph(self.solver)
+        self.state = GraphState(self.graph)
+        self.solves = 0
+        self._lock = threading.Lock()
+
+    def solve(self, req, values=()) -> dict:
+        """
+        求解并返回 {"result", "values", "changed", "recomputed", "reused"}
+        values: 需要返回取值的中间节点 (见 VALUE_NODES)
+        changed: 与上一次相比变化的字段；recomputed / reused: 本次重算 / 复用的节点 (按求值顺序)
+        """
+        unknown = [name for name in values if name not in VALUE_NODES]
+        if unknown:
+            raise ValueError(f"不支持的节点: {', '.join(unknown)} (可选: {', '.join(VALUE_NODES)})")
+        fields = {name: getattr(req, name) for name in self.graph.fields}
+        with self._lock:
+            changed = self.state.update(fields)
+            log = {"recomputed": [], "reused": []}
+            result = dict(self.state.evaluate("result", log))
+            node_values = {name: self.state.evaluate(name, log) for name in values}
+            self.solves += 1
+        if "root" in log["recomputed"]:
+            found, _, _, wall_time_ms = self.state.values["root"]
+            self.solver.telemetry.record({
+                "iterations": found["iterations"],
+                "converged": found["converged"],
+                "fallback": not found["converged"],
+                "bracketed": found["bracketed"],
+                "warm_start": False,
+                "source_limited": result.get("is_source_limited", False),
+                "wall_time_ms": round(wall_time_ms, 4),
+            })
+        return {"result": result, "values": node_values, "changed": changed, **log}
+
+    def nodes(self) -> dict:
+        """
+        当前输入与已缓存的节点名
+        """
+        with self._lock:
+            return {"inputs": dict(self.state.inputs), "cached": list(self.state.values), "solves": self.solves}
+
+class SessionStore:
+    def __init__(self, maxsize=256, solver=None):
+        self.maxsize = maxsize
+        self.solver = solver or SchemeCSolver()
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id) -> SchemeCSession:
+        """
+        取出会话 (不存在时新建)
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = SchemeCSession(self.solver)
+                while len(self._sessions) > self.maxsize:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def find(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def discard(self, session_id) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        return len(self._sessions)
@@ -0,0 +1,388 @@
+# app/core/jobs.py
+# 长时间任务队列：大规模研究 (study) 与全年逐时模拟 (annual) 超出单次 HTTP / Serverless 调用时限时，
+# 提交为任务在后台执行，结果写入本地 SQLite，按页或流式取回
+#
+#   - JobStore: 任务、输入与结果三张表 (WAL 模式，Web 进程与独立的 run_jobs.py 进程可同时访问)
+#   - JobWorker: 认领任务后按块执行，每块的结果与检查点 (已完成条数、热启动状态、累计量) 在同一事务中提交
+#     执行期间后台线程定期刷新心跳 (与块大小无关)；进程崩溃后心跳停止，租约 (lease) 过期的任务被重新认领，
+#     从最后一个检查点继续，已提交的结果不重算
+#   - 取消: 排队中的任务直接取消；运行中的任务在下一个检查点停止，已完成的结果保留
+# 不依赖外部消息队列，单机即可运行
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from app.core.annual import AnnualSimulation
+from app.core.study import DEFAULT_CHUNK_SIZE, StudyRunner
+
+JOB_KINDS = ("study", "annual")
+JOB_STATUSES = ("queued", "running", "done", "failed", "cancelled")
+DEFAULT_LEASE = 120.0  # 秒，运行中的任务超过此时间没有心跳即视为崩溃 (心跳间隔为租约的 1/4)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY, kind TEXT, status TEXT, params TEXT,
+    total INTEGER, completed INTEGER, checkpoint TEXT, summary TEXT, error TEXT,
+    cancel_requested INTEGER DEFAULT 0, owner TEXT, heartbeat REAL, attempts INTEGER DEFAULT 0,
+    created REAL, updated REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+CREATE TABLE IF NOT EXISTS job_inputs (
+    job_id TEXT, idx INTEGER, item TEXT, PRIMARY KEY (job_id, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT, idx INTEGER, record TEXT, PRIMARY KEY (job_id, idx)
+) WITHOUT ROWID;
+"""
+
+_JOB_COLUMNS = ("id", "kind", "status", "params", "total", "completed", "checkpoint", "summary", "error",
+                "cancel_requested", "owner", "heartbeat", "attempts", "created", "updated")
+
+class JobStore:
+    def __init__(self, path):
+        """
+        path: SQLite 文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30.0, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def _row(self, job_id):
+        row = self._db.execute(f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(zip(_JOB_COLUMNS, row)) if row else None
+
+    @staticmethod
+    def _public(job) -> dict:
+        total = job["total"]
+        return {
+            "id": job["id"],
+            "kind": job["kind"],
+            "status": job["status"],
+            "total": total,
+            "completed": job["completed"],
+            "progress": round(job["completed"] / total, 4) if total else 1.0,
+            "cancel_requested": bool(job["cancel_requested"]),
+            "attempts": job["attempts"],
+            "params": json.loads(job["params"]),
+            "summary": json.loads(job["summary"]) if job["summary"] else None,
+            "error": job["error"],
+            "created": job["created"],
+            "updated": job["updated"],
+        }
+
+    def submit(self, kind, items, params=None) -> dict:
+        """
+        新建任务 (排队)；items: 每条输入 (dict)，按序号保存
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"不支持的任务类型: {kind} (可选: {', '.join(JOB_KINDS)})")
+        if not items:
+            raise ValueError("任务没有输入条目")
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT INTO jobs (id, kind, status, params, total, completed, created, updated) "
+                    "VALUES (?, ?, 'queued', ?, ?, 0, ?, ?)",
+                    (job_id, kind, json.dumps(params or {}), len(items), now, now),
+                )
+                self._db.executemany(
+                    "INSERT INTO job_inputs (job_id, idx, item) VALUES (?, ?, ?)",
+                    ((job_id, idx, json.dumps(item, separators=(",", ":"))) for idx, item in enumerate(items)),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            return self._public(self._row(job_id))
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._row(job_id)
+        return self._public(job) if job else None
+
+    def list(self, status=None, limit=50) -> list:
+        query = f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs"
+        args = ()
+        if status:
+            query += " WHERE status = ?"
+            args = (status,)
+        query += " ORDER BY created DESC LIMIT ?"
+        with self._lock:
+            rows = self._db.execute(query, args + (limit,)).fetchall()
+        return [self._public(dict(zip(_JOB_COLUMNS, row))) for row in rows]
+
+    def cancel(self, job_id):
+        """
+        排队中的任务直接取消，运行中的任务标记为待取消 (在下一个检查点停止)
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE jobs SET status = 'cancelled', updated = ? WHERE id = ? AND status = 'queued'",
+                             (now, job_id))
+            self._db.execute("UPDATE jobs SET cancel_requested = 1, updated = ? WHERE id = ? AND status = 'running'",
+                             (now, job_id))
+            job = self._row(job_id)
+        return self._public(job) if job else None
+
+    def results(self, job_id, offset=0, limit=1000) -> list:
+        """
+        已提交的结果 (按序号)
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT record FROM job_results WHERE job_id = ? AND idx >= ? ORDER BY idx LIMIT ?",
+                (job_id, offset, limit),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_results(self, job_id, offset=0, page=1000):
+        """
+        生成器：按页读取全部已提交的结果 (NDJSON 文本行，不重新编码)
+        """
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT idx, record FROM job_results WHERE job_id = ? AND idx >= ? ORDER BY idx LIMIT ?",
+                    (job_id, offset, page),
+                ).fetchall()
+            for _, record in rows:
+                yield record + "\n"
+            if len(rows) < page:
+                return
+            offset = rows[-1][0] + 1
+
+    def iter_inputs(self, job_id, start=0, page=1000):
+        """
+        生成器：从 start 起按序号读取输入 (JSON 文本)
+        """
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT idx, item FROM job_inputs WHERE job_id = ? AND idx >= ? ORDER BY idx LIMIT ?",
+                    (job_id, start, page),
+                ).fetchall()
+            for _, item in rows:
+                yield item
+            if len(rows) < page:
+                return
+            start = rows[-1][0] + 1
+
+    # === 执行端 ===
+    def claim(self, owner, lease=DEFAULT_LEASE):
+        """
+        认领最早的排队任务，或租约已过期 (执行进程崩溃) 的运行中任务；没有可认领的任务时返回 None
+        返回内部记录 (含 params / checkpoint 的 JSON 文本)
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' OR (status = 'running' AND heartbeat < ?) "
+                    "ORDER BY created LIMIT 1",
+                    (now - lease,),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE jobs SET status = 'running', owner = ?, heartbeat = ?, updated = ?, "
+                        "attempts = attempts + 1 WHERE id = ?",
+                        (owner, now, now, row[0]),
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            return self._row(row[0]) if row is not None else None
+
+    def heartbeat(self, job_id, owner) -> bool:
+        """
+        刷新租约；任务已不属于 owner (被接管或已结束) 时返回 False
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                (now, job_id, owner),
+            )
+            return cursor.rowcount > 0
+
+    def checkpoint(self, job_id, owner, start, records, completed, checkpoint=None) -> str:
+        """
+        在同一事务中写入一块结果 (序号从 start 起) 与检查点
+        返回 "continue"、"cancel" (已请求取消) 或 "lost" (租约已被其他执行进程接管，本块不写入)
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute("SELECT owner, cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is None or row[0] != owner:
+                    self._db.execute("ROLLBACK")
+                    return "lost"
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO job_results (job_id, idx, record) VALUES (?, ?, ?)",
+                    ((job_id, start + k, json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+                     for k, record in enumerate(records)),
+                )
+                self._db.execute(
+                    "UPDATE jobs SET completed = ?, checkpoint = ?, heartbeat = ?, updated = ? WHERE id = ?",
+                    (completed, json.dumps(checkpoint) if checkpoint is not None else None, now, now, job_id),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return "cancel" if row[1] else "continue"
+
+    def finish(self, job_id, owner, status, summary=None, error=None):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, summary = ?, error = ?, owner = NULL, updated = ? "
+                "WHERE id = ? AND owner = ?",
+                (status, json.dumps(summary) if summary is not None else None, error, now, job_id, owner),
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class JobWorker:
+    def __init__(self, store, workers=1, executor=None, lease=DEFAULT_LEASE, poll=1.0):
+        """
+        workers / executor: study 任务的进程数与共享进程池 (见 StudyRunner)；workers <= 1 且无 executor 时在本线程执行
+        lease: 租约 (秒)；poll: 没有任务时的轮询间隔 (秒)
+        """
+        self.store = store
+        self.workers = workers
+        self.executor = executor
+        self.lease = lease
+        self.poll = poll
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def run_once(self) -> bool:
+        """
+        认领并执行一个任务；没有可认领的任务时返回 False
+        """
+        job = self.store.claim(self.owner, self.lease)
+        if job is None:
+            return False
+        params = json.loads(job["params"])
+        checkpoint = json.loads(job["checkpoint"]) if job["checkpoint"] else None
+        # 单块耗时可能超过租约 (块大小由提交方决定)，执行期间由后台线程保持心跳
+        done = threading.Event()
+        keeper = threading.Thread(target=self._keep_alive, args=(job["id"], done), name="ies-job-heartbeat",
+                                  daemon=True)
+        keeper.start()
+        try:
+            if job["kind"] == "study":
+                outcome, summary = self._run_study(job, params, checkpoint)
+            else:
+                outcome, summary = self._run_annual(job, params, checkpoint)
+        except Exception as e:
+            self.store.finish(job["id"], self.owner, "failed", error=str(e))
+            return True
+        finally:
+            done.set()
+            keeper.join()
+        if outcome != "lost":
+            self.store.finish(job["id"], self.owner, "cancelled" if outcome == "cancel" else "done", summary)
+        return True
+
+    def _keep_alive(self, job_id, done):
+        while not done.wait(self.lease / 4):
+            if not self.store.heartbeat(job_id, self.owner):
+                return
+
+    def _run_study(self, job, params, checkpoint):
+        completed = job["completed"]
+        errors = checkpoint["errors"] if checkpoint else 0
+        runner = StudyRunner(
+            workers=self.workers, chunk_size=params.get("chunk_size", DEFAULT_CHUNK_SIZE), ordered=True,
+            vectorized=params.get("vectorized", False), executor=self.executor,
+        )
+        chunks = runner.run(self.store.iter_inputs(job["id"], completed), start=completed)
+        outcome = "continue"
+        try:
+            for records in chunks:
+                errors += sum("error" in record for record in records)
+                outcome = self.store.checkpoint(job["id"], self.owner, completed, records,
+                                                completed + len(records), {"errors": errors})
+                completed += len(records)
+                if outcome != "continue":
+                    runner.cancel()
+                    break
+        finally:
+            chunks.close()
+        return outcome, {"items": completed, "errors": errors}
+
+    def _run_annual(self, job, params, checkpoint):
+        completed = job["completed"]
+        sim = AnnualSimulation(
+            base=params.get("base"), warm_start=params.get("warm_start", True),
+            step_hours=params.get("step_hours", 1.0),
+        )
+        if checkpoint:
+            # 从检查点恢复热启动状态与年度累计量
+            vars(sim.state).update(checkpoint["state"])
+            vars(sim.aggregates).update(checkpoint["aggregates"])
+        chunk_size = max(1, int(params.get("chunk_size", DEFAULT_CHUNK_SIZE)))
+        outcome = "continue"
+        records = []
+        for item in self.store.iter_inputs(job["id"], completed):
+            hour = completed + len(records)
+            row = json.loads(item)
+            records.append(sim.step(hour, row) if isinstance(row, dict) else sim.reject("时序行必须是 JSON 对象"))
+            if len(records) >= chunk_size:
+                outcome = self._commit_annual(job, sim, completed, records)
+                completed += len(records)
+                records = []
+                if outcome != "continue":
+                    break
+        if records and outcome == "continue":
+            outcome = self._commit_annual(job, sim, completed, records)
+        return outcome, sim.summary()
+
+    def _commit_annual(self, job, sim, start, records):
+        checkpoint = {"state": vars(sim.state), "aggregates": vars(sim.aggregates)}
+        return self.store.checkpoint(job["id"], self.owner, start, records, start + len(records), checkpoint)
+
+    def run_forever(self):
+        """
+        循环认领任务，直到 stop()
+        """
+        while not self._stop.is_set():
+            if not self.run_once():
+                self._wake.wait(self.poll)
+                self._wake.clear()
+
+    def start(self):
+        """
+        在后台线程中运行 (重复调用只启动一次)
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name="ies-job-worker", daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        """
+        提交新任务后调用，立即开始认领
+        """
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
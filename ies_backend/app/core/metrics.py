@@ -0,0 +1,218 @@
+# app/core/metrics.py
+# /metrics 接口：Prometheus 文本格式 (0.0.4)，不依赖 prometheus_client
+#   - 请求: 按路由模板 (如 /jobs/{job_id}) 的请求计数与延迟直方图、在途请求数
+#   - 求解器 / 结果缓存 / 进程池 / 代理模型: 抓取时读取各自已有的计数 (SolverTelemetry.snapshot、stats())
+#   - 进程: 常驻内存、虚拟内存、峰值内存、CPU 时间
+# 请求指标由 ASGI 中间件在事件循环线程中更新 (单线程，无锁)，每个请求的开销为两次 perf_counter 与一次 bisect；
+# 多个 uvicorn worker 时各进程分别计数，由 Prometheus 按实例汇总
+import bisect
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 请求延迟桶上界 (秒)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+UNMATCHED_ROUTE = "unmatched"  # 未匹配任何路由的请求 (404 等) 归为一类，避免标签基数随路径无限增长
+
+_START_TIME = time.time()
+
+class Histogram:
+    """
+    固定桶直方图 (各桶存非累计计数，输出时累加)
+    """
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class RequestMetrics:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.latency = {}    # (method, route) -> Histogram
+        self.responses = {}  # (method, route, status) -> 次数
+        self.in_progress = 0
+
+    def observe(self, method, route, status, seconds):
+        key = (method, route)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(self.buckets)
+        histogram.observe(seconds)
+        key = (method, route, status)
+        self.responses[key] = self.responses.get(key, 0) + 1
+
+class MetricsMiddleware:
+    """
+    ASGI 中间件：记录每个 HTTP 请求的路由、状态码与耗时
+    流式响应的耗时计到最后一块发送完毕；未处理的异常按 500 计
+    """
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics = self.metrics
+        metrics.in_progress += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.in_progress -= 1
+            # 路由匹配后 FastAPI 在 scope 中写入 route
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            metrics.observe(scope["method"], route, status, elapsed)
+
+def process_memory() -> dict:
+    """
+    本进程的 {"resident", "virtual", "max_resident"} (字节)
+    Linux 读 /proc/self/statm；macOS 只有峰值 (getrusage)；取不到的项不返回
+    """
+    memory = {}
+    if resource is not None:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss: Linux 为 KB，macOS 为字节
+        memory["max_resident"] = maxrss if sys.platform == "darwin" else maxrss * 1024
+    try:
+        with open("/proc/self/statm") as f:
+            pages = f.read().split()
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        memory["virtual"] = int(pages[0]) * page_size
+        memory["resident"] = int(pages[1]) * page_size
+    except (OSError, ValueError, IndexError):
+        pass
+    return memory
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _labels(**labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Writer:
+    def __init__(self):
+        self.lines = []
+
+    def metric(self, name, kind, help_text, samples):
+        """
+        samples: [(标签 dict, 值)]
+        """
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self.lines.append(f"{name}{_labels(**labels)} {_number(value)}")
+
+    def histogram(self, name, help_text, series):
+        """
+        series: [(标签 dict, 桶上界, 非累计计数, 总和)]
+        """
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} histogram")
+        for labels, buckets, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(list(buckets) + [float("inf")], counts):
+                cumulative += count
+                self.lines.append(f"{name}_bucket{_labels(**labels, le=_number(bound))} {cumulative}")
+            self.lines.append(f"{name}_sum{_labels(**labels)} {_number(float(total))}")
+            self.lines.append(f"{name}_count{_labels(**labels)} {cumulative}")
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+def render_metrics(requests=None, solver=None, cache=None, executor=None, surrogate=None) -> str:
+    """
+    requests: RequestMetrics；solver: SolverTelemetry.snapshot(traces=False)
+    cache / executor / surrogate: ResultCache.stats()、SolveDispatcher.stats()、代理模型的 hits / fallbacks / outside
+    未提供的部分不输出
+    """
+    w = _Writer()
+    if requests is not None:
+        w.metric("ies_http_requests_total", "counter", "HTTP 请求数 (按路由模板与状态码)",
+                 [({"method": m, "route": r, "status": s}, n) for (m, r, s), n in sorted(requests.responses.items())])
+        w.histogram("ies_http_request_duration_seconds", "HTTP 请求耗时 (秒，按路由模板)",
+                    [({"method": m, "route": r}, h.buckets, list(h.counts), h.sum)
+                     for (m, r), h in sorted(requests.latency.items())])
+        w.metric("ies_http_requests_in_progress", "gauge", "处理中的 HTTP 请求数",
+                 [({}, requests.in_progress)])
+
+    if solver is not None:
+        solves = solver["solves"]
+        w.metric("ies_solver_solves_total", "counter", "SchemeCSolver.solve 求解次数", [({}, solves)])
+        w.metric("ies_solver_converged_total", "counter", "收敛到热汇目标的求解次数",
+                 [({}, solver["converged"])])
+        w.metric("ies_solver_fallback_total", "counter", "未收敛、回退热源限制解的求解次数 (no_root: 区间内无根)",
+                 [({"reason": "not_converged"}, solver["fallback"] - solver["fallback_no_root"]),
+                  ({"reason": "no_root"}, solver["fallback_no_root"])])
+        w.metric("ies_solver_source_limited_total", "counter", "热源限制的求解次数",
+                 [({}, solver["source_limited"])])
+        w.metric("ies_solver_source_limited_ratio", "gauge", "热源限制的求解比例",
+                 [({}, solver["source_limited"] / solves if solves else 0.0)])
+        w.histogram("ies_solver_iterations", "单次求解的迭代次数",
+                    [({}, solver["iterations_histogram"]["buckets"], solver["iterations_histogram"]["counts"],
+                      solver["iterations_total"])])
+        w.histogram("ies_solver_duration_seconds", "单次求解耗时 (秒)",
+                    [({}, solver["wall_time_histogram"]["buckets"], solver["wall_time_histogram"]["counts"],
+                      solver["wall_time_total_s"])])
+
+    if cache is not None:
+        for name in ("hits", "misses", "disk_hits", "evictions", "expirations"):
+            w.metric(f"ies_cache_{name}_total", "counter", f"结果缓存 {name} 计数",
+                     [({}, cache[name])])
+        w.metric("ies_cache_entries", "gauge", "结果缓存内存条目数", [({}, cache["size"])])
+        w.metric("ies_cache_hit_ratio", "gauge", "结果缓存命中率", [({}, cache["hit_ratio"])])
+
+    if executor is not None:
+        w.metric("ies_executor_workers", "gauge", "单次计算进程池进程数", [({}, executor["workers"])])
+        w.metric("ies_executor_pending", "gauge", "进程池在途求解数 (含排队)",
+                 [({}, executor["pending"])])
+        for name in ("submitted", "completed", "coalesced", "rejected", "errors"):
+            w.metric(f"ies_executor_{name}_total", "counter", f"进程池求解 {name} 计数", [({}, executor[name])])
+
+    if surrogate is not None:
+        w.metric("ies_surrogate_queries_total", "counter", "代理模型查询次数 (hits 命中 / fallbacks 误差界超限回退 / outside 超出信任域)",
+                 [({"outcome": name}, surrogate[name]) for name in ("hits", "fallbacks", "outside")])
+
+    memory = process_memory()
+    for name, help_text in (("resident", "常驻内存"), ("virtual", "虚拟内存"), ("max_resident", "峰值常驻内存")):
+        if name in memory:
+            w.metric(f"process_{name}_memory_bytes", "gauge", f"{help_text} (字节)", [({}, memory[name])])
+    times = os.times()
+    w.metric("process_cpu_seconds_total", "counter", "用户态与内核态 CPU 时间 (秒)",
+             [({}, times.user + times.system)])
+    w.metric("process_start_time_seconds", "gauge", "进程启动时间 (Unix 时间戳，秒)",
+             [({}, _START_TIME)])
+    return w.text()
@@ -0,0 +1,635 @@
+# app/core/network.py
+# 多机组厂站网络求解：多台锅炉汇入共用烟道、多台热泵在热水回路上串联 / 并联
+#
+# 站点由单元 (units) 与流股 (streams) 组成，流股以产生它的单元命名:
+#   boiler     锅炉，产生烟气流股 <id> (燃料、标况烟气量、排烟温度、过量空气系数)
+#   sink       热水回路入口，产生热水流股 <id> (流量、水温)
+#   mixer      混合 inputs 中的同类流股，产生流股 <id> (按流量加权；烟气须为同一燃料)
+#   splitter   按 outputs {流股名: 分率} 拆分 input 流股 (温度不变)
+#   heat_pump  从 source 烟气取热、加热 sink 热水，产生 <id>.flue 与 <id>.water 两个流股
+#              出水达到 target_temp，或烟气降到 min_flue_out (热源限制) 为止
+# 流量 (及烟气的过量空气系数) 由质量守恒线性方程组给出 (允许回流)，未知量为各流股温度
+#
+# 物性沿用单台计算的模型 (app.core.vectorized 中的数组版本，逐元素与标量版一致):
+#   烟气放热 = flue_heat_release(入口, 出口) - flue_heat_release(入口, 入口)
+#            (入口已低于露点时扣除已放出的潜热，级联取热不重复计算)
+#   热泵 COP = cycles.calculate_cop(排烟 - 5, 出水 + 5, ...)，热泵只用于热水 (WATER)
+#   析水量 = water_condensation(出口) - water_condensation(入口)，按海拔修正
+#
+# 求解: 所有站点的流股温度拼成一个向量，一并做阻尼牛顿迭代
+#   - 雅可比矩阵按稀疏结构分组有限差分 (互不共享行的列同时扰动，评估次数 = 分组数，与规模无关)
+#   - 各站点的雅可比块互相独立，同样大小的站点为一组批量求解线性方程组
+#     (不按最大站点填充，代价随各站点规模之和增长)
+#   - 热泵控制方程: 排烟取下限时仍供热不足 (热源限制) 则 排烟 = 下限，否则 出水 = 目标
+#     (与 SchemeCSolver 在区间下端无根时回退到目标排烟温度一致)；牛顿步截断在物理范围内
+
+import numpy as np
+
+from app.core import vectorized as vec
+from app.core.fuels import fuel_derived, get_fuel
+
+UNIT_TYPES = ("boiler", "sink", "mixer", "splitter", "heat_pump")
+MAX_SITES = 1000
+MAX_STREAMS_PER_SITE = 500
+BLOCK_ELEMENTS = 1 << 22    # 牛顿步每批雅可比块的元素数上限 (约 32 MB)
+
+WATER_CP = 4.187            # kJ/(kg·K)，与 physics.estimate_enthalpy 一致
+FLUE_CP_VOL = 0.00038       # kWh/(m3·K)，与 calculate_flue_heat_release 一致
+
+# 方程类型 (每个流股一个方程，行号即流股号)
+_FIXED, _COPY, _MIX, _HP_FLUE, _HP_WATER = range(5)
+
+class SiteModel:
+    """
+    单个站点编译后的结构 (局部流股编号)
+    """
+    def __init__(self, site_id, altitude):
+        self.site_id = site_id
+        self.altitude = altitude
+        self.streams = []           # 流股名
+        self.index = {}             # 流股名 -> 局部编号
+        self.kinds = []             # "flue" / "water"
+        self.units = []             # (单元 dict, 输出流股编号列表)
+
+    def add_stream(self, name, kind):
+        if name in self.index:
+            raise ValueError(f"站点 {self.site_id}: 流股名重复: {name}")
+        self.index[name] = len(self.streams)
+        self.streams.append(name)
+        self.kinds.append(kind)
+        return self.index[name]
+
+def _require(site_id, unit, *names):
+    missing = [name for name in names if unit.get(name) is None]
+    if missing:
+        raise ValueError(f"站点 {site_id}: 单元 {unit.get('id')} ({unit.get('type')}) 缺少: {', '.join(missing)}")
+
+def compile_site(site) -> SiteModel:
+    """
+    校验站点定义并编号流股
+    """
+    site_id = site.get("id", "")
+    model = SiteModel(site_id, float(site.get("altitude", 0.0)))
+    units = site.get("units") or []
+    if not units:
+        raise ValueError(f"站点 {site_id}: 没有单元")
+    seen = set()
+    # 先登记所有输出流股 (允许引用后定义的流股，即回流)
+    for unit in units:
+        kind = unit.get("type")
+        uid = unit.get("id")
+        if not uid or uid in seen:
+            raise ValueError(f"站点 {site_id}: 单元 id 为空或重复: {uid}")
+        seen.add(uid)
+        if kind == "boiler":
+            _require(site_id, unit, "flue_flow_vol", "flue_temp")
+            outputs = [model.add_stream(uid, "flue")]
+        elif kind == "sink":
+            _require(site_id, unit, "flow_kg_h", "temp")
+            outputs = [model.add_stream(uid, "water")]
+        elif kind == "mixer":
+            _require(site_id, unit, "inputs")
+            outputs = [model.add_stream(uid, None)]
+        elif kind == "splitter":
+            _require(site_id, unit, "input", "outputs")
+            fractions = list(unit["outputs"].values())
+            if min(fractions) < 0 or abs(sum(fractions) - 1.0) > 1e-6:
+                raise ValueError(f"站点 {site_id}: 分流器 {uid} 的分率须非负且和为 1")
+            outputs = [model.add_stream(name, None) for name in unit["outputs"]]
+        elif kind == "heat_pump":
+            _require(site_id, unit, "source", "sink", "target_temp")
+            outputs = [model.add_stream(f"{uid}.flue", "flue"), model.add_stream(f"{uid}.water", "water")]
+        else:
+            raise ValueError(f"站点 {site_id}: 单元 {uid} 的类型 {kind} 不受支持 (可选: {', '.join(UNIT_TYPES)})")
+        model.units.append((unit, outputs))
+    if len(model.streams) > MAX_STREAMS_PER_SITE:
+        raise ValueError(f"站点 {site_id}: 流股数超过上限 {MAX_STREAMS_PER_SITE}")
+
+    def stream(uid, name):
+        if name not in model.index:
+            raise ValueError(f"站点 {site_id}: 单元 {uid} 引用了不存在的流股 {name}")
+        return model.index[name]
+
+    # 推断混合器 / 分流器的流股类型，并检查热泵两侧
+    for _ in range(len(units)):
+        for unit, outputs in model.units:
+            if unit["type"] == "mixer":
+                kinds = {model.kinds[stream(unit["id"], name)] for name in unit["inputs"]} - {None}
+            elif unit["type"] == "splitter":
+                kinds = {model.kinds[stream(unit["id"], unit["input"])]} - {None}
+            else:
+                continue
+            if len(kinds) > 1:
+                raise ValueError(f"站点 {site_id}: 单元 {unit['id']} 混合了烟气与热水流股")
+            for k in outputs:
+                model.kinds[k] = next(iter(kinds), None)
+    for unit, _ in model.units:
+        if unit["type"] == "heat_pump":
+            if model.kinds[stream(unit["id"], unit["source"])] != "flue":
+                raise ValueError(f"站点 {site_id}: 热泵 {unit['id']} 的 source 须为烟气流股")
+            if model.kinds[stream(unit["id"], unit["sink"])] != "water":
+                raise ValueError(f"站点 {site_id}: 热泵 {unit['id']} 的 sink 须为热水流股")
+    if None in model.kinds:
+        raise ValueError(f"站点 {site_id}: 无法确定流股类型 (混合器 / 分流器没有来源)")
+    return model
+
+def _site_balance(model):
+    """
+    质量守恒: 返回 (流量, 过量空气系数, 燃料) 三个按局部流股编号的数组 / 列表
+    """
+    n = len(model.streams)
+    A = np.eye(n)
+    b = np.zeros((n, 2))            # 列: 流量, 流量 * 过量空气系数
+    fuel = [None] * n
+    for unit, outputs in model.units:
+        kind = unit["type"]
+        if kind == "boiler":
+            k = outputs[0]
+            b[k] = (unit["flue_flow_vol"], unit["flue_flow_vol"] * unit.get("excess_air", 1.2))
+            fuel[k] = get_fuel(unit.get("fuel_type", "NATURAL_GAS"))
+        elif kind == "sink":
+            b[outputs[0], 0] = unit["flow_kg_h"]
+        elif kind == "mixer":
+            for name in unit["inputs"]:
+                A[outputs[0], model.index[name]] -= 1.0
+        elif kind == "splitter":
+            src = model.index[unit["input"]]
+            for k, fraction in zip(outputs, unit["outputs"].values()):
+                A[k, src] -= fraction
+        else:
+            A[outputs[0], model.index[unit["source"]]] -= 1.0
+            A[outputs[1], model.index[unit["sink"]]] -= 1.0
+    try:
+        solution = np.linalg.solve(A, b)
+    except np.linalg.LinAlgError:
+        raise ValueError(f"站点 {model.site_id}: 流量无法确定 (回流回路没有出口)")
+    flow = solution[:, 0]
+    if (flow < -1e-9).any():
+        raise ValueError(f"站点 {model.site_id}: 流量为负")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        excess_air = np.where(flow > 0, solution[:, 1] / flow, 1.2)
+
+    # 燃料沿流股传播 (混合的烟气须为同一燃料)
+    for _ in range(n):
+        changed = False
+        for unit, outputs in model.units:
+            if unit["type"] == "mixer":
+                sources = [model.index[name] for name in unit["inputs"]]
+            elif unit["type"] == "splitter":
+                sources = [model.index[unit["input"]]] * len(outputs)
+            elif unit["type"] == "heat_pump":
+                sources, outputs = [model.index[unit["source"]]], outputs[:1]
+            else:
+                continue
+            fuels = {fuel[k].id: fuel[k] for k in sources if fuel[k] is not None and flow[k] > 0}
+            if len(fuels) > 1:
+                raise ValueError(f"站点 {model.site_id}: 单元 {unit['id']} 混合了不同燃料的烟气")
+            for k in outputs:
+                if fuels and fuel[k] is None:
+                    fuel[k] = next(iter(fuels.values()))
+                    changed = True
+        if not changed:
+            break
+    return np.maximum(flow, 0.0), excess_air, fuel
+
+class NetworkSolver:
+    def __init__(self, tolerance=0.5, max_iter=50, step=1e-4, temp_tol=1e-6):
+        """
+        tolerance: 热泵能量平衡残差容差 (kW，与 SchemeCSolver 一致)
+        step: 有限差分步长 (°C)；temp_tol: 温度方程 (混合 / 控制) 残差容差 (°C)
+        """
+        self.tolerance = tolerance
+        self.max_iter = max_iter
+        self.step = step
+        self.temp_tol = temp_tol
+
+    # === 组装 ===
+    def _assemble(self, models):
+        """
+        所有站点的流股拼成全局向量，生成各类方程的下标与参数数组
+        """
+        offsets = np.cumsum([0] + [len(m.streams) for m in models])
+        n = int(offsets[-1])
+        eq = np.full(n, _FIXED, dtype=np.int8)
+        fixed_value = np.zeros(n)
+        copy_src = np.zeros(n, dtype=np.intp)
+        mix_row, mix_src, mix_w = [], [], []
+        hp = {name: [] for name in ("unit", "site", "x", "y", "fi", "wi", "target", "xmin", "eff", "is_gen",
+                                    "is_absorption", "manual_cop")}
+        flow = np.zeros(n)
+        excess_air = np.zeros(n)
+        fuels = [None] * n
+        guess = np.zeros(n)
+        sparsity = [[] for _ in range(n)]    # 行 -> 依赖的列
+
+        for s, model in enumerate(models):
+            off = int(offsets[s])
+            f, ea, fu = _site_balance(model)
+            flow[off:off + len(f)] = f
+            excess_air[off:off + len(f)] = ea
+            fuels[off:off + len(f)] = fu
+            for unit, outputs in model.units:
+                rows = [off + k for k in outputs]
+                kind = unit["type"]
+                if kind in ("boiler", "sink"):
+                    fixed_value[rows[0]] = unit["flue_temp"] if kind == "boiler" else unit["temp"]
+                    sparsity[rows[0]] = [rows[0]]
+                elif kind == "splitter":
+                    src = off + model.index[unit["input"]]
+                    for r in rows:
+                        eq[r], copy_src[r] = _COPY, src
+                        sparsity[r] = [r, src]
+                elif kind == "mixer":
+                    r = rows[0]
+                    eq[r] = _MIX
+                    sources = [off + model.index[name] for name in unit["inputs"]]
+                    total = sum(flow[k] for k in sources)
+                    for k in sources:
+                        mix_row.append(r)
+                        mix_src.append(k)
+                        mix_w.append(flow[k] / total if total > 0 else 1.0 / len(sources))
+                    sparsity[r] = [r] + sources
+                else:
+                    x, y = rows
+                    fi, wi = off + model.index[unit["source"]], off + model.index[unit["sink"]]
+                    eq[x], eq[y] = _HP_FLUE, _HP_WATER
+                    sparsity[x] = sparsity[y] = [x, y, fi, wi]
+                    manual = unit.get("is_manual_cop", False) and unit.get("manual_cop", 3.5) > 0
+                    for name, value in (("unit", unit), ("site", s), ("x", x), ("y", y), ("fi", fi), ("wi", wi),
+                                        ("target", unit["target_temp"]), ("xmin", max(5.0, unit.get("min_flue_out", 30.0))),
+                                        ("eff", unit.get("efficiency", 0.55)),
+                                        ("is_gen", unit.get("strategy", "STRATEGY_PRE") == "STRATEGY_GEN"),
+                                        ("is_absorption", unit.get("recovery_type", "MVR") == "ABSORPTION_HP"),
+                                        ("manual_cop", unit.get("manual_cop", 3.5) if manual else np.nan)):
+                        hp[name].append(value)
+
+        # 热泵烟气侧物性 (放热按过量空气系数 1.2 的露点，与 calculate_flue_heat_release 一致)
+        hp = {name: (values if name == "unit" else np.asarray(values)) for name, values in hp.items()}
+        for name in ("site", "x", "y", "fi", "wi"):
+            hp[name] = hp[name].astype(np.intp)
+        hp_fuel = [fuels[k] or get_fuel(None) for k in hp["fi"]]
+        hp["dew"] = np.array([fuel_derived(f, 1.2).dew_point for f in hp_fuel])
+        hp["latent"] = np.array([f.latent_per_m3 for f in hp_fuel])
+        hp["fuel"] = hp_fuel
+        hp["V"] = flow[hp["fi"]]
+        hp["m"] = flow[hp["wi"]]
+
+        system = {
+            "n": n, "offsets": offsets, "eq": eq, "fixed_value": fixed_value, "copy_src": copy_src,
+            "mix_row": np.asarray(mix_row, dtype=np.intp), "mix_src": np.asarray(mix_src, dtype=np.intp),
+            "mix_w": np.asarray(mix_w, dtype=float), "hp": hp, "flow": flow, "excess_air": excess_air,
+            "fuels": fuels, "sparsity": sparsity,
+        }
+        system["fixed_rows"] = np.flatnonzero(eq == _FIXED)
+        system["copy_rows"] = np.flatnonzero(eq == _COPY)
+        system["mix_rows"] = np.flatnonzero(eq == _MIX)
+        system["mix_pos"] = np.searchsorted(system["mix_rows"], system["mix_row"])
+        self._color_columns(system)
+
+        # 初值: 固定流股取给定温度，其余按拓扑顺序多次前推 (热泵先按热源限制: 出水取目标、排烟取下限)
+        guess = np.where(eq == _FIXED, fixed_value, 0.0)
+        system["guess"] = guess
+        for _ in range(max(len(m.units) for m in models)):
+            guess[system["copy_rows"]] = guess[copy_src[system["copy_rows"]]]
+            if len(mix_row):
+                guess[system["mix_rows"]] = np.bincount(
+                    system["mix_pos"], weights=system["mix_w"] * guess[system["mix_src"]],
+                    minlength=len(system["mix_rows"]))
+            if len(hp["x"]):
+                guess[hp["x"]] = np.minimum(hp["xmin"], guess[hp["fi"]])
+                guess[hp["y"]] = np.maximum(hp["target"], guess[hp["wi"]])
+        system["guess"] = guess
+        return system
+
+    @staticmethod
+    def _color_columns(system):
+        """
+        列分组 (贪心着色)：同组的列不共享任何行，可以同时扰动
+        """
+        n = system["n"]
+        rows_of_col = [[] for _ in range(n)]
+        for r, cols in enumerate(system["sparsity"]):
+            for c in cols:
+                rows_of_col[c].append(r)
+        color = np.full(n, -1, dtype=np.intp)
+        row_colors = [set() for _ in range(n)]
+        for c in range(n):
+            used = set().union(*(row_colors[r] for r in rows_of_col[c])) if rows_of_col[c] else set()
+            k = 0
+            while k in used:
+                k += 1
+            color[c] = k
+            for r in rows_of_col[c]:
+                row_colors[r].add(k)
+        nz_row = np.array([r for r, cols in enumerate(system["sparsity"]) for _ in cols], dtype=np.intp)
+        nz_col = np.array([c for cols in system["sparsity"] for c in cols], dtype=np.intp)
+        system["color"] = color
+        system["colors"] = int(color.max()) + 1 if n else 0
+        system["nz_row"], system["nz_col"] = nz_row, nz_col
+
+    # === 残差 ===
+    def _heat_pump_state(self, system, T, x=None, y=None):
+        """
+        热泵各量: (烟气放热 kW, 负荷 kW, COP, 需求系数)；x / y 给定时代替当前排烟 / 出水温度
+        """
+        hp = system["hp"]
+        t_fi, t_wi = T[hp["fi"]], T[hp["wi"]]
+        x = T[hp["x"]] if x is None else x
+        y = T[hp["y"]] if y is None else y
+        release = (vec.flue_heat_release(t_fi, x, hp["V"], hp["dew"], hp["latent"])
+                   - vec.flue_heat_release(t_fi, t_fi, hp["V"], hp["dew"], hp["latent"]))
+        cop, _, _ = vec.cop(x - 5.0, y + 5.0, hp["eff"], False, hp["is_gen"], hp["is_absorption"])
+        cop = np.where(np.isnan(hp["manual_cop"]), cop, hp["manual_cop"])
+        factor = np.where(cop > 1.0, (cop - 1.0) / np.where(cop > 1.0, cop, 1.0), 0.0)
+        load = hp["m"] * WATER_CP * (y - t_wi) / 3600.0
+        return release, load, cop, factor
+
+    def _residual(self, system, T):
+        R = np.empty_like(T)
+        rows = system["fixed_rows"]
+        R[rows] = T[rows] - system["fixed_value"][rows]
+        rows = system["copy_rows"]
+        R[rows] = T[rows] - T[system["copy_src"][rows]]
+        rows = system["mix_rows"]
+        if len(rows):
+            R[rows] = T[rows] - np.bincount(system["mix_pos"], weights=system["mix_w"] * T[system["mix_src"]],
+                                            minlength=len(rows))
+        hp = system["hp"]
+        if len(hp["x"]):
+            release, load, _, factor = self._heat_pump_state(system, T)
+            R[hp["x"]] = release - load * factor
+            # 控制: 出水达到目标 (入口已高于目标时不加热)；排烟降到下限仍不够时 (热源限制) 排烟取下限
+            x_min, y_target = self._bounds(system, T)
+            release, load, _, factor = self._heat_pump_state(system, T, x_min, y_target)
+            limited = release - load * factor < 0
+            R[hp["y"]] = np.where(limited, T[hp["x"]] - x_min, y_target - T[hp["y"]])
+        return R
+
+    @staticmethod
+    def _bounds(system, T):
+        """
+        热泵排烟下限与出水目标 (入口已低于下限 / 高于目标时取入口，即不取热 / 不加热)
+        """
+        hp = system["hp"]
+        return np.minimum(hp["xmin"], T[hp["fi"]]), np.maximum(hp["target"], T[hp["wi"]])
+
+    def _project(self, system, T):
+        """
+        热泵出口限制在物理范围内: 排烟在 [下限, 入口]、出水在 [入口, 目标] 之间
+        (解必然满足；牛顿步越界时截断，避免进入 COP 的钳位平台)
+        """
+        hp = system["hp"]
+        # 串联 / 级联时下游的范围取决于上游截断后的值，重复到不再变化
+        for _ in range(len(hp["x"])):
+            x_min, y_target = self._bounds(system, T)
+            x = np.clip(T[hp["x"]], x_min, T[hp["fi"]])
+            y = np.clip(T[hp["y"]], T[hp["wi"]], y_target)
+            if np.array_equal(x, T[hp["x"]]) and np.array_equal(y, T[hp["y"]]):
+                break
+            T[hp["x"]] = x
+            T[hp["y"]] = y
+        return T
+
+    @staticmethod
+    def _block_layout(system, sizes):
+        """
+        雅可比块按站点大小分组：同样大小的站点堆成 (站点数, n, n) 批量求解，不按最大站点填充
+        各组记录成员站点、各站点的未知量下标，以及组内非零元 (按站点排序) 的 (组内序号, 行, 列)
+        """
+        nz_row, nz_col = system["nz_row"], system["nz_col"]
+        offsets = system["offsets"]
+        nz_site = np.searchsorted(offsets, nz_row, side="right") - 1
+        blocks = []
+        for n in np.unique(sizes):
+            n = int(n)
+            if n == 0:
+                continue
+            members = np.flatnonzero(sizes == n)
+            slot_of = np.full(len(sizes), -1, dtype=np.intp)
+            slot_of[members] = np.arange(len(members))
+            nz = np.flatnonzero(slot_of[nz_site] >= 0)
+            slot = slot_of[nz_site[nz]]
+            blocks.append({
+                "size": n,
+                "sites": members,
+                "cols": offsets[members][:, None] + np.arange(n),
+                "nz": nz,
+                "nz_start": np.searchsorted(slot, np.arange(len(members) + 1)),
+                "slot": slot,
+                "row": nz_row[nz] - offsets[nz_site[nz]],
+                "col": nz_col[nz] - offsets[nz_site[nz]],
+            })
+        system["blocks"] = blocks
+
+    def _jacobian_values(self, system, T, R):
+        """
+        分组有限差分雅可比矩阵的非零元 (与 nz_row / nz_col 对应)
+        """
+        h = self.step
+        color = system["color"]
+        derivative = np.empty((system["colors"], len(T)))
+        for k in range(system["colors"]):
+            derivative[k] = (self._residual(system, T + h * (color == k)) - R) / h
+        return derivative[color[system["nz_col"]], system["nz_row"]]
+
+    @staticmethod
+    def _newton_step(system, values, R, active):
+        """
+        各站点的牛顿步：逐组取出活跃站点的雅可比块批量求解，组内按 BLOCK_ELEMENTS 分批
+        (内存取决于单批大小，与最大站点和站点数无关)；奇异的批次逐站点最小二乘
+        """
+        step = np.zeros(len(R))
+        for block in system["blocks"]:
+            n = block["size"]
+            slots = np.flatnonzero(active[block["sites"]])
+            batch = max(1, BLOCK_ELEMENTS // (n * n))
+            for start in range(0, len(slots), batch):
+                part = slots[start:start + batch]
+                # 各站点非零元在组内连续，拼接区间
+                first, last = block["nz_start"][part], block["nz_start"][part + 1]
+                counts = last - first
+                pick = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+                local = np.repeat(np.arange(len(part)), counts)
+                J = np.zeros((len(part), n, n))
+                J[local, block["row"][pick], block["col"][pick]] = values[block["nz"][pick]]
+                cols = block["cols"][part]
+                rhs = -R[cols]
+                try:
+                    dx = np.linalg.solve(J, rhs[..., None])[..., 0]
+                except np.linalg.LinAlgError:
+                    dx = np.stack([np.linalg.lstsq(J[s], rhs[s], rcond=None)[0] for s in range(len(part))])
+                step[cols] = dx
+        return step
+
+    def _merit(self, system, R, sizes):
+        """
+        各站点的残差范数 (能量方程按烟气显热容量折算为 °C)
+        """
+        hp = system["hp"]
+        scaled = np.abs(R)
+        if len(hp["x"]):
+            scaled[hp["x"]] = scaled[hp["x"]] / np.maximum(hp["V"] * FLUE_CP_VOL, 1e-9)
+        site = np.repeat(np.arange(len(sizes)), sizes)
+        return np.bincount(site, weights=scaled ** 2, minlength=len(sizes))
+
+    def _site_converged(self, system, R, sizes):
+        site = np.repeat(np.arange(len(sizes)), sizes)
+        bad = np.abs(R) > self.temp_tol
+        hp = system["hp"]
+        if len(hp["x"]):
+            bad[hp["x"]] = np.abs(R[hp["x"]]) > self.tolerance
+        return np.bincount(site, weights=bad, minlength=len(sizes)) == 0
+
+    # === 求解 ===
+    def solve(self, sites) -> dict:
+        """
+        批量求解多个站点，返回 {"sites": [...], "summary": {...}}
+        """
+        if not sites:
+            raise ValueError("至少需要一个站点")
+        if len(sites) > MAX_SITES:
+            raise ValueError(f"站点数超过上限 {MAX_SITES}")
+        models = [compile_site(site) for site in sites]
+        system = self._assemble(models)
+        sizes = np.diff(system["offsets"]).astype(np.intp)
+        site_of = np.repeat(np.arange(len(sizes)), sizes)
+        self._block_layout(system, sizes)
+
+        T = system["guess"].copy()
+        R = self._residual(system, T)
+        merit = self._merit(system, R, sizes)
+        done = self._site_converged(system, R, sizes)
+        iterations = np.zeros(len(sizes), dtype=np.intp)
+        stalled = np.zeros(len(sizes), dtype=bool)
+        evaluations = 1
+        for _ in range(self.max_iter):
+            active = ~(done | stalled)
+            if not active.any():
+                break
+            values = self._jacobian_values(system, T, R)
+            evaluations += system["colors"]
+            step = self._newton_step(system, values, R, active)
+
+            # 回溯线搜索 (各站点独立减半步长)
+            alpha = np.ones(len(sizes))
+            pending = active.copy()
+            for _ in range(12):
+                trial = self._project(system, T + alpha[site_of] * step)
+                R_trial = self._residual(system, trial)
+                evaluations += 1
+                merit_trial = self._merit(system, R_trial, sizes)
+                accept = pending & (merit_trial <= merit * (1.0 - 1e-4 * alpha) + 1e-12)
+                take = accept[site_of]
+                T[take] = trial[take]
+                R[take] = R_trial[take]
+                merit[accept] = merit_trial[accept]
+                pending &= ~accept
+                if not pending.any():
+                    break
+                alpha[pending] *= 0.5
+            # 线搜索失败或步长极小 (COP 按 0.01 取整，残差有台阶)：停止该站点
+            step_size = np.zeros(len(sizes))
+            np.maximum.at(step_size, site_of, np.abs(alpha[site_of] * step))
+            stalled |= active & (pending | (step_size < 1e-9))
+            iterations[active] += 1
+            done = self._site_converged(system, R, sizes)
+
+        return self._results(models, system, T, R, sizes, done, iterations, evaluations)
+
+    # === 结果 ===
+    def _results(self, models, system, T, R, sizes, done, iterations, evaluations):
+        hp = system["hp"]
+        flow = system["flow"]
+        release, load, cop, _ = self._heat_pump_state(system, T)
+        t_fi, x, t_wi, y = T[hp["fi"]], T[hp["x"]], T[hp["wi"]], T[hp["y"]]
+        power = load / cop
+        # 热源限制: 出水未达目标 (与 SchemeCSolver 一致，允许 5% 负荷误差)
+        target_load = hp["m"] * WATER_CP * (np.maximum(hp["target"], t_wi) - t_wi) / 3600.0
+        limited = load < target_load * 0.95
+        water = self._condensation(models, system, t_fi, x)
+        offsets = system["offsets"]
+
+        sites = []
+        for s, model in enumerate(models):
+            off = int(offsets[s])
+            units = []
+            for j in np.flatnonzero(hp["site"] == s):
+                unit = hp["unit"][j]
+                record = {
+                    "id": unit["id"],
+                    "flue_in_temp": round(float(t_fi[j]), 2),
+                    "flue_out_temp": round(float(x[j]), 2),
+                    "water_in_temp": round(float(t_wi[j]), 2),
+                    "water_out_temp": round(float(y[j]), 2),
+                    "flue_flow_vol": round(float(hp["V"][j]), 1),
+                    "water_flow_kg_h": round(float(hp["m"][j]), 1),
+                    "load_kw": round(float(load[j]), 1),
+                    "source_kw": round(float(release[j]), 1),
+                    "power_kw": round(float(power[j]), 1),
+                    "cop": float(cop[j]),
+                    "is_source_limited": bool(limited[j]),
+                    "residual": round(float(R[hp["x"][j]]), 3),
+                }
+                if water[j] is not None:
+                    record["water_condensation"] = water[j]
+                units.append(record)
+            total_load = sum(u["load_kw"] for u in units)
+            total_power = sum(u["power_kw"] for u in units)
+            sites.append({
+                "id": model.site_id,
+                "status": "converged" if done[s] else "not_converged",
+                "iterations": int(iterations[s]),
+                "heat_pumps": units,
+                "streams": {
+                    name: {"kind": model.kinds[k], "temp": round(float(T[off + k]), 2),
+                           "flow": round(float(flow[off + k]), 1)}
+                    for k, name in enumerate(model.streams)
+                },
+                "totals": {
+                    "load_kw": round(total_load, 1),
+                    "source_kw": round(sum(u["source_kw"] for u in units), 1),
+                    "power_kw": round(total_power, 1),
+                    "cop": round(total_load / total_power, 2) if total_power > 0 else None,
+                    "condensed_water": round(sum(u.get("water_condensation", {}).get("condensed_water", 0.0)
+                                                 for u in units), 2),
+                },
+            })
+        return {
+            "sites": sites,
+            "summary": {
+                "sites": len(sites),
+                "converged": int(done.sum()),
+                "unknowns": int(system["n"]),
+                "jacobian_groups": system["colors"],
+                "residual_evaluations": int(evaluations),
+                "iterations_max": int(iterations.max()) if len(iterations) else 0,
+            },
+        }
+
+    @staticmethod
+    def _condensation(models, system, t_fi, x):
+        """
+        各热泵的析水量 (kg/h)：出口与入口析水量之差，电能热源为 None
+        """
+        hp = system["hp"]
+        fi = hp["fi"]
+        ea = system["excess_air"][fi]
+        dew = np.array([fuel_derived(f, float(a)).dew_point for f, a in zip(hp["fuel"], ea)])
+        h2o = np.array([fuel_derived(f, float(a)).h2o_vol_percent for f, a in zip(hp["fuel"], ea)])
+        out_c, out_initial, out_final = vec.water_condensation(t_fi, x, hp["V"], h2o, dew)
+        in_c, _, _ = vec.water_condensation(t_fi, t_fi, hp["V"], h2o, dew)
+        altitude = np.array([models[s].altitude for s in hp["site"]])
+        ratio = vec.atmospheric_pressure(altitude) / 101.325
+        condensed = np.maximum(out_c - in_c, 0.0)
+        condensed = np.where(condensed > 0, np.round(condensed * (1.0 + (ratio - 1.0) * 0.02), 2), condensed)
+        return [
+            None if not f.condensing else {
+                "condensed_water": float(condensed[j]),
+                "initial_water": float(out_initial[j]),
+                "final_water": float(out_final[j]),
+            }
+            for j, f in enumerate(hp["fuel"])
+        ]
+
+def solve_network(sites, tolerance=0.5, max_iter=50) -> dict:
+    return NetworkSolver(tolerance=tolerance, max_iter=max_iter).solve(sites)
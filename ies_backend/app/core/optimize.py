@@ -0,0 +1,455 @@
+# app/core/optimize.py
+# 方案C 设计优化：在给定范围内搜索排烟温度 / 完善度 / 热泵类型 / 蒸汽策略等设计变量，
+# 同时考虑多个目标 (回收热量、COP、析水量、经济性)，返回 Pareto 前沿
+#
+# 搜索方法: 多起点坐标模式搜索 (pattern search)
+#   - 连续变量归一化到 [0, 1]，每步沿各坐标 ± 步长试探，无改进时步长减半
+#   - 离散变量 (枚举取值) 每步试探其余所有取值；组合数不多时每个组合至少分配一个起点
+#   - 每个起点有各自的目标权重 (前几个起点为单目标，其余随机)，按加权归一化目标比较
+#   - 所有起点的候选点每轮合并为一批，交给 BatchSchemeCSolver 一次求解
+# 所有可行的评估点都进入 Pareto 存档 (增量非支配筛选)，前沿点最后用 SchemeCSolver 逐个复核
+
+import itertools
+import time
+
+import numpy as np
+
+from app.core.batch import SCHEME_C_COLUMNS, BatchSchemeCSolver
+from app.core.fuels import fuel_ids, fuel_table
+from app.validation import SCHEME_C_FIELDS, validate_scheme_c
+
+MAX_EVALUATIONS = 200_000      # 单次优化的评估次数上限
+MAX_ENUMERATED_COMBOS = 64     # 离散组合数不超过此值时，每个组合至少一个起点
+MAX_STALLED_ITERATIONS = 10    # 连续无新评估点的轮数上限
+
+# 指标 -> 方向 (1: 越大越好, -1: 越小越好)；均可作为目标或约束
+METRICS = {
+    "recovered_kw": 1,          # 烟气回收热量 (source_total_kw)
+    "cop": 1,                   # 最终 COP
+    "condensed_water": 1,       # 析水量 kg/h
+    "delivered_kw": 1,          # 实际供热量 (热源不足时按实际出水温度)
+    "drive_kw": -1,             # 驱动能耗 = 供热量 / COP (MVR 为电，吸收式为蒸汽/热)
+    "hourly_saving": 1,         # 每小时节省费用 (元/h)，见 design_metrics
+    "required_source_out": -1,  # 排烟温度
+    "source_limited": -1,       # 热源不足 (1 / 0)
+}
+DEFAULT_OBJECTIVES = ("recovered_kw", "cop", "condensed_water")
+
+# 经济参数默认值 (与前端 store 默认值一致)
+DEFAULT_PRICES = {"elec_price": 0.7, "fuel_price": 4.0, "boiler_eff": 0.92}
+
+_FIELD_KINDS = {name: kind for name, kind, _ in SCHEME_C_FIELDS}
+
+def design_metrics(columns, result, prices=None):
+    """
+    批量求解结果 -> 设计指标列 (名称见 METRICS)
+    经济性与 System.runRecoverySimulation 一致:
+      节省燃料费 = 供热量 / 锅炉效率 * 3.6 / 热值 * 燃料单价
+      驱动费用: MVR 为 驱动能耗 * 电价；吸收式按锅炉产汽折算燃料费
+    热值取燃料注册表 (app.core.fuels，未知燃料按天然气)
+    """
+    prices = {**DEFAULT_PRICES, **(prices or {})}
+    n = len(result["converged"])
+
+    def col(name):
+        return np.broadcast_to(np.asarray(columns.get(name, SCHEME_C_COLUMNS[name])), (n,))
+
+    converged = result["converged"]
+    sink_flow = col("sink_flow_kg_h").astype(float)
+    sink_in = col("sink_in_temp").astype(float)
+    with np.errstate(invalid="ignore"):
+        fallback_kw = sink_flow * 4.187 * (result["actual_sink_out"] - sink_in) / 3600.0
+    delivered = np.where(converged, result["target_load_kw"], np.round(np.nan_to_num(fallback_kw), 1))
+    cop = result["final_cop"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drive = np.where(cop > 0, delivered / cop, 0.0)
+
+    lhv = fuel_table()["calorific_value"][fuel_ids(col("fuel_type"))]
+    fuel_cost_per_kwh = 3.6 / prices["boiler_eff"] / lhv * prices["fuel_price"]
+    is_absorption = col("recovery_type") == 'ABSORPTION_HP'
+    drive_cost = np.where(is_absorption, drive * fuel_cost_per_kwh, drive * prices["elec_price"])
+
+    return {
+        "recovered_kw": result["source_total_kw"],
+        "cop": cop,
+        "condensed_water": np.nan_to_num(result["condensed_water"]),
+        "delivered_kw": delivered,
+        "drive_kw": np.round(drive, 1),
+        "hourly_saving": np.round(delivered * fuel_cost_per_kwh - drive_cost, 2),
+        "required_source_out": result["required_source_out"],
+        "source_limited": result["is_source_limited"].astype(float),
+    }
+
+def parse_variables(base, variables):
+    """
+    variables: 字段名 -> {"min", "max"} (连续) 或 {"values": [...]} (离散)
+    返回 (连续变量 [(名称, 下限, 上限)], 离散变量 [(名称, 取值列表)])
+    """
+    if not variables:
+        raise ValueError("至少需要一个设计变量")
+    continuous, categorical = [], []
+    for name, spec in variables.items():
+        if name not in SCHEME_C_COLUMNS:
+            raise ValueError(f"不支持的设计变量: {name}")
+        values = spec.get("values")
+        if values is not None:
+            if not len(values):
+                raise ValueError(f"设计变量 {name} 的取值列表为空")
+            # 逐个取值按请求校验 (类型转换与单点求解一致)
+            choices = [getattr(validate_scheme_c({**base, name: value}), name) for value in values]
+            categorical.append((name, list(dict.fromkeys(choices))))
+            continue
+        lo, hi = spec.get("min"), spec.get("max")
+        if lo is None or hi is None:
+            raise ValueError(f"设计变量 {name} 需要 values，或 min + max")
+        if _FIELD_KINDS[name] is not float:
+            raise ValueError(f"设计变量 {name} 不是数值字段，请用 values 枚举取值")
+        if not lo < hi:
+            raise ValueError(f"设计变量 {name} 的 min 必须小于 max")
+        continuous.append((name, float(lo), float(hi)))
+    return continuous, categorical
+
+def parse_constraints(constraints):
+    """
+    constraints: [{"metric", "min"?, "max"?}] -> [(指标名, 下限, 上限)]
+    """
+    parsed = []
+    for item in constraints or []:
+        metric = item.get("metric")
+        if metric not in METRICS:
+            raise ValueError(f"未知的约束指标: {metric} (可选: {', '.join(METRICS)})")
+        lo, hi = item.get("min"), item.get("max")
+        if lo is None and hi is None:
+            raise ValueError(f"约束 {metric} 需要 min 或 max")
+        parsed.append((metric, lo, hi))
+    return parsed
+
+class ParetoArchive:
+    """
+    非支配解存档 (目标值已按方向取正，越大越好)
+    增量更新：新点只与存档及同批新点比较，存档中被新点支配的点移除；目标值完全相同的点只保留一个
+    """
+    def __init__(self, n_objectives):
+        self.F = np.empty((0, n_objectives))
+        self.rows = np.empty(0, dtype=np.int64)  # 对应评估记录的行号
+
+    def __len__(self):
+        return len(self.rows)
+
+    @staticmethod
+    def _dominated_by(F, G):
+        """
+        F 中各点是否被 G 中任一点支配 (或与之相同)
+        """
+        if not len(G) or not len(F):
+            return np.zeros(len(F), dtype=bool)
+        ge = (G[None, :, :] >= F[:, None, :]).all(axis=2)
+        gt = (G[None, :, :] > F[:, None, :]).any(axis=2)
+        eq = (G[None, :, :] == F[:, None, :]).all(axis=2)
+        return np.logical_or(np.logical_and(ge, gt), eq).any(axis=1)
+
+    def add(self, F, rows):
+        """
+        加入一批可行点，返回进入存档的点数
+        """
+        if not len(F):
+            return 0
+        # 同批内去重，再剔除被存档支配或与存档相同的点
+        F, first = np.unique(F, axis=0, return_index=True)
+        rows = rows[first]
+        keep = ~self._dominated_by(F, self.F)
+        F, rows = F[keep], rows[keep]
+        # 同批内非支配筛选 (已去重，相同点不会互相剔除)
+        keep = np.array([not self._dominated_by(F[i:i + 1], np.delete(F, i, axis=0))[0] for i in range(len(F))],
+                        dtype=bool)
+        F, rows = F[keep], rows[keep]
+        if not len(F):
+            return 0
+        survivors = ~self._dominated_by(self.F, F)
+        self.F = np.vstack([self.F[survivors], F])
+        self.rows = np.concatenate([self.rows[survivors], rows])
+        return len(F)
+
+class DesignOptimizer:
+    def __init__(self, base, variables, objectives=DEFAULT_OBJECTIVES, constraints=None, prices=None,
+                 starts=16, max_evaluations=20_000, seed=0, solver=None, initial_step=0.25, min_step=1e-3):
+        """
+        base: 基准请求 (dict)，设计变量以外的字段固定
+        variables: 见 parse_variables；objectives: METRICS 中的指标名列表
+        constraints: [{"metric", "min"?, "max"?}]；prices: 经济参数 (见 DEFAULT_PRICES)
+        starts: 起点数；max_evaluations: 评估次数预算 (重复点不计)
+        initial_step / min_step: 归一化连续变量的初始 / 最小步长
+        """
+        self.base = validate_scheme_c(base).model_dump()
+        self.continuous, self.categorical = parse_variables(self.base, variables)
+        self.objectives = list(objectives)
+        unknown = [name for name in self.objectives if name not in METRICS]
+        if unknown or not self.objectives:
+            raise ValueError(f"未知的优化目标: {', '.join(unknown) or '(空)'} (可选: {', '.join(METRICS)})")
+        self.constraints = parse_constraints(constraints)
+        self.prices = {**DEFAULT_PRICES, **(prices or {})}
+        if not self.prices["boiler_eff"] > 0:
+            raise ValueError("boiler_eff 必须大于 0")
+        if not 1 <= max_evaluations <= MAX_EVALUATIONS:
+            raise ValueError(f"max_evaluations 必须在 1 ~ {MAX_EVALUATIONS} 之间")
+        self.starts = max(1, int(starts))
+        self.max_evaluations = int(max_evaluations)
+        self.rng = np.random.default_rng(seed)
+        self.solver = solver or BatchSchemeCSolver()
+        self.initial_step = initial_step
+        self.min_step = min_step
+
+        self.senses = np.array([METRICS[name] for name in self.objectives], dtype=float)
+        self.archive = ParetoArchive(len(self.objectives))
+        self._memo = {}        # (x, k) -> 评估记录行号
+        self._X, self._K, self._M = [], [], []   # 评估记录 (按批追加)
+        self._count = 0
+        self._obj_lo = np.full(len(self.objectives), np.inf)
+        self._obj_hi = np.full(len(self.objectives), -np.inf)
+
+    # === 评估 ===
+    def _columns(self, X, K):
+        columns = {name: value for name, value in self.base.items()}
+        for j, (name, lo, hi) in enumerate(self.continuous):
+            columns[name] = lo + X[:, j] * (hi - lo)
+        for j, (name, choices) in enumerate(self.categorical):
+            columns[name] = np.asarray(choices, dtype=object)[K[:, j]]
+        return columns
+
+    def _key(self, x, k):
+        return tuple(np.round(x, 9).tolist()), tuple(k.tolist())
+
+    def evaluate(self, X, K):
+        """
+        评估一批候选点 (已评估过的点直接复用)，返回评估记录行号
+        """
+        rows = np.empty(len(X), dtype=np.int64)
+        new, new_keys = [], {}
+        for i in range(len(X)):
+            key = self._key(X[i], K[i])
+            row = self._memo.get(key, new_keys.get(key))
+            if row is None:
+                if self._count + len(new) >= self.max_evaluations:
+                    row = -1
+                else:
+                    row = new_keys[key] = self._count + len(new)
+                    new.append(i)
+            rows[i] = row
+        if new:
+            Xn, Kn = X[new], K[new]
+            columns = self._columns(Xn, Kn)
+            result = self.solver.solve(columns, full_condensation=True)
+            metrics = design_metrics(columns, result, self.prices)
+            M = np.column_stack([np.asarray(metrics[name], dtype=float) for name in METRICS])
+            self._X.append(Xn)
+            self._K.append(Kn)
+            self._M.append(M)
+            self._memo.update(new_keys)
+            start = self._count
+            self._count += len(new)
+
+            feasible = self._violation(M) == 0
+            F = M[:, [list(METRICS).index(name) for name in self.objectives]] * self.senses
+            if feasible.any():
+                self._obj_lo = np.minimum(self._obj_lo, F[feasible].min(axis=0))
+                self._obj_hi = np.maximum(self._obj_hi, F[feasible].max(axis=0))
+                self.archive.add(F[feasible], start + np.nonzero(feasible)[0])
+        return rows
+
+    def _violation(self, M):
+        """
+        约束违反量 (按约束值归一化后求和，0 为可行)
+        """
+        total = np.zeros(len(M))
+        names = list(METRICS)
+        for metric, lo, hi in self.constraints:
+            v = M[:, names.index(metric)]
+            if lo is not None:
+                total += np.maximum(0.0, lo - v) / max(abs(lo), 1.0)
+            if hi is not None:
+                total += np.maximum(0.0, v - hi) / max(abs(hi), 1.0)
+        return total
+
+    def _records(self):
+        return np.vstack(self._X), np.vstack(self._K), np.vstack(self._M)
+
+    def _scores(self, M, weights):
+        """
+        加权归一化目标得分 (各起点各自的权重)；不可行点得分为 -1 - 违反量
+        M: (n, 指标数)；weights: (n, 目标数)
+        """
+        F = M[:, [list(METRICS).index(name) for name in self.objectives]] * self.senses
+        span = np.where(self._obj_hi > self._obj_lo, self._obj_hi - self._obj_lo, 1.0)
+        lo = np.where(np.isfinite(self._obj_lo), self._obj_lo, 0.0)
+        score = (((F - lo) / span) * weights).sum(axis=1)
+        violation = self._violation(M)
+        return np.where(violation > 0, -1.0 - violation, score)
+
+    # === 搜索 ===
+    def _initial_points(self, count):
+        d = len(self.continuous)
+        # 拉丁超立方采样
+        X = (self.rng.permuted(np.tile(np.arange(count), (d, 1)), axis=1).T + self.rng.random((count, d))) / count
+        sizes = [len(choices) for _, choices in self.categorical]
+        combos = int(np.prod(sizes)) if sizes else 1
+        if sizes and combos <= MAX_ENUMERATED_COMBOS:
+            grid = np.array(list(itertools.product(*[range(s) for s in sizes])), dtype=np.int64)
+            K = grid[np.arange(count) % combos]
+        else:
+            K = np.column_stack([self.rng.integers(0, s, count) for s in sizes]) if sizes else np.zeros((count, 0), dtype=np.int64)
+        return X, K.astype(np.int64)
+
+    def _weights(self, count, offset=0):
+        """
+        前 len(objectives) 个起点为单目标 (保证找到各目标的极值)，其余为随机权重
+        """
+        m = len(self.objectives)
+        W = self.rng.dirichlet(np.ones(m), count)
+        for i in range(count):
+            if offset + i < m:
+                W[i] = np.eye(m)[offset + i]
+        return W
+
+    def _neighbours(self, x, k, step):
+        """
+        坐标模式：连续变量 ± step，离散变量换为其余各取值
+        """
+        X, K = [], []
+        for j in range(len(x)):
+            for sign in (1.0, -1.0):
+                xn = x.copy()
+                xn[j] = min(max(xn[j] + sign * step, 0.0), 1.0)
+                if xn[j] != x[j]:
+                    X.append(xn)
+                    K.append(k)
+        for j, (_, choices) in enumerate(self.categorical):
+            for c in range(len(choices)):
+                if c != k[j]:
+                    kn = k.copy()
+                    kn[j] = c
+                    X.append(x)
+                    K.append(kn)
+        return X, K
+
+    def run(self) -> dict:
+        started = time.perf_counter()
+        d, m = len(self.continuous), len(self.categorical)
+        sizes = [len(choices) for _, choices in self.categorical]
+        combos = int(np.prod(sizes)) if sizes else 1
+        count = max(self.starts, combos) if combos <= MAX_ENUMERATED_COMBOS else self.starts
+
+        X, K = self._initial_points(count)
+        W = self._weights(count)
+        step = np.full(count, self.initial_step)
+        current = self.evaluate(X, K)
+        iterations = restarts = stalled = 0
+        opened = count
+
+        while self._count < self.max_evaluations and (current >= 0).all():
+            iterations += 1
+            evaluated = self._count
+            # 收集所有起点的邻域候选，合并为一批
+            owner, cand_X, cand_K = [], [], []
+            for s in range(count):
+                nx, nk = self._neighbours(X[s], K[s], step[s])
+                owner.extend([s] * len(nx))
+                cand_X.extend(nx)
+                cand_K.extend(nk)
+            owner = np.asarray(owner, dtype=np.int64)
+            if len(owner):
+                rows = self.evaluate(np.asarray(cand_X, dtype=float).reshape(len(owner), d),
+                                     np.asarray(cand_K, dtype=np.int64).reshape(len(owner), m))
+            else:
+                rows = np.empty(0, dtype=np.int64)
+
+            _, _, M = self._records()
+            score_now = self._scores(M[current], W)
+            valid = rows >= 0
+            cand_score = np.full(len(rows), -np.inf)
+            if valid.any():
+                cand_score[valid] = self._scores(M[rows[valid]], W[owner[valid]])
+
+            finished = []
+            for s in range(count):
+                mine = np.nonzero(owner == s)[0]
+                best = mine[np.argmax(cand_score[mine])] if len(mine) else None
+                if best is not None and cand_score[best] > score_now[s] + 1e-12:
+                    X[s], K[s] = cand_X[best], cand_K[best]
+                    current[s] = rows[best]
+                elif d and step[s] > self.min_step:
+                    step[s] *= 0.5
+                else:
+                    finished.append(s)
+
+            if self._count >= self.max_evaluations:
+                break
+            if finished:
+                # 收敛的起点从新的随机点重启 (新的随机权重)
+                restarts += len(finished)
+                idx = np.asarray(finished)
+                X[idx], K[idx] = self._initial_points(len(idx))
+                W[idx] = self._weights(len(idx), offset=opened)
+                opened += len(idx)
+                step[idx] = self.initial_step
+                current[idx] = self.evaluate(X[idx], K[idx])
+            # 连续多轮没有新的评估点 (搜索空间已穷尽)：结束
+            stalled = stalled + 1 if self._count == evaluated else 0
+            if stalled >= MAX_STALLED_ITERATIONS:
+                break
+
+        return self._report(iterations, restarts, started)
+
+    # === 结果 ===
+    def _variables(self, x, k):
+        values = {}
+        for j, (name, lo, hi) in enumerate(self.continuous):
+            values[name] = round(float(lo + x[j] * (hi - lo)), 6)
+        for j, (name, choices) in enumerate(self.categorical):
+            value = choices[int(k[j])]
+            values[name] = value.item() if hasattr(value, "item") else value
+        return values
+
+    def _report(self, iterations, restarts, started):
+        from app.core.solver import SchemeCSolver
+
+        Xr, Kr, Mr = self._records()
+        names = list(METRICS)
+        # 前沿按第一个目标从优到劣排序
+        order = np.argsort(-self.archive.F[:, 0], kind="stable")
+        verifier = SchemeCSolver(tolerance=self.solver.tolerance)
+        pareto = []
+        for row in self.archive.rows[order]:
+            variables = self._variables(Xr[row], Kr[row])
+            pareto.append({
+                "variables": variables,
+                "metrics": {name: float(Mr[row, names.index(name)]) for name in names},
+                "result": verifier.solve(validate_scheme_c({**self.base, **variables})),
+            })
+
+        best = {}
+        for j, name in enumerate(self.objectives):
+            if len(self.archive):
+                k = int(np.argmax(self.archive.F[order, j]))
+                best[name] = {"variables": pareto[k]["variables"], "metrics": pareto[k]["metrics"]}
+
+        return {
+            "objectives": self.objectives,
+            "pareto": pareto,
+            "best": best,
+            "evaluations": self._count,
+            "feasible": int((self._violation(Mr) == 0).sum()),
+            "iterations": iterations,
+            "restarts": restarts,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 1),
+        }
+
+def optimize_scheme_c(base, variables, objectives=DEFAULT_OBJECTIVES, constraints=None, prices=None,
+                      starts=16, max_evaluations=20_000, seed=0, solver=None):
+    """
+    方案C 设计优化入口，返回 Pareto 前沿 (各点附 SchemeCSolver 复核结果) 与各目标的最优点
+    """
+    optimizer = DesignOptimizer(
+        base, variables, objectives=objectives, constraints=constraints, prices=prices,
+        starts=starts, max_evaluations=max_evaluations, seed=seed, solver=solver
+    )
+    return optimizer.run()
@@ -1,4 +1,4 @@
-import math
+from app.core import steam
 
 # === 移植自 src/core/physics.js ===
 
@@ -25,37 +25,32 @@ def calculate_atmospheric_pressure(altitude_m: float) -> float:
     
     return round(pressure, 3)
 
-def get_sat_temp_from_pressure(pressure_mpa: float, atmospheric_pressure_kpa: float = 101.325) -> float:
+def get_sat_temp_from_pressure(pressure_mpa: float, atmospheric_pressure_kpa: float = 101.325, *, gauge: bool) -> float:
     """
-    根据绝对压力计算饱和温度 (R134a/Water 简化拟合)
-    对应 JS: getSatTempFromPressure
+    根据压力计算水的饱和温度 (IAPWS-IF97 区域 4)
+    对应 JS: getSatTempFromPressure (JS 按 < 0.5 MPa 猜测为表压，这里须由调用方指定)
+    gauge: True 表压、False 绝对压力
     """
     if pressure_mpa <= 0:
         return 100.0
     
-    # 如果输入的是表压，需要加上大气压得到绝对压力
-    absolute_pressure_mpa = pressure_mpa
-    if pressure_mpa < 0.5:
-        # 可能是表压，转换为绝对压力
-        absolute_pressure_mpa = pressure_mpa + (atmospheric_pressure_kpa / 1000)
+    # 表压需要加上大气压得到绝对压力
+    absolute_pressure_mpa = pressure_mpa + (atmospheric_pressure_kpa / 1000) if gauge else pressure_mpa
     
-    # Antoine Equation approximation
-    p_mmhg = absolute_pressure_mpa * 7500.62
-    A, B, C = 8.07131, 1730.63, 233.426
-    
-    # 注意：Python 的 log10 在 math 库里
-    val = B / (A - math.log10(p_mmhg)) - C
-    return round(val, 1)
+    # IF97 饱和温度 (压力限制在三相点 ~ 临界点之间)
+    return round(steam.saturation_temperature(absolute_pressure_mpa), 1)
 
 def estimate_enthalpy(temp_c: float, is_steam: bool = False) -> float:
     """
-    估算焓值 (简化工程模型)
+    估算焓值
     对应 JS: estimateEnthalpy
+    水: Cp ≈ 4.187 (与回退解的温差反算、经济性模型一致，0 ~ 100 °C 内与 IF97 饱和水焓相差 < 0.4 kJ/kg)
+    蒸汽: 温度 temp_c 下的 IF97 饱和蒸汽焓 (0 ~ 350 °C 插值表，误差 < 1e-4 kJ/kg)
     """
     if not is_steam:
         return 4.187 * temp_c  # Cp_water ≈ 4.187
     else:
-        return 2676 + 0.5 * (temp_c - 100) # 饱和蒸汽基准 + 过热
+        return steam.saturated_vapor_enthalpy(temp_c)
 
 # === 新增：燃烧物理修正 ===
 
@@ -155,4 +150,4 @@ def calculate_water_condensation(flue_in_temp: float, flue_out_temp: float,
         "condensed_water": round(condensed_water, 2),
         "initial_water": round(initial_water, 2),
         "final_water": round(final_water, 2)
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,231 @@
+# app/core/rootfind.py
+# 有界求根引擎：用于 SchemeCSolver 的 "供给 - 需求" 残差方程
+#
+# 所有求根器签名一致:
+#   finder(f, lo, hi, ftol, xtol, max_iter, f_lo=None, f_hi=None) -> dict
+#   (f_lo / f_hi 为已知的端点残差，传入时不再重复计算)
+# 返回字段:
+#   root       最终解 (若未收敛，为残差绝对值最小的点)
+#   residual   f(root)
+#   iterations 残差函数调用次数
+#   converged  |f(root)| < ftol
+#   bracketed  区间端点是否异号 (False 表示区间内无根，已快速失败)
+#   method     求根方法名称
+
+def _result(method, x, fx, evals, converged, bracketed):
+    return {
+        "root": x,
+        "residual": fx,
+        "iterations": evals,
+        "converged": converged,
+        "bracketed": bracketed,
+        "method": method,
+    }
+
+def _check_bracket(method, f, lo, hi, ftol, f_lo=None, f_hi=None):
+    """
+    计算端点残差并做快速判断 (已知的端点残差不重复计算)
+    返回 (提前结果或 None, f_lo, f_hi, evals)
+    """
+    evals = 0
+    # 先评估下限 (与旧版从 source_out_target 起步一致)
+    if f_lo is None:
+        f_lo = f(lo)
+        evals += 1
+    if abs(f_lo) < ftol:
+        return _result(method, lo, f_lo, evals, True, True), f_lo, None, evals
+    if hi <= lo:
+        return _result(method, lo, f_lo, evals, False, False), f_lo, None, evals
+
+    if f_hi is None:
+        f_hi = f(hi)
+        evals += 1
+    if abs(f_hi) < ftol:
+        return _result(method, hi, f_hi, evals, True, True), f_lo, f_hi, evals
+    if (f_lo > 0) == (f_hi > 0):
+        # 端点同号：区间内无根，直接失败
+        x, fx = (lo, f_lo) if abs(f_lo) <= abs(f_hi) else (hi, f_hi)
+        return _result(method, x, fx, evals, False, False), f_lo, f_hi, evals
+    return None, f_lo, f_hi, evals
+
+def brent(f, lo, hi, ftol=0.5, xtol=1e-6, max_iter=100, f_lo=None, f_hi=None):
+    """
+    Brent 法 (反二次插值 + 割线 + 二分)
+    对应 Numerical Recipes zbrent，增加残差容差 ftol 作为收敛判据
+    """
+    early, fa, fb, evals = _check_bracket("brent", f, lo, hi, ftol, f_lo, f_hi)
+    if early:
+        return early
+
+    a, b = lo, hi
+    c, fc = b, fb
+    d = e = b - a
+    while evals < max_iter:
+        if (fb > 0) == (fc > 0):
+            # 保证 b、c 夹住根
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+
+        tol1 = 2.0e-16 * abs(b) + 0.5 * xtol
+        xm = 0.5 * (c - b)
+        if abs(xm) <= tol1:
+            # 区间已收缩到 xtol 仍不满足 ftol：残差在此处间断 (如 COP 取整)，快速失败
+            return _result("brent", b, fb, evals, False, True)
+
+        if abs(e) >= tol1 and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                # 割线
+                p = 2.0 * xm * s
+                q = 1.0 - s
+            else:
+                # 反二次插值
+                q = fa / fc
+                r = fb / fc
+                p = s * (2.0 * xm * q * (q - r) - (b - a) * (r - 1.0))
+                q = (q - 1.0) * (r - 1.0) * (s - 1.0)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2.0 * p < min(3.0 * xm * q - abs(tol1 * q), abs(e * q)):
+                e = d
+                d = p / q
+            else:
+                d = xm
+                e = d
+        else:
+            d = xm
+            e = d
+
+        a, fa = b, fb
+        if abs(d) > tol1:
+            b += d
+        else:
+            b += tol1 if xm > 0 else -tol1
+        fb = f(b)
+        evals += 1
+        if abs(fb) < ftol:
+            return _result("brent", b, fb, evals, True, True)
+
+    return _result("brent", b, fb, evals, False, True)
+
+def illinois(f, lo, hi, ftol=0.5, xtol=1e-6, max_iter=100, f_lo=None, f_hi=None):
+    """
+    Illinois 法 (改进的试位法 / Regula Falsi)
+    同侧端点连续保留时，将其残差减半，避免单侧停滞
+    """
+    early, fa, fb, evals = _check_bracket("illinois", f, lo, hi, ftol, f_lo, f_hi)
+    if early:
+        return early
+
+    a, b = lo, hi
+    side = 0
+    x, fx = (a, fa) if abs(fa) <= abs(fb) else (b, fb)
+    while evals < max_iter:
+        if abs(b - a) <= xtol:
+            return _result("illinois", x, fx, evals, False, True)
+
+        x = (a * fb - b * fa) / (fb - fa)
+        fx = f(x)
+        evals += 1
+        if abs(fx) < ftol:
+            return _result("illinois", x, fx, evals, True, True)
+
+        if (fx > 0) == (fb > 0):
+            b, fb = x, fx
+            if side == -1:
+                fa *= 0.5
+            side = -1
+        else:
+            a, fa = x, fx
+            if side == 1:
+                fb *= 0.5
+            side = 1
+
+    return _result("illinois", x, fx, evals, False, True)
+
+# 求根器注册表 (可插拔)
+ROOT_FINDERS = {
+    "brent": brent,
+    "illinois": illinois,
+}
+
+def register_root_finder(name, finder):
+    """注册自定义求根器 (签名同 brent)"""
+    ROOT_FINDERS[name] = finder
+
+def bracket_from_guess(f, guess, lo, hi, ftol=0.5, step=1.0, max_iter=100, slope=None):
+    """
+    热启动：从初始猜测出发向外扩展，找到夹住根的小区间
+    slope: 已知的残差斜率 (如上一次求解在根附近的 df/dx)，给定时首步按牛顿法 x1 = x0 - f0 / slope，
+           否则先试探 guess + step 确定方向 (|f| 减小的一侧)
+    之后按割线外推 (放大 1.5 倍) 或步长加倍前进
+    返回 (提前结果或 None, a, f_a, b, f_b, evals)
+    到达 [lo, hi] 边界仍未变号时视为区间内无根 (残差单调)，返回 bracketed=False
+    """
+    x0 = min(max(guess, lo), hi)
+    f0 = f(x0)
+    evals = 1
+    if abs(f0) < ftol:
+        return _result(None, x0, f0, evals, True, True), x0, f0, x0, f0, evals
+
+    direction = 1.0 if x0 + step <= hi else -1.0
+    d = step
+    if slope:
+        newton = -f0 / slope
+        if newton:
+            direction = 1.0 if newton > 0 else -1.0
+            d = abs(newton)
+    reversed_once = False
+    a, fa = x0, f0
+    while evals < max_iter:
+        b = min(max(a + direction * d, lo), hi)
+        if b == a:
+            if not reversed_once and a == x0:
+                direction, reversed_once = -direction, True
+                d = step
+                continue
+            return _result(None, a, fa, evals, False, False), a, fa, a, fa, evals
+        fb = f(b)
+        evals += 1
+        if abs(fb) < ftol:
+            return _result(None, b, fb, evals, True, True), a, fa, b, fb, evals
+        if (fa > 0) != (fb > 0):
+            return None, a, fa, b, fb, evals
+        if abs(fb) >= abs(fa) and not reversed_once and a == x0:
+            # 首次试探远离根：反向
+            direction, reversed_once = -direction, True
+            d = step
+            continue
+        # 割线外推到根的距离，放大 1.5 倍以确保越过根
+        secant = (fb - fa) / (b - a)
+        distance = -fb / secant * direction if secant else 0.0
+        d = max(1.5 * distance, 2.0 * d) if distance > 0 else 2.0 * d
+        a, fa = b, fb
+    return _result(None, a, fa, evals, False, True), a, fa, a, fa, evals
+
+def find_root(f, lo, hi, method="brent", ftol=0.5, xtol=1e-6, max_iter=100, guess=None, step=1.0,
+              slope=None):
+    """
+    统一入口：按名称选择求根器，在 [lo, hi] 上求 f(x) = 0
+    guess: 初始猜测 (如上一时刻的解)；给定时先在其附近找小区间，再交给求根器
+    slope: 初始猜测处的残差斜率估计 (见 bracket_from_guess)
+    """
+    finder = ROOT_FINDERS.get(method)
+    if finder is None:
+        raise ValueError(f"未知的求根方法: {method} (可选: {', '.join(ROOT_FINDERS)})")
+    if guess is None or hi <= lo:
+        return finder(f, lo, hi, ftol=ftol, xtol=xtol, max_iter=max_iter)
+
+    early, a, fa, b, fb, evals = bracket_from_guess(f, guess, lo, hi, ftol, step, max_iter, slope)
+    if early:
+        early["method"] = method
+        return early
+    if b < a:
+        a, fa, b, fb = b, fb, a, fa
+    result = finder(f, a, b, ftol=ftol, xtol=xtol, max_iter=max(1, max_iter - evals), f_lo=fa, f_hi=fb)
+    result["iterations"] += evals
+    return result
@@ -0,0 +1,186 @@
+# app/core/sensitivity.py
+# 方案C 结果对各数值输入的解析灵敏度 (偏导数)
+#
+# 前向模式对偶数 (Dual)：值 + 对各参数的梯度向量，物性 / COP / 烟气放热等函数无需改写，
+# 直接以对偶数为参数调用即可得到导数:
+#   - max / min 截断 (COP 限幅、冷凝系数、海拔下限) 取当前生效分支的导数，被截断时导数为 0
+#   - round() 只对值取整，梯度保留 (取整前的光滑模型的导数)
+# 收敛解用隐函数求导: 残差 R(t, p) = 0 => dt/dp = -R_p / R_t，只需在根处做一次对偶求值
+# 未收敛 (按目标排烟温度回退) 时排烟温度由输入直接给定，沿回退公式直接求导
+
+import math
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.validation import SCHEME_C_FIELDS
+
+# 可求导的输入字段 (SchemeCRequest 的数值字段)
+SENSITIVITY_PARAMETERS = tuple(name for name, kind, _ in SCHEME_C_FIELDS if kind is float)
+
+# 输出灵敏度的结果字段
+SENSITIVITY_OUTPUTS = ("target_load_kw", "required_source_out", "final_cop", "condensed_water")
+
+class Dual:
+    """
+    前向模式对偶数: value + grad (对各参数的偏导数向量)
+    比较运算只比较值，分支选择与普通浮点数一致
+    """
+    __slots__ = ("value", "grad")
+
+    def __init__(self, value, grad):
+        self.value = float(value)
+        self.grad = grad
+
+    @staticmethod
+    def _parts(other):
+        if isinstance(other, Dual):
+            return other.value, other.grad
+        return float(other), 0.0
+
+    # 与常数运算时跳过梯度的乘加 (每次 NumPy 运算都有固定开销)
+    def __add__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value + other.value, self.grad + other.grad)
+        return Dual(self.value + other, self.grad)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value - other.value, self.grad - other.grad)
+        return Dual(self.value - other, self.grad)
+
+    def __rsub__(self, other):
+        return Dual(other - self.value, -self.grad)
+
+    def __mul__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value * other.value, self.grad * other.value + other.grad * self.value)
+        return Dual(self.value * other, self.grad * other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, Dual):
+            v = other.value
+            return Dual(self.value / v, (self.grad * v - other.grad * self.value) / (v * v))
+        return Dual(self.value / other, self.grad / other)
+
+    def __rtruediv__(self, other):
+        value = other / self.value
+        return Dual(value, self.grad * (-value / self.value))
+
+    def __neg__(self):
+        return Dual(-self.value, -self.grad)
+
+    def __pow__(self, exponent):
+        # 仅支持常数指数
+        value = self.value ** exponent
+        return Dual(value, self.grad * (exponent * self.value ** (exponent - 1)))
+
+    def __rpow__(self, base):
+        # 常数底数: base ** x
+        value = base ** self.value
+        return Dual(value, self.grad * (value * math.log(base)))
+
+    def __round__(self, ndigits=None):
+        return Dual(round(self.value, ndigits), self.grad)
+
+    def __float__(self):
+        return self.value
+
+    def __bool__(self):
+        return self.value != 0.0
+
+    def __lt__(self, other):
+        return self.value < self._parts(other)[0]
+
+    def __le__(self, other):
+        return self.value <= self._parts(other)[0]
+
+    def __gt__(self, other):
+        return self.value > self._parts(other)[0]
+
+    def __ge__(self, other):
+        return self.value >= self._parts(other)[0]
+
+    def __repr__(self):
+        return f"Dual({self.value!r}, {self.grad!r})"
+
+def grad_of(x, n):
+    """
+    对偶数 -> 梯度向量；常数 -> 零向量
+    """
+    if isinstance(x, Dual):
+        return x.grad
+    return np.zeros(n)
+
+def dual_request(req, parameters=SENSITIVITY_PARAMETERS, extra=0):
+    """
+    请求 -> 各数值字段替换为对偶数的副本 (第 k 个参数的梯度为单位向量 e_k)
+    extra: 梯度向量末尾追加的分量数 (如排烟温度)
+    """
+    fields = req.model_dump()
+    seeds = np.eye(len(parameters) + extra)
+    for k, name in enumerate(parameters):
+        fields[name] = Dual(fields[name], seeds[k])
+    return SimpleNamespace(**fields)
+
+def _report(parameters, outputs, method):
+    report = {"method": method, "parameters": list(parameters)}
+    for name, grad in outputs.items():
+        if grad is None:
+            report[name] = None
+            continue
+        report[name] = {
+            p: (round(g, 6) if math.isfinite(g) else None) for p, g in zip(parameters, grad.tolist())
+        }
+    return report
+
+def scheme_c_sensitivities(solver, req, t_root, converged, parameters=SENSITIVITY_PARAMETERS):
+    """
+    SchemeCSolver 结果的灵敏度 (一次对偶求值)
+    t_root: 收敛的排烟温度 (converged=False 时忽略，按回退公式求导)
+    返回 {"method", "parameters", 输出字段 -> {参数 -> 偏导数}}
+    condensed_water 为该排烟温度下的析水量 (电能热源为 None)
+    """
+    n = len(parameters)
+    if not converged:
+        dreq = dual_request(req, parameters)
+        effective_sink_target, q_sink_target_kw = solver._sink_target(dreq)
+        result = solver._fallback_result(dreq, {"iterations": 0, "residual": 0.0, "method": None},
+                                         effective_sink_target, q_sink_target_kw)
+        water = result.get("water_condensation")
+        return _report(parameters, {
+            "target_load_kw": grad_of(result["target_load_kw"], n),
+            "required_source_out": grad_of(result["required_source_out"], n),
+            "final_cop": grad_of(result["final_cop"], n),
+            "condensed_water": grad_of(water["condensed_water"], n) if water else None,
+        }, "direct")
+
+    # 在根处对 (参数..., 排烟温度) 求偏导 (排烟温度为最后一个分量)
+    dreq = dual_request(req, parameters, extra=1)
+    effective_sink_target, q_sink_target_kw = solver._sink_target(dreq)
+    t = Dual(t_root, np.eye(n + 1)[n])
+    cop, avail, needed = solver._energy_balance(dreq, t, effective_sink_target, q_sink_target_kw)
+    water = solver.calculate_condensation(dreq, t)
+
+    # 隐函数求导: R(t, p) = 0 => dt/dp = -R_p / R_t
+    r_grad = grad_of(avail - needed, n + 1)
+    if r_grad[n]:
+        dt_dp = -r_grad[:n] / r_grad[n]
+    else:
+        dt_dp = np.full(n, np.nan)
+
+    def total(x):
+        # 全导数 dX/dp = X_p + X_t * dt/dp
+        g = grad_of(x, n + 1)
+        return g[:n] + g[n] * dt_dp if g[n] else g[:n]
+
+    return _report(parameters, {
+        "target_load_kw": grad_of(q_sink_target_kw, n + 1)[:n],
+        "required_source_out": dt_dp,
+        "final_cop": total(cop),
+        "condensed_water": total(water["condensed_water"]) if water else None,
+    }, "implicit")
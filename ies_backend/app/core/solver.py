@@ -1,13 +1,36 @@
 # app/core/solver.py
-from app.core.physics import estimate_enthalpy, calculate_adjusted_dew_point, calculate_water_condensation, calculate_atmospheric_pressure
+import time
+
+from app.core.physics import estimate_enthalpy, calculate_water_condensation, calculate_atmospheric_pressure
 from app.core.cycles import calculate_cop
-from app.core.constants import FUEL_DB
+from app.core.fuels import fuel_derived, get_fuel
+from app.core.rootfind import find_root
+from app.core.telemetry import SOLVER_TELEMETRY
+
+_UNSET = object()
+
+class SolverState:
+    """
+    上一次求解的状态 (热启动 / 连续求解用)
+    传入 solve(state=...) 时读取作为初始猜测，求解后原地更新
+    """
+    def __init__(self, t_source_out=None, slope=None):
+        self.t_source_out = t_source_out  # 上次收敛的排烟温度 (°C)，未收敛时为 None
+        self.slope = slope                # 根附近残差 (供给 - 需求) 对排烟温度的斜率 (kW/K)
+
+    def reset(self):
+        self.t_source_out = None
+        self.slope = None
 
 class SchemeCSolver:
-    def __init__(self, tolerance=0.5, max_iter=1000):
+    def __init__(self, tolerance=0.5, max_iter=1000, method="brent", telemetry=None):
         # 🟢 修改1: 容差放大到 0.5kW (工程上足够了)，次数加到 1000
         self.tolerance = tolerance 
         self.max_iter = max_iter
+        # 求根方法 (见 app.core.rootfind.ROOT_FINDERS)
+        self.method = method
+        # 遥测 (默认进程级实例，见 app.core.telemetry)
+        self.telemetry = telemetry or SOLVER_TELEMETRY
 
     def calculate_flue_heat_release(self, t_in, t_out, flow_vol, fuel_type, excess_air=1.2):
         # 🔧 显热计算
@@ -18,11 +41,12 @@ class SchemeCSolver:
         
         # 2. 潜热计算
         latent_kw = 0.0
-        fuel_data = FUEL_DB.get(fuel_type, FUEL_DB['NATURAL_GAS'])
-        actual_dew_point = calculate_adjusted_dew_point(fuel_data["dewPointRef"], excess_air)
+        # fuel_type: 燃料名 / ID / FuelRecord (见 app.core.fuels)，露点按 (燃料, 过量空气系数) 缓存
+        fuel = get_fuel(fuel_type)
+        actual_dew_point = fuel_derived(fuel, excess_air).dew_point
         
         if t_out < actual_dew_point:
-            max_latent_per_m3 = 160.0 if fuel_type == 'NATURAL_GAS' else 0.0
+            max_latent_per_m3 = fuel.latent_per_m3
             cond_factor = (actual_dew_point - t_out) / (actual_dew_point - 5.0)
             cond_factor = max(0.0, min(1.0, cond_factor))
             total_latent_potential = flow_vol * max_latent_per_m3 / 3600.0 
@@ -30,90 +54,253 @@ class SchemeCSolver:
 
         return sensible_kw + latent_kw
 
-    def solve(self, req):
+    def flue_temperature_for_heat(self, heat_kw, t_in, flow_vol, fuel_type, excess_air=1.2):
+        """
+        calculate_flue_heat_release 的反函数：放出 heat_kw 时的排烟温度 (只对 >= 5°C 的结果有效)
+        放热量随排烟温度单调递减，露点以上为纯显热，露点以下显热 + 潜热均为线性
+        """
+        cp_vol_kwh = 0.00038
+        sensible_per_k = flow_vol * cp_vol_kwh
+        t_out = t_in - heat_kw / sensible_per_k
+        fuel = get_fuel(fuel_type)
+        actual_dew_point = fuel_derived(fuel, excess_air).dew_point
+        if t_out >= actual_dew_point or not fuel.latent_per_m3 or actual_dew_point <= 5.0:
+            return t_out
+        latent_per_k = flow_vol * fuel.latent_per_m3 / 3600.0 / (actual_dew_point - 5.0)
+        return (sensible_per_k * t_in + latent_per_k * actual_dew_point - heat_kw) / (sensible_per_k + latent_per_k)
+
+    def calculate_condensation(self, req, t_source_out):
+        """
+        排烟温度 t_source_out 下的水分析出量 (kg/h)，电能热源返回 None
+        (未收敛结果中的 water_condensation 即由此计算)
+        """
+        fuel = get_fuel(req.fuel_type)
+        if not fuel.condensing:
+            return None
+        excess_air = getattr(req, 'excess_air', 1.2)  # 使用getattr更安全
+        altitude = getattr(req, 'altitude', 0.0)  # 获取海拔高度
+        actual_atm_pressure = calculate_atmospheric_pressure(altitude)  # 计算实际大气压力
+
+        # 修正露点与烟气中水蒸气体积百分比 (按燃料组成，见 app.core.fuels)
+        derived = fuel_derived(fuel, excess_air)
+        return self._condensation(req, t_source_out, derived, actual_atm_pressure)
+
+    @staticmethod
+    def _condensation(req, t_source_out, derived, actual_atm_pressure):
+        """
+        给定派生量 (露点、H2O 体积分数) 与大气压力的析水量 (只读取 source_in_temp / source_flow_vol)
+        """
+        actual_dew_point = derived.dew_point
+        h2o_vol_percent = derived.h2o_vol_percent
+
+        # 计算水分析出量（注意：calculate_water_condensation 内部使用标准大气压，需要修正）
+        # 目前函数内部使用 P_STP = 101.325，但实际应该使用 actual_atm_pressure
+        # 为了保持兼容性，这里先使用现有函数，后续可以优化
+        water_condensation = calculate_water_condensation(
+            req.source_in_temp,
+            t_source_out,
+            req.source_flow_vol,
+            h2o_vol_percent,
+            actual_dew_point
+        )
+
+        # 🔧 修正：根据实际大气压力调整水分析出量
+        # 大气压力越高，水蒸气分压越高，相同温度下析出量可能略有不同
+        # 简化修正：按压力比例调整（实际影响较小，主要影响在露点附近）
+        pressure_ratio = actual_atm_pressure / 101.325
+        if water_condensation and water_condensation.get("condensed_water", 0) > 0:
+            # 压力修正：压力越高，相同温度下析出量略增（但影响很小，约1-2%）
+            water_condensation["condensed_water"] = water_condensation["condensed_water"] * (1.0 + (pressure_ratio - 1.0) * 0.02)
+            water_condensation["condensed_water"] = round(water_condensation["condensed_water"], 2)
+
+        return water_condensation
+
+    @staticmethod
+    def _residual_slope(evaluations, t_root):
+        """
+        根附近的残差斜率：取离根最近的另一次评估做差商 (仅评估一次时返回 None)
+        """
+        others = [t for t in evaluations if t != t_root]
+        if not others:
+            return None
+        t_near = min(others, key=lambda t: abs(t - t_root))
+        return (evaluations[t_root][2] - evaluations[t_near][2]) / (t_root - t_near)
+
+    def _energy_balance(self, req, t_source_out, effective_sink_target, q_sink_target_kw):
+        """
+        给定排烟温度，计算 (COP, 热源可供热量, 热源需求热量)
+        """
+        # A. COP
+        # 🔧 修复：如果启用手动COP锁定，直接使用手动COP值
+        if req.is_manual_cop and req.manual_cop > 0:
+            cop = req.manual_cop
+        else:
+            t_evap = t_source_out - 5.0
+            t_cond = effective_sink_target + 5.0
+            # 🔧 修复：使用请求中的策略参数
+            cycle_res = calculate_cop(t_evap, t_cond, req.efficiency, req.mode, req.strategy, req.recovery_type)
+            cop = cycle_res["cop"]
+
+        # B. 需求
+        cop_factor = (cop - 1) / cop if cop > 1.0 else 0
+        q_source_needed = q_sink_target_kw * cop_factor
+
+        # C. 供给
+        q_source_avail = self.calculate_flue_heat_release(
+            req.source_in_temp, t_source_out, req.source_flow_vol, req.fuel_type
+        )
+        return cop, q_source_avail, q_source_needed
+
+    def solve(self, req, trace=False, initial_guess=None, state=None, sensitivities=False):
+        """
+        求解方案C
+        trace=True 时在结果中附带逐次迭代轨迹 ("trace") 与单次统计 ("telemetry")
+        sensitivities=True 时附带结果对各数值输入的偏导数 ("sensitivities"，见 app.core.sensitivity)
+        initial_guess: 排烟温度初始猜测 (如上一时刻的 required_source_out)，
+                       给定时从该点附近找根 (热启动)，否则在整个区间上求根
+        state: SolverState，未给 initial_guess 时以其中的上次解为初始猜测，
+               并用其斜率做牛顿首步；求解后原地更新 (未收敛时清空)
+        求解过程只更新内存计数，不做任何 I/O
+        """
+        start = time.perf_counter()
+        sampled = not trace and self.telemetry.should_sample()
+        trace_log = [] if (trace or sampled) else None
+
+        slope = None
+        if state is not None:
+            if initial_guess is None:
+                initial_guess = state.t_source_out
+            slope = state.slope
+        root, result = self._solve(req, trace_log, initial_guess, slope)
+        if state is not None:
+            if root["converged"]:
+                state.t_source_out = root["root"]
+                state.slope = root["slope"] or state.slope
+            else:
+                state.reset()
+
+        stats = {
+            "iterations": root["iterations"],
+            "converged": root["converged"],
+            "fallback": not root["converged"],
+            "bracketed": root["bracketed"],
+            "warm_start": initial_guess is not None,
+            "source_limited": result.get("is_source_limited", False),
+            "wall_time_ms": round((time.perf_counter() - start) * 1000.0, 4),
+        }
+        self.telemetry.record(stats, trace_log if sampled else None)
+        if sensitivities:
+            # 按需导入 (依赖 NumPy，不影响 Serverless 冷启动)
+            from app.core.sensitivity import scheme_c_sensitivities
+            result["sensitivities"] = scheme_c_sensitivities(self, req, root["root"], root["converged"])
+        if trace:
+            result["trace"] = trace_log
+            result["telemetry"] = stats
+        return result
+
+    def _sink_target(self, req):
+        """
+        返回 (有效目标水温, 目标负荷 kW)
+        """
+        effective_sink_target = self._effective_sink_target(req)
+        return effective_sink_target, self._sink_load(req, effective_sink_target)
+
+    @staticmethod
+    def _effective_sink_target(req):
         # 🔧 修复：对于蒸汽预热模式，限制目标温度为 98°C（防止沸腾）
         SAFE_PREHEAT_LIMIT = 98.0
         effective_sink_target = req.sink_out_target
         if req.mode == 'STEAM' and effective_sink_target > SAFE_PREHEAT_LIMIT:
             effective_sink_target = SAFE_PREHEAT_LIMIT
-            print(f"⚠️ 蒸汽预热模式，目标温度限制为 {SAFE_PREHEAT_LIMIT}°C")
-        
+        return effective_sink_target
+
+    @staticmethod
+    def _sink_load(req, effective_sink_target):
         # 计算目标
         h_in = estimate_enthalpy(req.sink_in_temp)
         h_out = estimate_enthalpy(effective_sink_target, req.mode == 'STEAM')
         q_sink_target_kw = (req.sink_flow_kg_h * (h_out - h_in)) / 3600.0
+        return q_sink_target_kw
+
+    def _solve(self, req, trace_log=None, initial_guess=None, slope=None):
+        effective_sink_target, q_sink_target_kw = self._sink_target(req)
+        root, evaluations = self._find_root(
+            req, effective_sink_target, q_sink_target_kw, trace_log, initial_guess, slope
+        )
+        if root["converged"]:
+            cop, q_source_avail, _ = evaluations[root["root"]]
+            return root, self._converged_result(root, cop, q_source_avail, q_sink_target_kw)
 
-        print(f"\n=== 开始计算 (流量: {req.sink_flow_kg_h} kg/h) ===")
-        print(f"目标负荷: {q_sink_target_kw:.1f} kW")
-        print(f"用户输入的目标排烟温度: {req.source_out_target:.1f}°C")
+        return root, self._fallback_result(req, root, effective_sink_target, q_sink_target_kw)
 
+    def _find_root(self, req, effective_sink_target, q_sink_target_kw, trace_log=None, initial_guess=None,
+                   slope=None):
+        """
+        在 [max(5, 目标排烟温度), 入口烟温] 上求能量平衡的根
+        返回 (find_root 结果 (收敛时含根附近斜率 "slope"), 评估记录 {排烟温度: (COP, 可供热量, 残差)})
+        """
         t_source_in = req.source_in_temp
-        # 🔧 修复：使用用户输入的目标排烟温度作为初始值，而不是硬编码 60°C
-        current_t_source_out = req.source_out_target 
+        # 🔧 修复：严格按照用户输入的目标排烟温度，不允许自动降级
+        # 如果用户输入的目标温度低于物理下限（5°C），则使用5°C作为下限
+        min_flue_out = max(5.0, req.source_out_target)
         
         # 🔧 修复：记录最大可用热源能力（用于判断是否热源不足）
         max_source_potential = self.calculate_flue_heat_release(
             t_source_in, 5.0, req.source_flow_vol, req.fuel_type  # 假设最低排烟 5°C
         )
         
-        for i in range(self.max_iter):
-            # A. COP
-            # 🔧 修复：如果启用手动COP锁定，直接使用手动COP值
-            if req.is_manual_cop and req.manual_cop > 0:
-                cop = req.manual_cop
-            else:
-                t_evap = current_t_source_out - 5.0
-                t_cond = effective_sink_target + 5.0
-                # 🔧 修复：使用请求中的策略参数
-                cycle_res = calculate_cop(t_evap, t_cond, req.efficiency, req.mode, req.strategy, req.recovery_type)
-                cop = cycle_res["cop"]
-
-            # B. 需求
-            cop_factor = (cop - 1) / cop if cop > 1.0 else 0
-            q_source_needed = q_sink_target_kw * cop_factor
-
-            # C. 供给
-            q_source_avail = self.calculate_flue_heat_release(
-                t_source_in, current_t_source_out, req.source_flow_vol, req.fuel_type
+        # 残差: 供给 - 需求，在 [min_flue_out, t_source_in] 上单调递减
+        evaluations = {}
+        def residual(t_source_out):
+            cop, q_source_avail, q_source_needed = self._energy_balance(
+                req, t_source_out, effective_sink_target, q_sink_target_kw
             )
-
-            # D. 误差
             diff = q_source_avail - q_source_needed
+            evaluations[t_source_out] = (cop, q_source_avail, diff)
+            if trace_log is not None:
+                trace_log.append({
+                    "iteration": len(trace_log) + 1,
+                    "t_source_out": round(t_source_out, 4),
+                    "cop": cop,
+                    "q_source_avail": round(q_source_avail, 3),
+                    "q_source_needed": round(q_source_needed, 3),
+                    "residual": round(diff, 3),
+                })
+            return diff
 
-            # E. 打印进度 (每50次或快成功时打印)
-            if i % 50 == 0 or abs(diff) < 5.0:
-                print(f"Iter {i}: 排烟 {current_t_source_out:.2f}°C | 供给 {q_source_avail:.1f} vs 需求 {q_source_needed:.1f} | 差值 {diff:.1f}")
-
-            # F. 收敛判定
-            if abs(diff) < self.tolerance:
-                print(f"✅ 收敛成功! 最终排烟: {current_t_source_out:.2f}°C")
-                return {
-                    "status": "converged",
-                    "iterations": i + 1,
-                    "target_load_kw": round(q_sink_target_kw, 1),
-                    "required_source_out": round(current_t_source_out, 2),
-                    "final_cop": cop,
-                    "source_total_kw": round(q_source_avail, 1)
-                }
-
-            # G. 动态步长 (🟢 修改2: 加大调整力度 0.005 -> 0.01)
-            step = diff * 0.01 
-            current_t_source_out += step
-            
-            # 边界保护
-            if current_t_source_out >= t_source_in: current_t_source_out = t_source_in - 0.1
-            # 🔧 修复：严格按照用户输入的目标排烟温度，不允许自动降级
-            # 如果用户输入的目标温度低于物理下限（5°C），则使用5°C作为下限
-            min_flue_out = max(5.0, req.source_out_target)
-            if current_t_source_out < min_flue_out: current_t_source_out = min_flue_out
+        # 🔧 修复：有界求根替代固定增益迭代 (diff * 0.01)，无根时快速失败
+        root = find_root(
+            residual, min_flue_out, t_source_in,
+            method=self.method, ftol=self.tolerance, max_iter=self.max_iter,
+            guess=initial_guess, slope=slope
+        )
+
+        if root["converged"]:
+            root["slope"] = self._residual_slope(evaluations, root["root"])
+        return root, evaluations
+
+    @staticmethod
+    def _converged_result(root, cop, q_source_avail, q_sink_target_kw):
+        return {
+            "status": "converged",
+            "iterations": root["iterations"],
+            "residual": round(root["residual"], 3),
+            "method": root["method"],
+            "target_load_kw": round(q_sink_target_kw, 1),
+            "required_source_out": round(root["root"], 2),
+            "final_cop": cop,
+            "source_total_kw": round(q_source_avail, 1)
+        }
 
+    def _fallback_result(self, req, root, effective_sink_target, q_sink_target_kw, water_condensation=_UNSET):
+        """
+        未收敛时的结果：按用户指定的排烟温度计算热源能支撑的负荷与实际出水温度
+        water_condensation: 已算好的析水量 (见 app.core.graph)，默认在目标排烟温度下计算
+        """
+        t_source_in = req.source_in_temp
         # 🔧 修复：如果无法收敛，严格按照用户输入的目标排烟温度计算（不自动降级）
-        print(f"⚠️ 迭代未收敛，严格按照用户指定的排烟温度 {req.source_out_target:.1f}°C 计算...")
-        
         # 使用用户输入的目标排烟温度（如果低于物理下限5°C，则使用5°C）
         target_flue_out = max(5.0, req.source_out_target)
-        if req.source_out_target < 5.0:
-            print(f"⚠️ 用户输入的目标排烟温度 {req.source_out_target:.1f}°C 低于物理下限，使用 5.0°C")
         
         # 严格按照目标排烟温度计算
         final_t_source_out = target_flue_out
@@ -121,7 +308,6 @@ class SchemeCSolver:
         # 🔧 修复：如果启用手动COP锁定，直接使用手动COP值
         if req.is_manual_cop and req.manual_cop > 0:
             cop = req.manual_cop
-            print(f"🔒 使用手动锁定COP: {cop:.2f}")
         else:
             t_evap = final_t_source_out - 5.0
             t_cond = effective_sink_target + 5.0
@@ -137,13 +323,6 @@ class SchemeCSolver:
         max_load_kw = available_source_heat / cop_factor if cop_factor > 0 else 0
         max_source_heat = available_source_heat
         
-        # 检查热源是否充足
-        if max_load_kw < q_sink_target_kw * 0.95:  # 允许 5% 误差
-            print(f"⚠️ 警告：在用户指定的排烟温度 {final_t_source_out:.1f}°C 下，热源不足！")
-            print(f"   目标负荷: {q_sink_target_kw:.1f} kW")
-            print(f"   实际能达到: {max_load_kw:.1f} kW")
-            print(f"   系统将按 {final_t_source_out:.1f}°C 排烟温度运行，实际负荷为 {max_load_kw:.1f} kW")
-        
         # 🔧 修复：反算实际能达到的出水温度
         # 使用实际负荷和设计流量计算实际温差
         actual_sink_out = effective_sink_target  # 默认值
@@ -158,75 +337,22 @@ class SchemeCSolver:
             # 边界保护：不能超过目标温度
             if actual_sink_out > effective_sink_target:
                 actual_sink_out = effective_sink_target
-            
-            print(f"   计算过程: 实际负荷={max_load_kw:.1f} kW, 流量={req.sink_flow_kg_h:.0f} kg/h")
-            print(f"   实际温差: {actual_deltaT:.2f}°C, 入口={req.sink_in_temp:.1f}°C, 出口={actual_sink_out:.1f}°C")
         
         # 🔧 新增：计算水分析出量（考虑实际大气压力）
-        water_condensation = None
-        if req.fuel_type != 'ELECTRICITY':
-            fuel_data = FUEL_DB.get(req.fuel_type, FUEL_DB['NATURAL_GAS'])
-            excess_air = getattr(req, 'excess_air', 1.2)  # 使用getattr更安全
-            altitude = getattr(req, 'altitude', 0.0)  # 获取海拔高度
-            actual_atm_pressure = calculate_atmospheric_pressure(altitude)  # 计算实际大气压力
-            actual_dew_point = calculate_adjusted_dew_point(fuel_data["dewPointRef"], excess_air)
-            
-            # 估算烟气中水蒸气体积百分比
-            h2o_vol_percent = 0.0
-            
-            if req.fuel_type == 'NATURAL_GAS':
-                # 天然气：CH4 + 2O2 -> CO2 + 2H2O
-                theo_co2 = 1.0
-                theo_h2o = 2.0
-                theo_n2 = 7.52
-                excess_o2 = (excess_air - 1.0) * 2.0
-                excess_n2 = (excess_air - 1.0) * 7.52
-                total_vol = theo_co2 + theo_h2o + theo_n2 + excess_o2 + excess_n2
-                h2o_vol_percent = (theo_h2o / total_vol) * 100
-            elif req.fuel_type == 'COAL':
-                h2o_vol_percent = 8.0
-            elif req.fuel_type == 'DIESEL':
-                h2o_vol_percent = 12.0
-            else:
-                h2o_vol_percent = 10.0  # 默认值
-            
-            # 计算水分析出量（注意：calculate_water_condensation 内部使用标准大气压，需要修正）
-            # 目前函数内部使用 P_STP = 101.325，但实际应该使用 actual_atm_pressure
-            # 为了保持兼容性，这里先使用现有函数，后续可以优化
-            water_condensation = calculate_water_condensation(
-                t_source_in,
-                final_t_source_out,
-                req.source_flow_vol,
-                h2o_vol_percent,
-                actual_dew_point
-            )
-            
-            # 🔧 修正：根据实际大气压力调整水分析出量
-            # 大气压力越高，水蒸气分压越高，相同温度下析出量可能略有不同
-            # 简化修正：按压力比例调整（实际影响较小，主要影响在露点附近）
-            pressure_ratio = actual_atm_pressure / 101.325
-            if water_condensation and water_condensation.get("condensed_water", 0) > 0:
-                # 压力修正：压力越高，相同温度下析出量略增（但影响很小，约1-2%）
-                water_condensation["condensed_water"] = water_condensation["condensed_water"] * (1.0 + (pressure_ratio - 1.0) * 0.02)
-                water_condensation["condensed_water"] = round(water_condensation["condensed_water"], 2)
-        
-        print(f"✅ 按用户指定的排烟温度 {final_t_source_out:.1f}°C 计算完成")
-        print(f"   排烟温度: {final_t_source_out:.1f}°C (用户指定)")
-        print(f"   实际负荷: {max_load_kw:.1f} kW")
-        print(f"   实际出水: {actual_sink_out:.1f}°C")
-        print(f"   COP: {cop:.2f}")
-        if water_condensation and water_condensation["condensed_water"] > 0:
-            print(f"   水分析出量: {water_condensation['condensed_water']:.2f} kg/h")
+        if water_condensation is _UNSET:
+            water_condensation = self.calculate_condensation(req, final_t_source_out)
         
         result = {
             "status": "converged",
-            "iterations": self.max_iter,
+            "iterations": root["iterations"],
+            "residual": round(root["residual"], 3),
+            "method": root["method"],
             "target_load_kw": round(max_load_kw, 1),  # 实际能达到的负荷
             "required_source_out": round(final_t_source_out, 2),  # 严格按照用户指定的排烟温度
             "final_cop": cop,
             "source_total_kw": round(max_source_heat, 1),
             "actual_sink_out": round(actual_sink_out, 1),  # 实际出水温度
-            "is_source_limited": max_load_kw < q_sink_target_kw * 0.95  # 如果实际负荷低于目标，标记为热源限制
+            "is_source_limited": max_load_kw < q_sink_target_kw * 0.95  # 如果实际负荷低于目标 (允许 5% 误差)，标记为热源限制
         }
         
         # 🔧 新增：添加水分析出数据到返回结果
@@ -0,0 +1,587 @@
+# app/core/steam.py
+# 水 / 水蒸气物性：IAPWS-IF97 区域 1 (过冷水)、区域 2 (过热蒸汽)、区域 4 (饱和线) 及区域 2/3 分界 (B23)
+# 单位: 压力 MPa (绝对)、温度 °C、焓 kJ/kg、熵 kJ/(kg·K)
+#
+# 参考公式 (if97_*) 只用四则运算与乘方，可直接传入浮点数、对偶数 (app.core.sensitivity) 或 NumPy 数组；
+# 与 IAPWS-IF97 官方验证值的偏差见 verify() (相对偏差 < 1e-8)
+#
+# 查表 (默认)：参考公式单次约 28 µs (34 / 43 项多项式)，改为预计算插值表
+#   - 饱和线 (saturated_* / saturation_pressure): 0 ~ 350 °C 步长 1 °C 的三次 Hermite 表
+#     温度超出 0 ~ 350 °C 时标量版本抛出 ValueError、数组版本对应元素为 NaN；NaN 输入原样返回 NaN
+#     纯 Python，首次使用时建表约 30 ms；误差: 焓 < 2e-5 kJ/kg，熵 < 2e-8 kJ/(kg·K)，饱和压力 < 2e-7 MPa
+#   - h(p, T) / s(p, T) (enthalpy / entropy): 区域 1、区域 2 各一张双三次 Hermite 表
+#     NumPy 建表，首次使用时约 0.2 / 0.35 s
+#     区域 1: 0 ~ 350 °C (2.5 °C) x 0 ~ 100 MPa (1 MPa)        误差: 焓 < 0.002 kJ/kg，熵 < 3e-6 kJ/(kg·K)
+#     区域 2: 0 ~ 800 °C (5 °C) x lg p = -3 ~ 2 (0.025)        误差: 焓 < 0.4 kJ/kg，熵 < 7e-4 kJ/(kg·K)
+#     (相对误差 < 2e-4，最大值在临界区附近的高压饱和线旁)
+#   - 节点的值与偏导数取参考公式，每个单元只用四个角点，单元可跨越饱和线 (角点落在亚稳态延伸区)
+#   - 区域判断用饱和压力表 (标量与数组版本逐元素一致)；超出表范围时回退参考公式
+# 误差为 error_report() 实测值 (每个单元内 3 x 3 个点对参考公式)
+# 本机实测单次查表: 饱和线约 0.5 µs (含函数包装约 1 µs)，h(p, T) 约 4 µs (含区域判断与 log10)；
+# 数组版本 (*_array) 每个元素约 0.05 µs (饱和线) / 0.3 µs (h(p, T))
+
+import math
+from array import array
+
+PROPERTY_MODEL = "IAPWS-IF97"
+
+R = 0.461526          # kJ/(kg·K)，水的比气体常数
+T_CRIT = 647.096      # K
+P_CRIT = 22.064       # MPa
+T_MIN = 273.15        # K，区域 1/2 下限
+T_MAX_R1 = 623.15     # K，区域 1 上限 (再往上为区域 3)
+T_MAX_R2 = 1073.15    # K，区域 2 上限
+P_MAX = 100.0         # MPa
+
+# === 区域 1 (IF97 式 7，表 2) ===
+_R1_I = (0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 3, 3, 3, 4, 4, 4, 5, 8, 8, 21, 23, 29, 30, 31, 32)
+_R1_J = (-2, -1, 0, 1, 2, 3, 4, 5, -9, -7, -1, 0, 1, 3, -3, 0, 1, 3, 17, -4, 0, 6, -5, -2, 10, -8, -11, -6,
+         -29, -31, -38, -39, -40, -41)
+_R1_N = (
+    0.14632971213167, -0.84548187169114, -0.37563603672040e1, 0.33855169168385e1, -0.95791963387872,
+    0.15772038513228, -0.16616417199501e-1, 0.81214629983568e-3, 0.28319080123804e-3, -0.60706301565874e-3,
+    -0.18990068218419e-1, -0.32529748770505e-1, -0.21841717175414e-1, -0.52838357969930e-4, -0.47184321073267e-3,
+    -0.30001780793026e-3, 0.47661393906987e-4, -0.44141845330846e-5, -0.72694996297594e-15, -0.31679644845054e-4,
+    -0.28270797985312e-5, -0.85205128120103e-9, -0.22425281908000e-5, -0.65171222895601e-6, -0.14341729937924e-12,
+    -0.40516996860117e-6, -0.12734301741641e-8, -0.17424871230634e-9, -0.68762131295531e-18, 0.14478307828521e-19,
+    0.26335781662795e-22, -0.11947622640071e-22, 0.18228094581404e-23, -0.93537087292458e-25,
+)
+
+# === 区域 2 (IF97 式 15，表 10 / 11) ===
+_R2_J0 = (0, 1, -5, -4, -3, -2, -1, 2, 3)
+_R2_N0 = (
+    -0.96927686500217e1, 0.10086655968018e2, -0.56087911283020e-2, 0.71452738081455e-1, -0.40710498223928,
+    0.14240819171444e1, -0.43839511319450e1, -0.28408632460772, 0.21268463753307e-1,
+)
+_R2_I = (1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 3, 3, 3, 3, 3, 4, 4, 4, 5, 6, 6, 6, 7, 7, 7, 8, 8, 9, 10, 10, 10, 16, 16,
+         18, 20, 20, 20, 21, 22, 23, 24, 24, 24)
+_R2_J = (0, 1, 2, 3, 6, 1, 2, 4, 7, 36, 0, 1, 3, 6, 35, 1, 2, 3, 7, 3, 16, 35, 0, 11, 25, 8, 36, 13, 4, 10, 14,
+         29, 50, 57, 20, 35, 48, 21, 53, 39, 26, 40, 58)
+_R2_N = (
+    -0.17731742473213e-2, -0.17834862292358e-1, -0.45996013696365e-1, -0.57581259083432e-1, -0.50325278727930e-1,
+    -0.33032641670203e-4, -0.18948987516315e-3, -0.39392777243355e-2, -0.43797295650573e-1, -0.26674547914087e-4,
+    0.20481737692309e-7, 0.43870667284435e-6, -0.32277677238570e-4, -0.15033924542148e-2, -0.40668253562649e-1,
+    -0.78847309559367e-9, 0.12790717852285e-7, 0.48225372718507e-6, 0.22922076337661e-5, -0.16714766451061e-10,
+    -0.21171472321355e-2, -0.23895741934104e2, -0.59059564324270e-17, -0.12621808899101e-5, -0.38946842435739e-1,
+    0.11256211360459e-10, -0.82311340897998e1, 0.19809712802088e-7, 0.10406965210174e-18, -0.10234747095929e-12,
+    -0.10018179379511e-8, -0.80882908646985e-10, 0.10693031879409, -0.33662250574171, 0.89185845355421e-24,
+    0.30629316876232e-12, -0.42002467698208e-5, -0.59056029685639e-25, 0.37826947613457e-5, -0.12768608934681e-14,
+    0.73087610595061e-28, 0.55414715350778e-16, -0.94369707241210e-6,
+)
+
+# === 区域 4 (IF97 式 30，表 34) ===
+_R4_N = (
+    0.11670521452767e4, -0.72421316703206e6, -0.17073846940092e2, 0.12020824702470e5, -0.32325550322333e7,
+    0.14915108613530e2, -0.48232657361591e4, 0.40511340542057e6, -0.23855557567849, 0.65017534844798e3,
+)
+
+# === B23 (IF97 式 5) ===
+_B23_N = (0.34805185628969e3, -0.11671859879975e1, 0.10192970039326e-2)
+
+# IAPWS-IF97 验证值 (表 5、15、35、36 及 B23)：(函数名, 参数, 期望值)
+VERIFICATION = (
+    ("h1", (3.0, 300.0), 0.115331273e3), ("s1", (3.0, 300.0), 0.392294792),
+    ("h1", (80.0, 300.0), 0.184142828e3), ("s1", (80.0, 300.0), 0.368563852),
+    ("h1", (3.0, 500.0), 0.975542239e3), ("s1", (3.0, 500.0), 0.258041912e1),
+    ("h2", (0.0035, 300.0), 0.254991145e4), ("s2", (0.0035, 300.0), 0.852238967e1),
+    ("h2", (0.0035, 700.0), 0.333568375e4), ("s2", (0.0035, 700.0), 0.101749996e2),
+    ("h2", (30.0, 700.0), 0.263149474e4), ("s2", (30.0, 700.0), 0.517540298e1),
+    ("ps", (300.0,), 0.353658941e-2), ("ps", (500.0,), 0.263889776e1), ("ps", (600.0,), 0.123443146e2),
+    ("ts", (0.1,), 0.372755919e3), ("ts", (1.0,), 0.453035632e3), ("ts", (10.0,), 0.584149488e3),
+    ("b23", (623.15,), 0.165291643e2),
+)
+
+def _log(x):
+    if isinstance(x, float):
+        return math.log(x)
+    import numpy as np
+    return np.log(x)
+
+# --- 参考公式 (开尔文) ---
+def _region1(p, T):
+    """
+    区域 1 (p MPa, T K) -> (h, s)
+    """
+    pi = p / 16.53
+    tau = 1386.0 / T
+    a = 7.1 - pi
+    b = tau - 1.222
+    g = g_tau = 0.0
+    for i, j, n in zip(_R1_I, _R1_J, _R1_N):
+        term = n * a ** i * b ** j
+        g = g + term
+        if j:
+            g_tau = g_tau + term * j / b
+    return R * T * tau * g_tau, R * (tau * g_tau - g)
+
+def _region1_enthalpy(p, T):
+    pi = p / 16.53
+    tau = 1386.0 / T
+    a = 7.1 - pi
+    b = tau - 1.222
+    g_tau = 0.0
+    for i, j, n in zip(_R1_I, _R1_J, _R1_N):
+        if j:
+            g_tau = g_tau + n * j * a ** i * b ** (j - 1)
+    return R * T * tau * g_tau
+
+def _region2_parts(p, T):
+    tau = 540.0 / T
+    b = tau - 0.5
+    g0_tau = 0.0
+    for j, n in zip(_R2_J0, _R2_N0):
+        if j:
+            g0_tau = g0_tau + n * j * tau ** (j - 1)
+    gr = gr_tau = 0.0
+    for i, j, n in zip(_R2_I, _R2_J, _R2_N):
+        term = n * p ** i * b ** j
+        gr = gr + term
+        if j:
+            gr_tau = gr_tau + n * j * p ** i * b ** (j - 1)
+    return tau, g0_tau, gr, gr_tau
+
+def _region2(p, T):
+    """
+    区域 2 (p MPa, T K) -> (h, s)
+    """
+    tau, g0_tau, gr, gr_tau = _region2_parts(p, T)
+    g0 = _log(p)
+    for j, n in zip(_R2_J0, _R2_N0):
+        g0 = g0 + n * tau ** j
+    h = R * T * tau * (g0_tau + gr_tau)
+    return h, R * (tau * (g0_tau + gr_tau) - (g0 + gr))
+
+def _region2_enthalpy(p, T):
+    tau, g0_tau, _, gr_tau = _region2_parts(p, T)
+    return R * T * tau * (g0_tau + gr_tau)
+
+def _psat(T):
+    """
+    饱和压力 (T K -> MPa)
+    """
+    n = _R4_N
+    theta = T + n[8] / (T - n[9])
+    A = theta * theta + n[0] * theta + n[1]
+    B = n[2] * theta * theta + n[3] * theta + n[4]
+    C = n[5] * theta * theta + n[6] * theta + n[7]
+    return (2.0 * C / (-B + (B * B - 4.0 * A * C) ** 0.5)) ** 4
+
+def _tsat(p):
+    """
+    饱和温度 (p MPa -> K)
+    """
+    n = _R4_N
+    beta = p ** 0.25
+    E = beta * beta + n[2] * beta + n[5]
+    F = n[0] * beta * beta + n[3] * beta + n[6]
+    G = n[1] * beta * beta + n[4] * beta + n[7]
+    D = 2.0 * G / (-F - (F * F - 4.0 * E * G) ** 0.5)
+    return (n[9] + D - ((n[9] + D) ** 2 - 4.0 * (n[8] + n[9] * D)) ** 0.5) / 2.0
+
+def _p_b23(T):
+    return _B23_N[0] + _B23_N[1] * T + _B23_N[2] * T * T
+
+def verify() -> dict:
+    """
+    参考公式对 IAPWS-IF97 验证值的最大相对偏差 {"max_rel_error", "cases"}
+    """
+    funcs = {
+        "h1": lambda p, T: _region1(p, T)[0], "s1": lambda p, T: _region1(p, T)[1],
+        "h2": lambda p, T: _region2(p, T)[0], "s2": lambda p, T: _region2(p, T)[1],
+        "ps": _psat, "ts": _tsat, "b23": _p_b23,
+    }
+    worst = 0.0
+    for name, args, expected in VERIFICATION:
+        worst = max(worst, abs(funcs[name](*args) / expected - 1.0))
+    return {"max_rel_error": worst, "cases": len(VERIFICATION)}
+
+# --- 参考公式 (°C) ---
+def if97_region(p_mpa, t_c) -> int:
+    """
+    (p, T) 所在的 IF97 区域 (1 或 2)；超出区域 1/2 的适用范围时抛出 ValueError
+    饱和线上按液相 (区域 1) 处理
+    """
+    T = t_c + 273.15
+    if not (T_MIN <= T <= T_MAX_R2) or not (0.0 < p_mpa <= P_MAX):
+        raise ValueError(f"超出 IF97 区域 1/2 的适用范围: p={p_mpa} MPa, T={t_c} °C")
+    if T <= T_MAX_R1:
+        return 1 if p_mpa >= _psat(T) else 2
+    if p_mpa <= _p_b23(T):
+        return 2
+    raise ValueError(f"p={p_mpa} MPa, T={t_c} °C 位于 IF97 区域 3 (近临界区)，不支持")
+
+def if97_enthalpy(p_mpa, t_c):
+    if if97_region(p_mpa, t_c) == 1:
+        return _region1_enthalpy(p_mpa, t_c + 273.15)
+    return _region2_enthalpy(p_mpa, t_c + 273.15)
+
+def if97_entropy(p_mpa, t_c):
+    if if97_region(p_mpa, t_c) == 1:
+        return _region1(p_mpa, t_c + 273.15)[1]
+    return _region2(p_mpa, t_c + 273.15)[1]
+
+def if97_saturation_pressure(t_c):
+    """
+    饱和压力 MPa (0 ~ 373.946 °C)
+    """
+    return _psat(t_c + 273.15)
+
+def if97_saturation_temperature(p_mpa):
+    """
+    饱和温度 °C (611.213 Pa ~ 22.064 MPa)
+    """
+    return _tsat(p_mpa) - 273.15
+
+def if97_saturated_liquid_enthalpy(t_c):
+    T = t_c + 273.15
+    return _region1_enthalpy(_psat(T), T)
+
+def if97_saturated_vapor_enthalpy(t_c):
+    T = t_c + 273.15
+    return _region2_enthalpy(_psat(T), T)
+
+def if97_saturated_liquid_entropy(t_c):
+    T = t_c + 273.15
+    return _region1(_psat(T), T)[1]
+
+def if97_saturated_vapor_entropy(t_c):
+    T = t_c + 273.15
+    return _region2(_psat(T), T)[1]
+
+# === 饱和线插值表 (纯 Python，不依赖 NumPy) ===
+SAT_T_MIN = 0.0
+SAT_T_MAX = 350.0      # 区域 1/2 的饱和线上限 (再往上饱和液属于区域 3)
+
+class CurveTable:
+    """
+    均匀网格上的三次 Hermite 插值，节点斜率取参考公式的中心差分；范围外按端点取值，NaN 返回 NaN
+    """
+    def __init__(self, f, x0, x1, n):
+        self.f = f
+        self.x0, self.x1, self.n = x0, x1, n
+        self.h = (x1 - x0) / n
+        self.inv_h = 1.0 / self.h
+        xs = [x0 + k * self.h for k in range(n + 1)]
+        ys = [f(x) for x in xs]
+        eps = self.h * 1e-3
+        slopes = [(f(min(x + eps, x1)) - f(max(x - eps, x0))) / (min(x + eps, x1) - max(x - eps, x0)) * self.h
+                  for x in xs]
+        c2 = [3 * (ys[k + 1] - ys[k]) - 2 * slopes[k] - slopes[k + 1] for k in range(n)]
+        c3 = [2 * (ys[k] - ys[k + 1]) + slopes[k] + slopes[k + 1] for k in range(n)]
+        # 每个区间 (c0, c1, c2, c3)，t ∈ [0, 1] 上 c0 + c1 t + c2 t^2 + c3 t^3
+        self.cells = list(zip(ys[:-1], slopes[:-1], c2, c3))
+        self.first, self.last = ys[0], ys[-1]
+        self._arrays = None
+
+    def __call__(self, x):
+        u = (x - self.x0) * self.inv_h
+        if u <= 0.0:
+            return self.first
+        if u < self.n:
+            k = int(u)
+            a, b, c, d = self.cells[k]
+            t = u - k
+            return a + t * (b + t * (c + t * d))
+        return self.last if u >= self.n else u
+
+    def lookup_array(self, x):
+        import numpy as np
+        if self._arrays is None:
+            self._arrays = tuple(np.asarray(self.cells).T)
+        c0, c1, c2, c3 = self._arrays
+        u = np.clip((np.asarray(x, dtype=float) - self.x0) * self.inv_h, 0.0, float(self.n))
+        nan = np.isnan(u)
+        k = np.minimum(np.where(nan, 0.0, u).astype(np.int64), self.n - 1)
+        t = u - k
+        return np.where(u >= self.n, self.last, c0[k] + t * (c1[k] + t * (c2[k] + t * c3[k])))
+
+    def max_error(self):
+        """
+        区间中点处相对参考公式的最大绝对误差
+        """
+        return max(abs(self(self.x0 + (k + 0.5) * self.h) - self.f(self.x0 + (k + 0.5) * self.h))
+                   for k in range(self.n))
+
+_CURVES = {
+    "saturated_liquid_enthalpy": if97_saturated_liquid_enthalpy,
+    "saturated_vapor_enthalpy": if97_saturated_vapor_enthalpy,
+    "saturated_liquid_entropy": if97_saturated_liquid_entropy,
+    "saturated_vapor_entropy": if97_saturated_vapor_entropy,
+    "saturation_pressure": if97_saturation_pressure,
+}
+_CURVE_TABLES = {}
+
+def curve_table(name) -> CurveTable:
+    """
+    饱和线插值表 (首次使用时建表)
+    """
+    table = _CURVE_TABLES.get(name)
+    if table is None:
+        table = _CURVE_TABLES[name] = CurveTable(_CURVES[name], SAT_T_MIN, SAT_T_MAX, 350)
+    return table
+
+def _check_range(t_c):
+    if not SAT_T_MIN <= t_c <= SAT_T_MAX:
+        raise ValueError(f"温度 {t_c} °C 超出饱和线物性范围 ({SAT_T_MIN:g} ~ {SAT_T_MAX:g} °C)")
+
+def _curve(name, t_c):
+    # 对偶数 (灵敏度计算) 走参考公式
+    if isinstance(t_c, (int, float)):
+        if t_c != t_c:
+            return t_c
+        _check_range(t_c)
+        table = _CURVE_TABLES.get(name)
+        if table is None:
+            table = curve_table(name)
+        return table(t_c)
+    _check_range(t_c)
+    return _CURVES[name](t_c)
+
+def _curve_array(name, t_c):
+    # 超出范围的元素为 NaN (数组中逐元素抛出异常会让整批失败)
+    import numpy as np
+    t_c = np.asarray(t_c, dtype=float)
+    inside = (t_c >= SAT_T_MIN) & (t_c <= SAT_T_MAX)
+    return np.where(inside, curve_table(name).lookup_array(t_c), np.nan)
+
+def saturated_liquid_enthalpy(t_c):
+    """饱和水焓 kJ/kg (0 ~ 350 °C，范围外抛出 ValueError，NaN 返回 NaN)"""
+    return _curve("saturated_liquid_enthalpy", t_c)
+
+def saturated_vapor_enthalpy(t_c):
+    """饱和蒸汽焓 kJ/kg (0 ~ 350 °C，范围外抛出 ValueError，NaN 返回 NaN)"""
+    return _curve("saturated_vapor_enthalpy", t_c)
+
+def saturated_liquid_entropy(t_c):
+    """饱和水熵 kJ/(kg·K)"""
+    return _curve("saturated_liquid_entropy", t_c)
+
+def saturated_vapor_entropy(t_c):
+    """饱和蒸汽熵 kJ/(kg·K)"""
+    return _curve("saturated_vapor_entropy", t_c)
+
+def saturation_pressure(t_c):
+    """饱和压力 MPa (0 ~ 350 °C，范围外抛出 ValueError，NaN 返回 NaN)"""
+    return _curve("saturation_pressure", t_c)
+
+def saturation_temperature(p_mpa):
+    """
+    饱和温度 °C (IF97 区域 4 反算式为显式公式，不查表)；压力限制在三相点 ~ 临界点之间
+    """
+    return _tsat(min(max(p_mpa, 611.213e-6), P_CRIT)) - 273.15
+
+def saturated_vapor_enthalpy_array(t_c):
+    """数组版 saturated_vapor_enthalpy (超出 0 ~ 350 °C 的元素为 NaN)"""
+    return _curve_array("saturated_vapor_enthalpy", t_c)
+
+def saturated_liquid_enthalpy_array(t_c):
+    """数组版 saturated_liquid_enthalpy (超出 0 ~ 350 °C 的元素为 NaN)"""
+    return _curve_array("saturated_liquid_enthalpy", t_c)
+
+def saturation_temperature_array(p_mpa):
+    import numpy as np
+    return _tsat(np.clip(np.asarray(p_mpa, dtype=float), 611.213e-6, P_CRIT)) - 273.15
+
+# === h(p, T) / s(p, T) 双三次表 (NumPy) ===
+# 网格: (温度 °C 下限, 上限, 段数, 压力坐标下限, 上限, 段数, 压力坐标 "linear" 为 MPa / "log" 为 lg MPa)
+_GRIDS = {
+    1: (0.0, 350.0, 140, 0.0, 100.0, 100, "linear"),
+    2: (0.0, 800.0, 160, -3.0, 2.0, 200, "log"),
+}
+_M = ((1.0, 0.0, 0.0, 0.0), (0.0, 0.0, 1.0, 0.0), (-3.0, 3.0, -2.0, -1.0), (2.0, -2.0, 1.0, 1.0))
+
+class BicubicTable:
+    """
+    矩形网格上的双三次 Hermite 插值 (x = 温度 °C，y = 压力坐标)
+    节点值 f 与偏导数 f_x、f_y、f_xy 取参考公式 (中心差分)，每个单元 16 个系数
+    """
+    def __init__(self, f, x0, x1, nx, y0, y1, ny):
+        import numpy as np
+        self.x0, self.x1, self.nx = x0, x1, nx
+        self.y0, self.y1, self.ny = y0, y1, ny
+        self.hx = (x1 - x0) / nx
+        self.hy = (y1 - y0) / ny
+        self.inv_hx, self.inv_hy = 1.0 / self.hx, 1.0 / self.hy
+        X, Y = np.meshgrid(x0 + self.hx * np.arange(nx + 1), y0 + self.hy * np.arange(ny + 1), indexing="ij")
+        ex, ey = self.hx * 1e-3, self.hy * 1e-3
+        with np.errstate(all="ignore"):
+            F = f(X, Y)
+            Fx = (f(X + ex, Y) - f(X - ex, Y)) / (2 * ex) * self.hx
+            Fy = (f(X, Y + ey) - f(X, Y - ey)) / (2 * ey) * self.hy
+            Fxy = (f(X + ex, Y + ey) - f(X + ex, Y - ey) - f(X - ex, Y + ey) + f(X - ex, Y - ey)) \
+                / (4 * ex * ey) * self.hx * self.hy
+        # 单元 (i, j) 的角点矩阵 [[f00, f01, fy00, fy01], [f10, f11, fy10, fy11], [fx00, ...], [fx10, ...]]
+        K = np.empty((nx, ny, 4, 4))
+        K[..., 0, 0], K[..., 0, 1], K[..., 0, 2], K[..., 0, 3] = F[:-1, :-1], F[:-1, 1:], Fy[:-1, :-1], Fy[:-1, 1:]
+        K[..., 1, 0], K[..., 1, 1], K[..., 1, 2], K[..., 1, 3] = F[1:, :-1], F[1:, 1:], Fy[1:, :-1], Fy[1:, 1:]
+        K[..., 2, 0], K[..., 2, 1], K[..., 2, 2], K[..., 2, 3] = Fx[:-1, :-1], Fx[:-1, 1:], Fxy[:-1, :-1], Fxy[:-1, 1:]
+        K[..., 3, 0], K[..., 3, 1], K[..., 3, 2], K[..., 3, 3] = Fx[1:, :-1], Fx[1:, 1:], Fxy[1:, :-1], Fxy[1:, 1:]
+        M = np.asarray(_M)
+        # 系数 C[i][j] 对应 u^i v^j
+        self.coef = np.einsum("ab,...bc,dc->...ad", M, K, M).reshape(nx * ny, 16)
+        self._flat = None
+        self._columns = None
+
+    def __call__(self, x, y):
+        """
+        标量查表 (调用方保证在网格范围内)
+        """
+        c = self._flat
+        if c is None:
+            c = self._flat = array("d", self.coef.ravel().tolist())
+        u = (x - self.x0) * self.inv_hx
+        v = (y - self.y0) * self.inv_hy
+        i = min(int(u), self.nx - 1)
+        j = min(int(v), self.ny - 1)
+        u -= i
+        v -= j
+        k = (i * self.ny + j) * 16
+        c0, c1, c2, c3, c4, c5, c6, c7, c8, c9, c10, c11, c12, c13, c14, c15 = c[k:k + 16]
+        b0 = c0 + v * (c1 + v * (c2 + v * c3))
+        b1 = c4 + v * (c5 + v * (c6 + v * c7))
+        b2 = c8 + v * (c9 + v * (c10 + v * c11))
+        b3 = c12 + v * (c13 + v * (c14 + v * c15))
+        return b0 + u * (b1 + u * (b2 + u * b3))
+
+    def lookup_array(self, x, y):
+        import numpy as np
+        u = (np.asarray(x, dtype=float) - self.x0) * self.inv_hx
+        v = (np.asarray(y, dtype=float) - self.y0) * self.inv_hy
+        i = np.clip(u.astype(np.int64), 0, self.nx - 1)
+        j = np.clip(v.astype(np.int64), 0, self.ny - 1)
+        u = u - i
+        v = v - j
+        if self._columns is None:
+            self._columns = np.ascontiguousarray(self.coef.T)
+        cell = i * self.ny + j
+        c = [column.take(cell) for column in self._columns]
+        b = [c[4 * k] + v * (c[4 * k + 1] + v * (c[4 * k + 2] + v * c[4 * k + 3])) for k in range(4)]
+        return b[0] + u * (b[1] + u * (b[2] + u * b[3]))
+
+_PT_TABLES = {}
+
+def _pt_function(region, prop, scale):
+    # 网格坐标 (°C, 压力坐标) 上的参考公式
+    def f(t_c, y):
+        p = 10.0 ** y if scale == "log" else y
+        T = t_c + 273.15
+        if region == 1:
+            h, s = _region1(p, T)
+        else:
+            h, s = _region2(p, T)
+        return h if prop == "h" else s
+    return f
+
+def pt_table(region, prop) -> BicubicTable:
+    """
+    区域 region 的 h / s 双三次表 (首次使用时建表)
+    """
+    key = (region, prop)
+    table = _PT_TABLES.get(key)
+    if table is None:
+        x0, x1, nx, y0, y1, ny, scale = _GRIDS[region]
+        table = _PT_TABLES[key] = BicubicTable(_pt_function(region, prop, scale), x0, x1, nx, y0, y1, ny)
+    return table
+
+def _pt_region(p_mpa, t_c):
+    # 查表用的区域判断：饱和压力取饱和线插值表 (与数组版本逐元素一致)
+    T = t_c + 273.15
+    if not (T_MIN <= T <= T_MAX_R2) or not (0.0 < p_mpa <= P_MAX):
+        raise ValueError(f"超出 IF97 区域 1/2 的适用范围: p={p_mpa} MPa, T={t_c} °C")
+    if T <= T_MAX_R1:
+        table = _CURVE_TABLES.get("saturation_pressure") or curve_table("saturation_pressure")
+        return 1 if p_mpa >= table(t_c) else 2
+    if p_mpa <= _p_b23(T):
+        return 2
+    raise ValueError(f"p={p_mpa} MPa, T={t_c} °C 位于 IF97 区域 3 (近临界区)，不支持")
+
+def _pt_lookup(prop, p_mpa, t_c):
+    region = _pt_region(p_mpa, t_c)
+    x0, x1, _, y0, y1, _, scale = _GRIDS[region]
+    y = math.log10(p_mpa) if scale == "log" else p_mpa
+    if x0 <= t_c <= x1 and y0 <= y <= y1:
+        return (_PT_TABLES.get((region, prop)) or pt_table(region, prop))(t_c, y)
+    exact = _region1 if region == 1 else _region2
+    return exact(p_mpa, t_c + 273.15)[0 if prop == "h" else 1]
+
+def enthalpy(p_mpa, t_c):
+    """
+    焓 kJ/kg (过冷水 / 过热蒸汽，按饱和线自动判断区域；饱和线上按液相)
+    """
+    return _pt_lookup("h", p_mpa, t_c)
+
+def entropy(p_mpa, t_c):
+    """
+    熵 kJ/(kg·K)
+    """
+    return _pt_lookup("s", p_mpa, t_c)
+
+def _pt_lookup_array(prop, p_mpa, t_c):
+    import numpy as np
+    p, t = np.broadcast_arrays(np.asarray(p_mpa, dtype=float), np.asarray(t_c, dtype=float))
+    p, t = p.ravel(), t.ravel()
+    T = t + 273.15
+    valid = (T >= T_MIN) & (T <= T_MAX_R2) & (p > 0) & (p <= P_MAX)
+    low = T <= T_MAX_R1
+    liquid = low & (p >= curve_table("saturation_pressure").lookup_array(t))
+    with np.errstate(all="ignore"):
+        vapor = ~liquid & (low | (p <= _p_b23(T)))
+    if not (valid & (liquid | vapor)).all():
+        raise ValueError("部分 (p, T) 超出 IF97 区域 1/2 的适用范围")
+    out = np.empty(p.shape)
+    for region, mask in ((1, liquid), (2, vapor)):
+        idx = np.flatnonzero(mask)
+        if not len(idx):
+            continue
+        x0, x1, _, y0, y1, _, scale = _GRIDS[region]
+        ps, ts = p[idx], t[idx]
+        y = np.log10(ps) if scale == "log" else ps
+        inside = (ts >= x0) & (ts <= x1) & (y >= y0) & (y <= y1)
+        values = pt_table(region, prop).lookup_array(ts, y)
+        if not inside.all():
+            exact = _region1 if region == 1 else _region2
+            values[~inside] = exact(ps[~inside], ts[~inside] + 273.15)[0 if prop == "h" else 1]
+        out[idx] = values
+    return out.reshape(np.broadcast(np.asarray(p_mpa), np.asarray(t_c)).shape)
+
+def enthalpy_array(p_mpa, t_c):
+    return _pt_lookup_array("h", p_mpa, t_c)
+
+def entropy_array(p_mpa, t_c):
+    return _pt_lookup_array("s", p_mpa, t_c)
+
+def error_report() -> dict:
+    """
+    各表相对参考公式的实测最大误差 {"max_abs_error", "max_rel_error", "points"}
+    饱和线表取各区间中点；h / s 表在每个单元内取 3 x 3 个点 (含跨越饱和线的单元)，只统计落在对应区域内的点
+    """
+    import numpy as np
+    report = {name: {"max_abs_error": curve_table(name).max_error()} for name in _CURVES}
+    offsets = (1.0 / 6.0, 0.5, 5.0 / 6.0)
+    for region in (1, 2):
+        x0, x1, nx, y0, y1, ny, scale = _GRIDS[region]
+        hx, hy = (x1 - x0) / nx, (y1 - y0) / ny
+        t = (x0 + hx * (np.arange(nx)[:, None] + np.asarray(offsets))).ravel()
+        y = (y0 + hy * (np.arange(ny)[:, None] + np.asarray(offsets))).ravel()
+        t, y = np.meshgrid(t, y, indexing="ij")
+        p = 10.0 ** y if scale == "log" else y
+        T = t + 273.15
+        with np.errstate(all="ignore"):
+            ps = _psat(np.minimum(T, T_MAX_R1))
+            if region == 1:
+                keep = (T <= T_MAX_R1) & (p >= ps) & (p > 0)
+            else:
+                keep = (p > 0) & np.where(T <= T_MAX_R1, p < ps, p <= _p_b23(T))
+        p, t, T = p[keep], t[keep], T[keep]
+        # 饱和线附近的点按查表的区域判断取舍 (两者在饱和压力表误差范围内可能不同)
+        same = (p >= curve_table("saturation_pressure").lookup_array(t)) == (region == 1)
+        same |= T > T_MAX_R1
+        p, t, T = p[same], t[same], T[same]
+        exact = _region1(p, T) if region == 1 else _region2(p, T)
+        for prop, ref, approx in (("enthalpy", exact[0], enthalpy_array(p, t)), ("entropy", exact[1], entropy_array(p, t))):
+            err = np.abs(approx - ref)
+            report[f"region{region}_{prop}"] = {
+                "max_abs_error": float(err.max()), "max_rel_error": float((err / np.abs(ref)).max()),
+                "points": int(len(p)),
+            }
+    return report
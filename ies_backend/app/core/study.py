@@ -0,0 +1,238 @@
+# app/core/study.py
+# 大规模方案C 研究：请求列表分块 (chunk) 后分发到进程池，绕开 GIL 用满多核
+# 每块在子进程内校验 + 求解 (逐个 SchemeCSolver，或整块交给 BatchSchemeCSolver)，
+# 结果可在子进程内直接编码为 NDJSON，父进程只负责拼接输出
+# 子进程内的求解统计按块随结果带回，在父进程的遥测 (默认 SOLVER_TELEMETRY) 中合并
+#
+# 内存上限与总条数无关：输入按需切块，在途块数受 max_pending 限制
+
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from app.core.telemetry import SOLVER_TELEMETRY, SolverTelemetry
+from app.streaming import encode_line
+from app.validation import RequestValidationError, validate_scheme_c
+
+DEFAULT_CHUNK_SIZE = 256
+
+# === 子进程侧 ===
+_WORKER_SOLVERS = {}
+
+def _worker_solver(vectorized, tolerance, telemetry=None):
+    """
+    每个进程按配置缓存一个求解器实例 (进程池复用时无需重复创建)，遥测每次按调用方指定
+    """
+    key = (vectorized, tolerance)
+    solver = _WORKER_SOLVERS.get(key)
+    if solver is None:
+        if vectorized:
+            from app.core.batch import BatchSchemeCSolver
+            solver = BatchSchemeCSolver(tolerance=tolerance)
+        else:
+            from app.core.solver import SchemeCSolver
+            solver = SchemeCSolver(tolerance=tolerance)
+        _WORKER_SOLVERS[key] = solver
+    solver.telemetry = telemetry or SOLVER_TELEMETRY
+    return solver
+
+def _validate(item):
+    """
+    item: dict，或一行 JSON (bytes/str)
+    """
+    if isinstance(item, (bytes, str)):
+        try:
+            item = json.loads(item)
+        except ValueError as e:
+            raise RequestValidationError([{"loc": "body", "msg": f"Invalid JSON: {e}"}])
+    return validate_scheme_c(item)
+
+def solve_chunk(start, items, vectorized=False, tolerance=0.5, encode=False, telemetry=None):
+    """
+    求解一块请求，返回 [{"index", "result"} | {"index", "error", ...}]
+    (encode=True 时返回 NDJSON 字节串)；错误只影响对应条目
+    vectorized=True 时整块交给 BatchSchemeCSolver，结果在容差内与逐个求解一致 (method 为 illinois)
+    telemetry: 本块求解计入的遥测，默认进程级 SOLVER_TELEMETRY
+    """
+    solver = _worker_solver(vectorized, tolerance, telemetry)
+    records = [None] * len(items)
+    valid = []
+    for k, item in enumerate(items):
+        try:
+            valid.append((k, _validate(item)))
+        except RequestValidationError as e:
+            records[k] = {"index": start + k, "error": "请求参数无效", "detail": e.errors}
+
+    if vectorized and valid:
+        from app.core.batch import columns_from_requests, to_records
+        try:
+            result = solver.solve(columns_from_requests([req for _, req in valid]))
+            for (k, _), record in zip(valid, to_records(result)):
+                records[k] = {"index": start + k, "result": record}
+            valid = []
+        except Exception:
+            # 整块失败时退回逐个求解，定位出错条目
+            solver = _worker_solver(False, tolerance, telemetry)
+
+    for k, req in valid:
+        try:
+            records[k] = {"index": start + k, "result": solver.solve(req)}
+        except Exception as e:
+            records[k] = {"index": start + k, "error": str(e)}
+
+    if encode:
+        return b"".join(encode_line(record) for record in records)
+    return records
+
+def solve_chunk_task(start, items, vectorized=False, tolerance=0.5, encode=False):
+    """
+    子进程任务: solve_chunk，返回 (输出, 本块的遥测计数)，计数由父进程合并
+    """
+    telemetry = SolverTelemetry(trace_sample_rate=SOLVER_TELEMETRY.trace_sample_rate)
+    return solve_chunk(start, items, vectorized, tolerance, encode, telemetry), telemetry.counts()
+
+# === 父进程侧 ===
+def iter_chunks(items, chunk_size, start=0):
+    """
+    任意可迭代对象 -> (起始序号, 列表) 块，按需读取；start 为首条的序号 (断点续算时跳过已完成的条目)
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+class StudyRunner:
+    def __init__(self, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, ordered=True,
+                 vectorized=False, tolerance=0.5, max_pending=None, executor=None, telemetry=None):
+        """
+        workers: 进程数 (默认 CPU 核数)；<= 1 且未传 executor 时在当前进程内执行
+        chunk_size: 每次分发的条目数 (越大调度开销越低，进度与取消粒度越粗)
+        ordered: True 按输入顺序输出；False 按完成顺序输出 (index 字段标明原序号)
+        vectorized: 每块使用 BatchSchemeCSolver
+        max_pending: 在途块数上限 (默认 workers * 4)，限制父进程内存
+        executor: 共享的进程池 (由调用方管理生命周期)；None 时每次 run 自建并关闭
+        telemetry: 求解统计 (含子进程带回的计数) 计入的遥测，默认进程级 SOLVER_TELEMETRY
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, int(chunk_size))
+        self.ordered = ordered
+        self.vectorized = vectorized
+        self.tolerance = tolerance
+        self.max_pending = max_pending or self.workers * 4
+        self.executor = executor
+        self.telemetry = telemetry or SOLVER_TELEMETRY
+        self._cancel = threading.Event()
+        self._futures = set()
+        self._lock = threading.Lock()
+        self.submitted = self.completed = 0
+        self.started_at = None
+
+    def cancel(self):
+        """
+        取消研究：不再分发新块，尚未开始的块直接撤销 (可从其他线程调用)
+        """
+        self._cancel.set()
+        self._cancel_pending()
+
+    def _cancel_pending(self):
+        with self._lock:
+            for future in self._futures:
+                future.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def progress(self) -> dict:
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0.0
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "elapsed_s": round(elapsed, 3),
+            "cases_per_sec": round(self.completed / elapsed, 1) if elapsed > 0 else 0.0,
+            "cancelled": self.cancelled,
+        }
+
+    def run(self, items, encode=False, on_progress=None, start=0):
+        """
+        生成器：逐块返回结果 (encode=False 为记录列表，True 为 NDJSON 字节串)
+        on_progress(progress_dict) 在每块完成后调用；start 为 items 首条的序号 (结果 index 从此开始)
+        提前关闭生成器或调用 cancel() 都会停止分发
+        """
+        self._cancel.clear()
+        self.submitted = self.completed = 0
+        self.started_at = time.perf_counter()
+        chunks = iter_chunks(items, self.chunk_size, start)
+
+        if self.executor is None and self.workers <= 1:
+            for start, chunk in chunks:
+                if self.cancelled:
+                    return
+                self.submitted += len(chunk)
+                output = solve_chunk(start, chunk, self.vectorized, self.tolerance, encode, self.telemetry)
+                self.completed += len(chunk)
+                if on_progress:
+                    on_progress(self.progress())
+                yield output
+            return
+
+        executor = self.executor or ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            yield from self._dispatch(executor, chunks, encode, on_progress)
+        finally:
+            # 生成器提前关闭时撤销剩余块 (共享进程池不受影响)
+            self._cancel_pending()
+            if self.executor is None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def _dispatch(self, executor, chunks, encode, on_progress):
+        pending = {}       # future -> (块序号, 条数)
+        done_chunks = {}   # 有序输出时暂存的已完成块
+        next_chunk = 0     # 有序输出时下一个应输出的块序号
+        chunk_id = 0
+        exhausted = False
+
+        while True:
+            # 补充在途块 (有序模式下把尚未输出的已完成块也计入上限)
+            while not exhausted and not self.cancelled and len(pending) + len(done_chunks) < self.max_pending:
+                item = next(chunks, None)
+                if item is None:
+                    exhausted = True
+                    break
+                start, chunk = item
+                future = executor.submit(solve_chunk_task, start, chunk, self.vectorized, self.tolerance, encode)
+                with self._lock:
+                    self._futures.add(future)
+                pending[future] = (chunk_id, len(chunk))
+                chunk_id += 1
+                self.submitted += len(chunk)
+
+            if not pending or self.cancelled:
+                break
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                cid, count = pending.pop(future)
+                with self._lock:
+                    self._futures.discard(future)
+                if future.cancelled():
+                    continue
+                output, counts = future.result()
+                self.telemetry.merge(counts)
+                self.completed += count
+                if on_progress:
+                    on_progress(self.progress())
+                if self.ordered:
+                    done_chunks[cid] = output
+                else:
+                    yield output
+
+            while next_chunk in done_chunks:
+                yield done_chunks.pop(next_chunk)
+                next_chunk += 1
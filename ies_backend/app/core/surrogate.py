@@ -0,0 +1,432 @@
+# app/core/surrogate.py
+# 方案C 代理模型 (surrogate)：交互式 what-if 查询 (前端拖动滑块时逐次重算) 用
+#
+# 每个配置 (燃料、模式、策略、热泵类型、手动 COP) 在给定输入范围 (信任域) 内拟合一个多元多项式，
+# 预测根处的需求系数 z = (COP - 1) / COP，再经烟气放热的解析反函数得到排烟温度 t̂
+# (露点上下放热斜率不同，直接拟合排烟温度会在露点处产生折角误差)
+#
+# 查询 (热路径为纯 Python，不经过 NumPy): 预测 t̂ (微秒级) -> 一次残差评估验证:
+#   需求随排烟温度单调不减、放热单调递减，真根必在 t̂ 与 t1 = 放热反函数(需求(t̂)) 之间，
+#   |t̂ - t1| 即严格误差界；误差界 <= accuracy 时直接返回，否则以 t1 继续修正 (至多 MAX_CORRECTIONS 次)，
+#   仍不满足时以最后一点为初值热启动精确求解
+#   验证集上 t̂ 的最大误差已 <= accuracy 且没有误答不可行点时，跳过残差评估直接返回 t̂ (误差界为验证统计值)
+# 信任域外 (配置不同、输入超出拟合范围、其余字段与拟合基准不同) 直接精确求解
+# 拟合结果可保存为 JSON，进程重启后加载
+
+import itertools
+import json
+import os
+import threading
+import time
+from operator import mul
+
+import numpy as np
+
+from app.core.batch import BatchSchemeCSolver
+from app.core.cache import request_fields
+from app.core.solver import SchemeCSolver, SolverState
+from app.core.telemetry import SolverTelemetry
+from app.validation import validate_scheme_c
+
+FORMAT_VERSION = 1
+DEFAULT_ACCURACY = 0.1          # 排烟温度误差界 (°C)
+MAX_DEGREE = 6
+MAX_CORRECTIONS = 2             # 预测后至多追加的修正次数 (每次一次残差评估)
+MAX_SAMPLES = 200_000           # 单次拟合的最大训练样本数
+
+# 影响根的数值字段 (可作为代理模型的输入)；其余数值字段 (目标排烟温度、过量空气系数、海拔) 不影响收敛解
+ROOT_FIELDS = ("sink_in_temp", "sink_out_target", "sink_flow_kg_h", "source_in_temp", "source_flow_vol",
+               "efficiency", "manual_cop")
+# 配置字段：每个取值组合单独拟合
+CONFIG_FIELDS = ("fuel_type", "mode", "strategy", "recovery_type", "is_manual_cop")
+
+def config_key(fields) -> str:
+    return "|".join(str(fields[name]) for name in CONFIG_FIELDS)
+
+def cop_factor(cop):
+    """
+    需求系数 (与 SchemeCSolver._energy_balance 一致): 热源需求 = 目标负荷 * 需求系数
+    """
+    return np.where(cop > 1.0, (cop - 1.0) / np.where(cop > 1.0, cop, 1.0), 0.0)
+
+class Polynomial:
+    """
+    总次数 <= degree 的多元多项式，输入先按 [lower, upper] 归一化到 [-1, 1]
+    """
+    def __init__(self, lower, upper, degree, coef=None):
+        self.lower = np.asarray(lower, dtype=float)
+        self.upper = np.asarray(upper, dtype=float)
+        self.degree = int(degree)
+        self.center = (self.upper + self.lower) / 2.0
+        self.inv_half = 2.0 / (self.upper - self.lower)
+        d = len(self.lower)
+        self.exponents = np.array(
+            [e for e in itertools.product(range(self.degree + 1), repeat=d) if sum(e) <= self.degree],
+            dtype=np.intp,
+        )
+        self._powers = np.arange(self.degree + 1)
+        # 单点预测: 每个单项式 = 某个更低次单项式 (字典序在前) × 一个变量，记为 (前项下标, 变量下标)
+        index = {tuple(e): i for i, e in enumerate(self.exponents.tolist())}
+        self._steps = []
+        for e in self.exponents.tolist()[1:]:
+            k = next(k for k, power in enumerate(e) if power)
+            parent = list(e)
+            parent[k] -= 1
+            self._steps.append((index[tuple(parent)], k))
+        self._center = self.center.tolist()
+        self._inv_half = self.inv_half.tolist()
+        self._set_coef(coef)
+
+    def _set_coef(self, coef):
+        self.coef = None if coef is None else np.asarray(coef, dtype=float)
+        self._coef = None if coef is None else self.coef.tolist()
+
+    def _design(self, X):
+        U = (np.asarray(X, dtype=float) - self.center) * self.inv_half
+        A = np.ones((len(U), len(self.exponents)))
+        for k in range(U.shape[1]):
+            A *= (U[:, k:k + 1] ** self._powers)[:, self.exponents[:, k]]
+        return A
+
+    def fit(self, X, y):
+        self._set_coef(np.linalg.lstsq(self._design(X), np.asarray(y, dtype=float), rcond=None)[0])
+        return self
+
+    def predict(self, X):
+        return self._design(X) @ self.coef
+
+    def predict_one(self, x) -> float:
+        """
+        单点预测 (查询热路径，纯 Python)：每个单项式一次乘法，再与系数点积
+        """
+        u = [(value - center) * inv_half for value, center, inv_half in zip(x, self._center, self._inv_half)]
+        monomials = [1.0]
+        append = monomials.append
+        for parent, k in self._steps:
+            append(monomials[parent] * u[k])
+        return sum(map(mul, self._coef, monomials))
+
+class SurrogateModel:
+    def __init__(self, config, fixed, variables, lower, upper, degree, coef=None, errors=None, samples=0,
+                 fitted_at=None):
+        """
+        config: 配置字段取值；fixed: 不在 variables 中的 ROOT_FIELDS 取值 (查询时须一致)
+        variables / lower / upper: 输入字段及其拟合范围 (信任域)
+        errors: 对照精确求解器的验证统计 (见 SurrogateSolver.fit)
+        """
+        self.config = dict(config)
+        self.fixed = dict(fixed)
+        self.variables = list(variables)
+        self.poly = Polynomial(lower, upper, degree, coef)
+        self.errors = errors or {}
+        self.samples = samples
+        self.fitted_at = fitted_at
+        self.key = config_key(self.config)
+        self._lower = [float(v) for v in lower]
+        self._upper = [float(v) for v in upper]
+        self._ranges = list(zip(self.variables, self._lower, self._upper))
+        self._fixed = list(self.fixed.items())
+
+    def covers(self, fields) -> bool:
+        for name, lo, hi in self._ranges:
+            if not lo <= fields[name] <= hi:
+                return False
+        for name, value in self._fixed:
+            if fields[name] != value:
+                return False
+        return True
+
+    def answers_directly(self, accuracy) -> bool:
+        """
+        验证集上 t̂ 的最大误差已 <= accuracy、且没有误答不可行点时，查询不再做残差评估
+        """
+        prediction_max = self.errors.get("prediction_max")
+        return (prediction_max is not None and prediction_max <= accuracy
+                and self.errors.get("infeasible_answered") == 0)
+
+    def predict_factor(self, fields) -> float:
+        return self.poly.predict_one([fields[name] for name in self.variables])
+
+    def summary(self) -> dict:
+        return {
+            "key": self.key,
+            "config": self.config,
+            "variables": {name: [lo, hi] for name, lo, hi in zip(self.variables, self._lower, self._upper)},
+            "fixed": self.fixed,
+            "degree": self.poly.degree,
+            "terms": len(self.poly.exponents),
+            "samples": self.samples,
+            "errors": self.errors,
+            "fitted_at": self.fitted_at,
+        }
+
+    def to_dict(self) -> dict:
+        data = self.summary()
+        data["coef"] = self.poly.coef.tolist()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        variables = list(data["variables"])
+        return cls(
+            data["config"], data["fixed"], variables,
+            [data["variables"][name][0] for name in variables], [data["variables"][name][1] for name in variables],
+            data["degree"], coef=data["coef"], errors=data.get("errors"), samples=data.get("samples", 0),
+            fitted_at=data.get("fitted_at"),
+        )
+
+def parse_domain(domain):
+    """
+    domain: 字段名 -> [下限, 上限] 或 {"min", "max"}，返回 [(名称, 下限, 上限)]
+    """
+    if not domain:
+        raise ValueError("至少需要一个代理模型输入字段")
+    parsed = []
+    for name, spec in domain.items():
+        if name not in ROOT_FIELDS:
+            raise ValueError(f"不支持的代理模型输入字段: {name} (可选: {', '.join(ROOT_FIELDS)})")
+        lo, hi = (spec.get("min"), spec.get("max")) if isinstance(spec, dict) else spec
+        if lo is None or hi is None or not float(lo) < float(hi):
+            raise ValueError(f"字段 {name} 的范围必须满足 min < max")
+        parsed.append((name, float(lo), float(hi)))
+    return parsed
+
+class SurrogateSolver:
+    def __init__(self, solver=None, accuracy=DEFAULT_ACCURACY):
+        """
+        solver: 精确求解器 (信任域外 / 精度不足时使用)
+        accuracy: 默认排烟温度误差界 (°C)
+        """
+        self.solver = solver or SchemeCSolver()
+        self.accuracy = accuracy
+        self.models = {}    # 配置键 -> [SurrogateModel]
+        self._lock = threading.Lock()
+        self.hits = self.fallbacks = self.outside = 0
+
+    # === 模型管理 ===
+    def add(self, model):
+        """
+        加入模型 (同一配置下变量与固定字段完全相同的旧模型被替换)
+        """
+        with self._lock:
+            models = [m for m in self.models.get(model.key, [])
+                      if (m.variables, m.fixed) != (model.variables, model.fixed)]
+            self.models[model.key] = models + [model]
+
+    def find(self, fields):
+        for model in self.models.get(config_key(fields), ()):
+            if model.covers(fields):
+                return model
+        return None
+
+    def summary(self) -> dict:
+        return {
+            "models": [model.summary() for models in self.models.values() for model in models],
+            "stats": {"hits": self.hits, "fallbacks": self.fallbacks, "outside": self.outside},
+        }
+
+    def save(self, path):
+        """
+        写入 JSON (先写临时文件再替换，避免中途失败留下残缺文件)
+        """
+        data = {"version": FORMAT_VERSION,
+                "models": [model.to_dict() for models in self.models.values() for model in models]}
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def load(self, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"代理模型文件版本 {data.get('version')} 不受支持 (应为 {FORMAT_VERSION})")
+        for item in data["models"]:
+            self.add(SurrogateModel.from_dict(item))
+        return self
+
+    # === 查询 ===
+    def _predict(self, req, fields, model, accuracy, corrections=MAX_CORRECTIONS):
+        """
+        返回 (结果 或 None, 热启动初值 或 None, 热启动斜率 或 None)
+        模型验证统计已满足 accuracy 时 (见 SurrogateModel.answers_directly) 直接返回 t̂，
+        误差界取验证集上的最大误差 ("validated": true)，不评估残差 (residual 为 None)；否则:
+        每次残差评估给出 t_k 的误差界 |t_k+1 - t_k|，t_k+1 = 放热反函数(需求(t_k))；
+        误差界不满足、或热量残差未达到精确求解器的收敛判据 (|残差| < tolerance) 时继续修正
+        (至多 corrections 次：首次取不动点 t_k+1，之后取落在 [t_k, t_k+1] 内的割线步)
+        """
+        solver = self.solver
+        effective_sink_target, q_sink_target_kw = solver._sink_target(req)
+        t_in, flow, fuel_type = req.source_in_temp, req.source_flow_vol, req.fuel_type
+        min_flue_out = max(5.0, req.source_out_target)
+        if not (q_sink_target_kw > 0 and flow > 0):
+            return None, None, None
+
+        z = model.predict_factor(fields)
+        t = solver.flue_temperature_for_heat(q_sink_target_kw * z, t_in, flow, fuel_type)
+        if 0.0 < z < 1.0 and model.answers_directly(accuracy):
+            if not min_flue_out <= t <= t_in:
+                return None, None, None
+            # 不做残差评估：t̂ 处放热即 需求系数 × 目标负荷，COP 由需求系数反算 (z = (COP - 1) / COP)
+            return {
+                "status": "converged",
+                "iterations": 0,
+                "residual": None,
+                "method": "surrogate",
+                "target_load_kw": round(q_sink_target_kw, 1),
+                "required_source_out": round(t, 2),
+                "final_cop": round(1.0 / (1.0 - z), 2),
+                "source_total_kw": round(q_sink_target_kw * z, 1),
+                "surrogate": {"used": True, "error_bound": model.errors["prediction_max"], "validated": True},
+            }, None, None
+        for evaluation in range(1, corrections + 2):
+            if not min_flue_out <= t <= t_in:
+                return None, None, None
+            cop, q_source_avail, q_source_needed = solver._energy_balance(
+                req, t, effective_sink_target, q_sink_target_kw
+            )
+            # 真根在 t 与 t_next 之间 (需求随排烟温度单调不减、放热单调递减)
+            t_next = solver.flue_temperature_for_heat(q_source_needed, t_in, flow, fuel_type)
+            residual = q_source_avail - q_source_needed
+            bound = abs(t_next - t)
+            # 与精确求解器相同的收敛判据 (rootfind: |f| < ftol)，否则不能标记为 converged
+            if bound <= accuracy and abs(residual) < solver.tolerance and min_flue_out <= t_next <= t_in:
+                break
+            if evaluation > corrections:
+                slope = residual / (t - t_next) if t_next != t else None
+                return None, t, slope
+            # 有上一点时取割线步 (须落在 t 与 t_next 之间)，否则取不动点 t_next
+            step = t_next
+            if evaluation > 1 and residual != previous[1]:
+                secant = t - residual * (t - previous[0]) / (residual - previous[1])
+                if min(t, t_next) <= secant <= max(t, t_next):
+                    step = secant
+            previous = (t, residual)
+            t = step
+        return {
+            "status": "converged",
+            "iterations": evaluation,
+            "residual": round(residual, 3),
+            "method": "surrogate",
+            "target_load_kw": round(q_sink_target_kw, 1),
+            "required_source_out": round(t, 2),
+            "final_cop": cop,
+            "source_total_kw": round(q_source_avail, 1),
+            "surrogate": {"used": True, "error_bound": round(bound, 4)},
+        }, None, None
+
+    def solve(self, req, accuracy=None) -> dict:
+        """
+        代理模型求解；信任域外或误差界超过 accuracy (°C) 时回退到精确求解
+        结果附带 "surrogate": {"used", "error_bound"?, "reason"?}
+        """
+        accuracy = self.accuracy if accuracy is None else accuracy
+        fields = request_fields(req)
+        model = self.find(fields)
+        if model is None:
+            self.outside += 1
+            result = self.solver.solve(req)
+            result["surrogate"] = {"used": False, "reason": "outside_trust_region"}
+            return result
+
+        result, guess, slope = self._predict(req, fields, model, accuracy)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.fallbacks += 1
+        result = self.solver.solve(req, initial_guess=guess, state=SolverState(slope=slope))
+        result["surrogate"] = {"used": False, "reason": "accuracy"}
+        return result
+
+    # === 拟合 ===
+    def fit(self, base, domain, degree=4, samples=4000, validation=1000, seed=0) -> SurrogateModel:
+        """
+        在 domain 范围内拉丁超立方采样，批量精确求解 (独立遥测) 后拟合需求系数，并加入本求解器
+        base: 基准请求 (配置字段与不在 domain 中的字段取其值)
+        validation: 验证点数 (独立采样，逐个对照 SchemeCSolver 精确解统计误差)
+        """
+        base = validate_scheme_c(base).model_dump()
+        ranges = parse_domain(domain)
+        if not 1 <= degree <= MAX_DEGREE:
+            raise ValueError(f"degree 必须在 1 ~ {MAX_DEGREE} 之间")
+        if not 1 <= samples <= MAX_SAMPLES or not 0 <= validation <= MAX_SAMPLES:
+            raise ValueError(f"samples / validation 必须在 1 ~ {MAX_SAMPLES} 之间")
+
+        names = [name for name, _, _ in ranges]
+        lower = np.array([lo for _, lo, _ in ranges])
+        upper = np.array([hi for _, _, hi in ranges])
+        rng = np.random.default_rng(seed)
+
+        def sample(count):
+            d = len(names)
+            U = (rng.permuted(np.tile(np.arange(count), (d, 1)), axis=1).T + rng.random((count, d))) / count
+            return lower + U * (upper - lower)
+
+        X = sample(samples)
+        columns = {**base, **{name: X[:, k] for k, name in enumerate(names)}}
+        result = BatchSchemeCSolver(tolerance=self.solver.tolerance, telemetry=SolverTelemetry()).solve(columns)
+        converged = result["converged"]
+        model = SurrogateModel(
+            {name: base[name] for name in CONFIG_FIELDS},
+            {name: base[name] for name in ROOT_FIELDS if name not in names},
+            names, lower, upper, degree, samples=int(converged.sum()), fitted_at=round(time.time(), 3),
+        )
+        if converged.sum() < 2 * len(model.poly.exponents):
+            raise ValueError(
+                f"收敛样本 {int(converged.sum())} 个，不足以拟合 {len(model.poly.exponents)} 项多项式 "
+                "(增大 samples、降低 degree 或缩小范围)"
+            )
+        model.poly.fit(X[converged], cop_factor(result["final_cop"][converged]))
+        model.errors = self._validate(model, base, sample(validation)) if validation else {}
+        self.add(model)
+        return model
+
+    def _validate(self, model, base, X):
+        """
+        逐点对照精确求解器 (独立遥测，不计入进程统计)，只统计精确解收敛的点:
+          prediction_*: 预测排烟温度 t̂ 相对精确解的误差 (°C)；residual_max: t̂ 处热量残差的最大绝对值 (kW)
+          hit_rate: 默认精度下由代理模型作答 (含修正) 的比例；answer_max_error: 这些点相对精确解的最大偏差
+          infeasible_answered: 精确解不收敛 (热源限制)、t̂ 却落在可行区间内的点数 (直接作答时会误答)
+        """
+        exact = SchemeCSolver(tolerance=self.solver.tolerance, max_iter=self.solver.max_iter,
+                              method=self.solver.method, telemetry=SolverTelemetry())
+        probe = SurrogateSolver(exact, self.accuracy)
+        errors, residuals, answered, bounds = [], [], [], []
+        infeasible_answered = 0
+        for x in X:
+            req = validate_scheme_c({**base, **{name: float(v) for name, v in zip(model.variables, x)}})
+            reference = exact.solve(req)
+            fields = request_fields(req)
+            effective_sink_target, q_sink_target_kw = exact._sink_target(req)
+            z = model.predict_factor(fields)
+            t_hat = exact.flue_temperature_for_heat(
+                q_sink_target_kw * z, req.source_in_temp, req.source_flow_vol, req.fuel_type
+            )
+            if "is_source_limited" in reference:
+                if 0.0 < z < 1.0 and max(5.0, req.source_out_target) <= t_hat <= req.source_in_temp:
+                    infeasible_answered += 1
+                continue
+            errors.append(abs(t_hat - reference["required_source_out"]))
+            _, q_source_avail, q_source_needed = exact._energy_balance(
+                req, t_hat, effective_sink_target, q_sink_target_kw
+            )
+            residuals.append(abs(q_source_avail - q_source_needed))
+            result, _, _ = probe._predict(req, fields, model, self.accuracy)
+            if result is not None:
+                answered.append(abs(result["required_source_out"] - reference["required_source_out"]))
+                bounds.append(result["surrogate"]["error_bound"])
+        errors = np.asarray(errors)
+        feasible = len(errors)
+        return {
+            "validation_points": len(X),
+            "feasible_fraction": round(feasible / len(X), 4),
+            "prediction_max": round(float(errors.max()), 4) if feasible else None,
+            "prediction_p99": round(float(np.quantile(errors, 0.99)), 4) if feasible else None,
+            "prediction_rms": round(float(np.sqrt((errors ** 2).mean())), 4) if feasible else None,
+            "residual_max": round(max(residuals), 4) if residuals else None,
+            "infeasible_answered": infeasible_answered,
+            "accuracy": self.accuracy,
+            "hit_rate": round(len(answered) / feasible, 4) if feasible else None,
+            "answer_max_error": round(max(answered), 4) if answered else None,
+            "answer_bound_max": round(max(bounds), 4) if bounds else None,
+        }
@@ -0,0 +1,134 @@
+# app/core/sweep.py
+# 参数扫描 (全因子试验设计): 基准请求 + 若干扫描轴 -> 网格结果 (列式)
+# 网格一次性展开为列数组，交给向量化引擎计算，不做嵌套循环
+
+import numpy as np
+
+from app.core import vectorized as vec
+from app.core.batch import SCHEME_C_COLUMNS, BatchSchemeCSolver
+from app.validation import REQUIRED, STANDARD_FIELDS
+
+MAX_SWEEP_POINTS = 1_000_000  # 单次扫描的最大网格点数
+
+# 标准计算 (StandardCalcRequest) 的字段与默认值
+STANDARD_COLUMNS = {
+    name: (None if default is REQUIRED else default) for name, _, default in STANDARD_FIELDS
+}
+
+# 方案C 扫描默认返回的结果列
+SCHEME_C_FIELDS = (
+    "target_load_kw", "required_source_out", "final_cop", "source_total_kw",
+    "actual_sink_out", "is_source_limited", "converged", "iterations", "condensed_water",
+)
+# 可选的其余结果列
+SCHEME_C_EXTRA_FIELDS = ("residual", "initial_water", "final_water")
+
+def axis_values(name, spec):
+    """
+    扫描轴取值
+    spec: {"values": [...]} 或 {"start", "stop", "step"} (含终点) 或 {"start", "stop", "num"}
+    """
+    values = spec.get("values")
+    if values is not None:
+        if not len(values):
+            raise ValueError(f"扫描轴 {name} 的取值列表为空")
+        return np.asarray(values)
+
+    start, stop = spec.get("start"), spec.get("stop")
+    if start is None or stop is None:
+        raise ValueError(f"扫描轴 {name} 需要 values，或 start + stop")
+    if spec.get("num") is not None:
+        if spec["num"] < 1:
+            raise ValueError(f"扫描轴 {name} 的 num 必须 >= 1")
+        return np.round(np.linspace(start, stop, int(spec["num"])), 10)
+
+    step = spec.get("step")
+    if not step or (stop - start) / step < 0:
+        raise ValueError(f"扫描轴 {name} 的 step 必须非零且与 start -> stop 方向一致")
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    if count > MAX_SWEEP_POINTS:
+        raise ValueError(f"扫描轴 {name} 点数 {count} 超过上限 {MAX_SWEEP_POINTS}")
+    return np.round(start + step * np.arange(count), 10)
+
+def build_grid(base, axes, allowed_fields):
+    """
+    展开全因子网格
+    base: 基准请求 (dict)；axes: 字段名 -> 轴定义 (按给定顺序，最后一个轴变化最快)
+    返回 (各轴取值, 网格形状, 列字典)
+    """
+    unknown = [name for name in axes if name not in allowed_fields]
+    if unknown:
+        raise ValueError(f"不支持的扫描字段: {', '.join(unknown)}")
+    if not axes:
+        raise ValueError("至少需要一个扫描轴")
+
+    grid_axes = {name: axis_values(name, spec) for name, spec in axes.items()}
+    shape = tuple(len(values) for values in grid_axes.values())
+    total = int(np.prod(shape))
+    if total > MAX_SWEEP_POINTS:
+        raise ValueError(f"网格点数 {total} 超过上限 {MAX_SWEEP_POINTS}")
+
+    columns = {name: value for name, value in base.items() if name in allowed_fields}
+    index = np.indices(shape).reshape(len(shape), -1)
+    for k, (name, values) in enumerate(grid_axes.items()):
+        columns[name] = values[index[k]]
+    return grid_axes, shape, columns
+
+def to_jsonable(values):
+    """
+    数组 -> JSON 列表 (NaN 转为 None)
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind == "f" and np.isnan(arr).any():
+        return [None if np.isnan(v) else v for v in arr.tolist()]
+    return arr.tolist()
+
+def _grid_response(grid_axes, shape, result, fields):
+    return {
+        "shape": list(shape),
+        "count": int(np.prod(shape)),
+        "axes": {name: to_jsonable(values) for name, values in grid_axes.items()},
+        "columns": {name: to_jsonable(result[name]) for name in fields},
+    }
+
+def sweep_scheme_c(base, axes, fields=None, solver=None):
+    """
+    方案C 参数扫描，网格各点由 BatchSchemeCSolver 同时求解
+    收敛点的析水量同样计算 (full_condensation)，便于绘制曲面
+    """
+    fields = list(fields or SCHEME_C_FIELDS)
+    unknown = [name for name in fields if name not in SCHEME_C_FIELDS + SCHEME_C_EXTRA_FIELDS]
+    if unknown:
+        raise ValueError(f"未知的结果字段: {', '.join(unknown)}")
+    grid_axes, shape, result = sweep_scheme_c_grid(base, axes, solver)
+    return _grid_response(grid_axes, shape, result, fields)
+
+def sweep_scheme_c_grid(base, axes, solver=None):
+    """
+    展开网格并批量求解，返回 (各轴取值, 网格形状, BatchSchemeCSolver 结果列) (二进制列式返回用)
+    """
+    grid_axes, shape, columns = build_grid(base, axes, SCHEME_C_COLUMNS)
+    result = (solver or BatchSchemeCSolver()).solve(columns, full_condensation=True)
+    return grid_axes, shape, result
+
+def sweep_standard(base, axes):
+    """
+    标准计算 (COP) 参数扫描，对应 /calculate/standard 的逐点逻辑
+    """
+    grid_axes, shape, columns = build_grid(base, axes, STANDARD_COLUMNS)
+    n = int(np.prod(shape))
+    cols = {}
+    for name, default in STANDARD_COLUMNS.items():
+        value = columns.get(name, default)
+        cols[name] = np.broadcast_to(np.asarray(value), (n,))
+
+    source = cols["source_temp"].astype(float)
+    target = cols["target_temp"].astype(float)
+    cop, lift, error = vec.cop(
+        source - 5.0, target + 5.0, cols["efficiency"].astype(float),
+        cols["mode"] == "STEAM", cols["strategy"] == "STRATEGY_GEN", False
+    )
+    result = _grid_response(grid_axes, shape, {"cop": cop, "lift": lift, "error_code": error},
+                            ("cop", "lift", "error_code"))
+    result["errors"] = {str(code): msg for code, msg in vec.COP_ERROR_MESSAGES.items() if msg}
+    return result
@@ -0,0 +1,131 @@
+# app/core/telemetry.py
+# 求解器遥测：内存计数 + 按需/抽样的逐次迭代轨迹 (求解过程不做任何 I/O)
+import bisect
+import os
+import random
+import threading
+from collections import deque
+
+# 直方图桶上界 (le)，最后隐含 +Inf
+ITERATION_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50, 100, 200, 500, 1000)
+WALL_TIME_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)  # 秒
+
+class SolverTelemetry:
+    def __init__(self, trace_sample_rate=0.0, max_traces=20):
+        # trace_sample_rate: 未显式请求 trace 时，按此比例抽样保存轨迹 (0 表示关闭)
+        self.trace_sample_rate = trace_sample_rate
+        self._lock = threading.Lock()
+        self._traces = deque(maxlen=max_traces)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.solves = 0
+            self.converged = 0
+            self.fallback = 0
+            self.fallback_no_root = 0      # 区间内无根 (快速失败)
+            self.source_limited = 0
+            self.iterations_total = 0
+            self.iterations_max = 0
+            self.wall_time_total = 0.0     # 秒
+            self.wall_time_max = 0.0
+            # 各桶的 (非累计) 计数，末位为 +Inf
+            self.iterations_buckets = [0] * (len(ITERATION_BUCKETS) + 1)
+            self.wall_time_buckets = [0] * (len(WALL_TIME_BUCKETS) + 1)
+            self._traces.clear()
+
+    def should_sample(self) -> bool:
+        return self.trace_sample_rate > 0 and random.random() < self.trace_sample_rate
+
+    def record(self, stats, trace=None):
+        """
+        记录一次求解
+        stats: solve() 生成的单次统计 (iterations / converged / fallback / bracketed / source_limited / wall_time_ms)
+        trace: 抽样或请求得到的迭代轨迹
+        """
+        wall_time = stats["wall_time_ms"] / 1000.0
+        with self._lock:
+            self.solves += 1
+            if stats["fallback"]:
+                self.fallback += 1
+                if not stats["bracketed"]:
+                    self.fallback_no_root += 1
+            else:
+                self.converged += 1
+            if stats["source_limited"]:
+                self.source_limited += 1
+            self.iterations_total += stats["iterations"]
+            if stats["iterations"] > self.iterations_max:
+                self.iterations_max = stats["iterations"]
+            self.wall_time_total += wall_time
+            if wall_time > self.wall_time_max:
+                self.wall_time_max = wall_time
+            self.iterations_buckets[bisect.bisect_left(ITERATION_BUCKETS, stats["iterations"])] += 1
+            self.wall_time_buckets[bisect.bisect_left(WALL_TIME_BUCKETS, wall_time)] += 1
+            if trace is not None:
+                self._traces.append({"stats": stats, "trace": trace})
+
+    def counts(self) -> dict:
+        """
+        原始计数 (可跨进程传递，由 merge 累加到另一实例)
+        """
+        with self._lock:
+            return {
+                "solves": self.solves,
+                "converged": self.converged,
+                "fallback": self.fallback,
+                "fallback_no_root": self.fallback_no_root,
+                "source_limited": self.source_limited,
+                "iterations_total": self.iterations_total,
+                "iterations_max": self.iterations_max,
+                "wall_time_total": self.wall_time_total,
+                "wall_time_max": self.wall_time_max,
+                "iterations_buckets": list(self.iterations_buckets),
+                "wall_time_buckets": list(self.wall_time_buckets),
+                "traces": list(self._traces),
+            }
+
+    def merge(self, counts):
+        """
+        累加一批求解的计数 (子进程的 counts()，或批量求解器按通道汇总的计数)
+        """
+        with self._lock:
+            for name in ("solves", "converged", "fallback", "fallback_no_root", "source_limited",
+                         "iterations_total", "wall_time_total"):
+                setattr(self, name, getattr(self, name) + counts[name])
+            self.iterations_max = max(self.iterations_max, counts["iterations_max"])
+            self.wall_time_max = max(self.wall_time_max, counts["wall_time_max"])
+            for k, count in enumerate(counts["iterations_buckets"]):
+                self.iterations_buckets[k] += count
+            for k, count in enumerate(counts["wall_time_buckets"]):
+                self.wall_time_buckets[k] += count
+            self._traces.extend(counts.get("traces", ()))
+
+    def snapshot(self, traces=True) -> dict:
+        """
+        traces=False 时不复制抽样轨迹 (供 /metrics 频繁抓取)
+        """
+        with self._lock:
+            solves = self.solves or 1
+            return {
+                "solves": self.solves,
+                "converged": self.converged,
+                "fallback": self.fallback,
+                "fallback_no_root": self.fallback_no_root,
+                "source_limited": self.source_limited,
+                "iterations_total": self.iterations_total,
+                "iterations_mean": round(self.iterations_total / solves, 2),
+                "iterations_max": self.iterations_max,
+                "wall_time_mean_ms": round(self.wall_time_total / solves * 1000.0, 4),
+                "wall_time_max_ms": round(self.wall_time_max * 1000.0, 4),
+                "wall_time_total_s": self.wall_time_total,
+                "iterations_histogram": {"buckets": list(ITERATION_BUCKETS), "counts": list(self.iterations_buckets)},
+                "wall_time_histogram": {"buckets": list(WALL_TIME_BUCKETS), "counts": list(self.wall_time_buckets)},
+                "trace_sample_rate": self.trace_sample_rate,
+                "sampled_traces": list(self._traces) if traces else [],
+            }
+
+# 进程级默认实例 (环境变量 IES_TRACE_SAMPLE_RATE 控制抽样比例)
+SOLVER_TELEMETRY = SolverTelemetry(
+    trace_sample_rate=float(os.environ.get("IES_TRACE_SAMPLE_RATE", "0"))
+)
@@ -0,0 +1,229 @@
+# app/core/uncertainty.py
+# 方案C 不确定性传播 (Monte Carlo)：按各输入字段的概率分布抽样，
+# 每批样本交给 BatchSchemeCSolver 同时求解 (含析水模型)，统计分位数 / 直方图
+#
+# 随机数: numpy Generator (PCG64)，给定 seed 与 batch_size 时结果可复现
+# 提前停止: 每批后按次序统计量给出各分位数的置信区间 (二项分布正态近似)，
+#           所有关注指标的区间半宽均小于 rtol * |分位数| (或 atol) 时停止
+
+import math
+import time
+
+import numpy as np
+
+from app.core.batch import SCHEME_C_COLUMNS, BatchSchemeCSolver
+from app.core.optimize import METRICS, design_metrics
+from app.validation import SCHEME_C_FIELDS, validate_scheme_c
+
+MAX_SAMPLES = 1_000_000          # 单次分析的最大样本数
+DEFAULT_METRICS = ("recovered_kw", "delivered_kw", "cop", "condensed_water")
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+CONFIDENCE_Z = 1.96              # 分位数置信区间 (95%)
+
+_FIELD_KINDS = {name: kind for name, kind, _ in SCHEME_C_FIELDS}
+
+# 分布 -> 必填参数
+DISTRIBUTIONS = {
+    "normal": ("mean", "std"),
+    "uniform": ("low", "high"),
+    "triangular": ("low", "mode", "high"),
+    "lognormal": ("mean", "sigma"),   # 底层正态分布的均值 / 标准差
+    "choice": ("values",),            # 离散取值 (可选 weights)
+}
+
+def parse_distribution(base, name, spec):
+    """
+    校验单个字段的分布定义，返回规范化后的 dict
+    数值分布可选 min / max 截断 (超出部分取边界值，如 efficiency 不超过 1)
+    """
+    if name not in SCHEME_C_COLUMNS:
+        raise ValueError(f"不支持的不确定字段: {name}")
+    dist = spec.get("dist")
+    if dist not in DISTRIBUTIONS:
+        raise ValueError(f"字段 {name} 的分布 {dist} 不支持 (可选: {', '.join(DISTRIBUTIONS)})")
+    missing = [key for key in DISTRIBUTIONS[dist] if spec.get(key) is None]
+    if missing:
+        raise ValueError(f"字段 {name} 的 {dist} 分布缺少参数: {', '.join(missing)}")
+
+    if dist == "choice":
+        values = spec["values"]
+        if not len(values):
+            raise ValueError(f"字段 {name} 的取值列表为空")
+        weights = spec.get("weights")
+        if weights is not None:
+            weights = np.asarray(weights, dtype=float)
+            if weights.shape != (len(values),) or (weights < 0).any() or not weights.sum() > 0:
+                raise ValueError(f"字段 {name} 的 weights 必须与 values 等长且非负")
+            weights = weights / weights.sum()
+        # 逐个取值按请求校验 (类型转换与单点求解一致)
+        values = [getattr(validate_scheme_c({**base, name: v}), name) for v in values]
+        return {"dist": dist, "values": values, "weights": weights}
+
+    if _FIELD_KINDS[name] is not float:
+        raise ValueError(f"字段 {name} 不是数值字段，请用 choice 分布")
+    parsed = {"dist": dist, "min": spec.get("min"), "max": spec.get("max")}
+    for key in DISTRIBUTIONS[dist]:
+        parsed[key] = float(spec[key])
+    if dist in ("normal", "lognormal") and parsed[DISTRIBUTIONS[dist][1]] < 0:
+        raise ValueError(f"字段 {name} 的标准差不能为负")
+    if dist == "uniform" and not parsed["low"] <= parsed["high"]:
+        raise ValueError(f"字段 {name} 的 low 不能大于 high")
+    if dist == "triangular" and not parsed["low"] <= parsed["mode"] <= parsed["high"]:
+        raise ValueError(f"字段 {name} 需满足 low <= mode <= high")
+    return parsed
+
+def draw(rng, spec, size):
+    """
+    按分布定义抽样
+    """
+    dist = spec["dist"]
+    if dist == "choice":
+        index = rng.choice(len(spec["values"]), size=size, p=spec["weights"])
+        return np.asarray(spec["values"], dtype=object)[index]
+    if dist == "normal":
+        samples = rng.normal(spec["mean"], spec["std"], size)
+    elif dist == "uniform":
+        samples = rng.uniform(spec["low"], spec["high"], size)
+    elif dist == "triangular":
+        if spec["low"] == spec["high"]:
+            samples = np.full(size, spec["low"])
+        else:
+            samples = rng.triangular(spec["low"], spec["mode"], spec["high"], size)
+    else:
+        samples = rng.lognormal(spec["mean"], spec["sigma"], size)
+    if spec["min"] is not None or spec["max"] is not None:
+        samples = np.clip(samples, spec["min"], spec["max"])
+    return samples
+
+def quantile_interval(sorted_values, q, z=CONFIDENCE_Z):
+    """
+    分位数的无分布置信区间：次序统计量 X_(n q ± z sqrt(n q (1-q)))
+    返回 (下限, 上限)
+    """
+    n = len(sorted_values)
+    half = z * math.sqrt(n * q * (1.0 - q))
+    lo = min(max(int(math.floor(n * q - half)), 0), n - 1)
+    hi = min(max(int(math.ceil(n * q + half)), 0), n - 1)
+    return float(sorted_values[lo]), float(sorted_values[hi])
+
+def _summary(values, quantiles, bins):
+    """
+    单个指标的统计量 (NaN 样本不计)
+    """
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {"count": 0}
+    ordered = np.sort(values)
+    counts, edges = np.histogram(ordered, bins=bins)
+    summary = {
+        "count": int(len(ordered)),
+        "mean": round(float(ordered.mean()), 4),
+        "std": round(float(ordered.std(ddof=1)), 4) if len(ordered) > 1 else 0.0,
+        "min": float(ordered[0]),
+        "max": float(ordered[-1]),
+        "quantiles": {},
+        "intervals": {},
+        "histogram": {"edges": [round(float(e), 4) for e in edges], "counts": counts.tolist()},
+    }
+    for q in quantiles:
+        label = f"p{q * 100:g}"
+        summary["quantiles"][label] = round(float(np.quantile(ordered, q)), 4)
+        summary["intervals"][label] = [round(v, 4) for v in quantile_interval(ordered, q)]
+    return summary
+
+class UncertaintyAnalysis:
+    def __init__(self, base, distributions, metrics=DEFAULT_METRICS, quantiles=DEFAULT_QUANTILES,
+                 samples=100_000, batch_size=10_000, seed=0, early_stop=True, rtol=0.005, atol=1e-3,
+                 min_samples=5_000, bins=20, prices=None, solver=None):
+        """
+        base: 基准请求 (dict)；distributions: 字段名 -> 分布定义 (见 DISTRIBUTIONS)
+        metrics: 统计的指标 (见 app.core.optimize.METRICS)；quantiles: 0~1 之间的分位点
+        samples: 最大样本数；batch_size: 每批样本数 (每批一次批量求解)
+        early_stop: 所有指标各分位数的 95% 置信区间半宽 <= max(rtol * |分位数|, atol) 时提前停止
+        min_samples: 提前停止前的最少样本数
+        """
+        self.base = validate_scheme_c(base).model_dump()
+        if not distributions:
+            raise ValueError("至少需要一个不确定字段")
+        self.distributions = {name: parse_distribution(self.base, name, spec) for name, spec in distributions.items()}
+        self.metrics = list(metrics)
+        unknown = [name for name in self.metrics if name not in METRICS]
+        if unknown or not self.metrics:
+            raise ValueError(f"未知的统计指标: {', '.join(unknown) or '(空)'} (可选: {', '.join(METRICS)})")
+        self.quantiles = [float(q) for q in quantiles]
+        if not self.quantiles or not all(0.0 < q < 1.0 for q in self.quantiles):
+            raise ValueError("quantiles 必须在 (0, 1) 之间")
+        if not 1 <= samples <= MAX_SAMPLES:
+            raise ValueError(f"samples 必须在 1 ~ {MAX_SAMPLES} 之间")
+        self.samples = int(samples)
+        self.batch_size = max(1, min(int(batch_size), self.samples))
+        self.seed = seed
+        self.early_stop = early_stop
+        self.rtol = rtol
+        self.atol = atol
+        self.min_samples = min_samples
+        self.bins = bins
+        self.prices = prices
+        self.solver = solver or BatchSchemeCSolver()
+
+    def _batch(self, rng, size):
+        columns = dict(self.base)
+        for name, spec in self.distributions.items():
+            columns[name] = draw(rng, spec, size)
+        result = self.solver.solve(columns, full_condensation=True)
+        return design_metrics(columns, result, self.prices)
+
+    def _converged(self, values):
+        """
+        各指标、各分位数的置信区间是否都已足够窄
+        """
+        for name in self.metrics:
+            column = values[name][~np.isnan(values[name])]
+            if not len(column):
+                continue
+            ordered = np.sort(column)
+            for q in self.quantiles:
+                lo, hi = quantile_interval(ordered, q)
+                center = float(np.quantile(ordered, q))
+                if (hi - lo) / 2.0 > max(self.rtol * abs(center), self.atol):
+                    return False
+        return True
+
+    def run(self) -> dict:
+        started = time.perf_counter()
+        rng = np.random.default_rng(self.seed)
+        chunks = {name: [] for name in METRICS}
+        drawn = batches = 0
+        converged = False
+        while drawn < self.samples:
+            size = min(self.batch_size, self.samples - drawn)
+            metrics = self._batch(rng, size)
+            for name in METRICS:
+                chunks[name].append(np.asarray(metrics[name], dtype=float))
+            drawn += size
+            batches += 1
+            if self.early_stop and drawn >= self.min_samples and drawn < self.samples:
+                values = {name: np.concatenate(chunks[name]) for name in self.metrics}
+                if self._converged(values):
+                    converged = True
+                    break
+
+        values = {name: np.concatenate(chunks[name]) for name in METRICS}
+        if not converged:
+            converged = self._converged(values)
+        return {
+            "samples": drawn,
+            "batches": batches,
+            "seed": self.seed,
+            "stopped_early": drawn < self.samples,
+            "converged": converged,
+            "source_limited_fraction": round(float(values["source_limited"].mean()), 4),
+            "metrics": {name: _summary(values[name], self.quantiles, self.bins) for name in self.metrics},
+            "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 1),
+        }
+
+def uncertainty_scheme_c(base, distributions, **options):
+    """
+    方案C 不确定性分析入口 (参数见 UncertaintyAnalysis)
+    """
+    return UncertaintyAnalysis(base, distributions, **options).run()
@@ -0,0 +1,150 @@
+# app/core/vectorized.py
+# physics.py / cycles.py 的 NumPy 数组版本 (逐元素语义与标量版一致)
+# 用于批量求解 (app.core.batch) 与参数扫描
+
+import numpy as np
+
+from app.core import steam
+
+# calculate_cop 的错误码 (标量版返回中文错误字符串)
+COP_OK = 0
+COP_EVAP_TOO_LOW = 1     # 蒸发温度过低
+COP_COND_TOO_HIGH = 2    # 冷凝温度过高
+COP_LIFT_TOO_SMALL = 3   # 温差过小
+
+COP_ERROR_MESSAGES = {
+    COP_OK: None,
+    COP_EVAP_TOO_LOW: "蒸发温度过低",
+    COP_COND_TOO_HIGH: "冷凝温度过高",
+    COP_LIFT_TOO_SMALL: "温差过小",
+}
+
+def atmospheric_pressure(altitude_m):
+    """
+    对应 physics.calculate_atmospheric_pressure
+    """
+    P0, T0, L = 101.325, 288.15, 0.0065
+    g, M, R = 9.80665, 0.0289644, 8.31447
+    altitude_m = np.maximum(np.asarray(altitude_m, dtype=float), 0.0)
+    exponent = (g * M) / (R * L)
+    pressure = P0 * np.power(1 - (L * altitude_m) / T0, exponent)
+    return np.round(pressure, 3)
+
+def sat_temp_from_pressure(pressure_mpa, atmospheric_pressure_kpa=101.325, *, gauge):
+    """
+    对应 physics.get_sat_temp_from_pressure
+    gauge: 布尔数组 / 标量 (True 表压、False 绝对压力)
+    """
+    pressure_mpa = np.asarray(pressure_mpa, dtype=float)
+    absolute = np.where(gauge, pressure_mpa + np.asarray(atmospheric_pressure_kpa) / 1000, pressure_mpa)
+    safe = np.where(pressure_mpa > 0, absolute, 0.1)
+    val = steam.saturation_temperature_array(safe)
+    return np.where(pressure_mpa > 0, np.round(val, 1), 100.0)
+
+def enthalpy(temp_c, is_steam):
+    """
+    对应 physics.estimate_enthalpy
+    """
+    temp_c = np.asarray(temp_c, dtype=float)
+    return np.where(is_steam, steam.saturated_vapor_enthalpy_array(temp_c), 4.187 * temp_c)
+
+def adjusted_dew_point(ref_dew_point, alpha):
+    """
+    对应 physics.calculate_adjusted_dew_point
+    """
+    ref_dew_point = np.asarray(ref_dew_point, dtype=float)
+    alpha = np.asarray(alpha, dtype=float)
+    safe_alpha = np.maximum(1.0, np.where(alpha == 0, 1.2, alpha))
+    adjusted = np.round(ref_dew_point - 17.0 * (safe_alpha - 1.0), 1)
+    return np.where(ref_dew_point > 0, adjusted, 0.0)
+
+def water_vapor_saturation_pressure(temp_c):
+    """
+    对应 physics.calculate_water_vapor_saturation_pressure (kPa)
+    """
+    A, B, C = 8.07131, 1730.63, 233.426
+    p_mmhg = np.power(10.0, A - B / (C + np.asarray(temp_c, dtype=float)))
+    return p_mmhg * 0.133322
+
+def water_condensation(flue_in_temp, flue_out_temp, flue_vol_flow, h2o_vol_percent, dew_point):
+    """
+    对应 physics.calculate_water_condensation
+    返回 (condensed_water, initial_water, final_water)，单位 kg/h，已按 0.01 取整
+    """
+    T_STP, P_STP, R_H2O = 273.15, 101.325, 0.4615
+    flue_out_temp = np.asarray(flue_out_temp, dtype=float)
+    flue_vol_flow = np.asarray(flue_vol_flow, dtype=float)
+    h2o_vol_percent = np.asarray(h2o_vol_percent, dtype=float)
+
+    below_dew = flue_out_temp < dew_point
+    h2o_density_stp = P_STP / (R_H2O * T_STP)
+    initial_water = flue_vol_flow * (h2o_vol_percent / 100) * h2o_density_stp
+
+    sat_pressure = water_vapor_saturation_pressure(flue_out_temp)
+    final_vapor_pressure = np.minimum(sat_pressure, P_STP * (h2o_vol_percent / 100))
+    final_water = (final_vapor_pressure * final_vapor_pressure * flue_vol_flow) / (R_H2O * P_STP * T_STP)
+    condensed_water = np.maximum(0.0, initial_water - final_water)
+
+    zero = np.zeros_like(initial_water)
+    return (
+        np.where(below_dew, np.round(condensed_water, 2), zero),
+        np.where(below_dew, np.round(initial_water, 2), zero),
+        np.where(below_dew, np.round(final_water, 2), zero),
+    )
+
+def cop(evap_temp, cond_temp, efficiency, is_steam, is_gen, is_absorption):
+    """
+    对应 cycles.calculate_cop
+    mode / strategy / recovery_type 以布尔数组传入:
+      is_steam      mode == "STEAM"
+      is_gen        strategy == "STRATEGY_GEN"
+      is_absorption recovery_type == "ABSORPTION_HP"
+    返回 (cop, lift, error_code)；标量版不返回 lift 的位置为 NaN
+    """
+    evap_temp = np.asarray(evap_temp, dtype=float)
+    cond_temp = np.asarray(cond_temp, dtype=float)
+    lift = cond_temp - evap_temp
+    steam_gen = np.logical_and(is_steam, is_gen)
+
+    # 分支 B: 电动热泵 (MVR/Compressor)
+    t_evap_k = evap_temp + 273.15
+    t_cond_k = cond_temp + 273.15
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cop_carnot = np.minimum(t_cond_k / (t_cond_k - t_evap_k), 15.0)
+    lift_penalty = np.where(np.logical_and(steam_gen, lift > 80), 0.85, 1.0)
+    real_cop = np.round(np.clip(cop_carnot * efficiency * lift_penalty, 1.0, 8.0), 2)
+    out_lift = np.round(lift, 1)
+
+    # 分支 A: 吸收式热泵
+    real_cop = np.where(is_absorption, np.where(steam_gen, 1.45, 1.70), real_cop)
+    out_lift = np.where(is_absorption, lift, out_lift)
+
+    # 物理检查 (按标量版判定顺序，后写入的优先级更低)
+    error = np.full(lift.shape, COP_OK, dtype=np.int8)
+    small_lift = lift <= 10.0
+    real_cop = np.where(small_lift, 8.0, real_cop)
+    out_lift = np.where(small_lift, lift, out_lift)
+    error[small_lift] = COP_LIFT_TOO_SMALL
+
+    cond_high = cond_temp > 160.0
+    evap_low = evap_temp < -30.0
+    invalid = np.logical_or(cond_high, evap_low)
+    real_cop = np.where(invalid, 1.0, real_cop)
+    out_lift = np.where(invalid, np.nan, out_lift)
+    error[cond_high] = COP_COND_TOO_HIGH
+    error[evap_low] = COP_EVAP_TOO_LOW
+
+    return real_cop, out_lift, error
+
+def flue_heat_release(t_in, t_out, flow_vol, dew_point, latent_per_m3):
+    """
+    对应 SchemeCSolver.calculate_flue_heat_release
+    dew_point 为修正后露点，latent_per_m3 为单位烟气最大潜热 (天然气 160，其余 0)
+    """
+    cp_vol_mj = 0.00038 * 3600
+    sensible_kw = (flow_vol * cp_vol_mj * (t_in - t_out)) / 3600.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cond_factor = np.clip((dew_point - t_out) / (dew_point - 5.0), 0.0, 1.0)
+    latent_kw = np.where(t_out < dew_point, flow_vol * latent_per_m3 / 3600.0 * cond_factor, 0.0)
+    return sensible_kw + latent_kw
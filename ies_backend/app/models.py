@@ -1,7 +1,10 @@
 # app/models.py
+from typing import Any, Dict, List, Optional, Union
+
 from pydantic import BaseModel
 
 # 定义前端发过来的数据格式
+# 注意：字段或默认值变更时同步 app/validation.py (Serverless 冷启动路径的轻量校验)
 class StandardCalcRequest(BaseModel):
     source_temp: float      # 热源进水温度
     target_temp: float      # 目标出水温度
@@ -32,4 +35,187 @@ class SchemeCRequest(BaseModel):
     excess_air: float = 1.2       # 过量空气系数，默认1.2
     
     # 🔧 新增：海拔高度（用于计算实际大气压力）
-    altitude: float = 0.0         # 海拔高度 (米)，默认海平面
\ No newline at end of file
+    altitude: float = 0.0         # 海拔高度 (米)，默认海平面
+
+# === 新增：参数扫描 (试验设计) ===
+class SweepAxis(BaseModel):
+    # 三选一: values 列表 / start+stop+step (含终点) / start+stop+num
+    values: Optional[List[Union[float, str, bool]]] = None
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    step: Optional[float] = None
+    num: Optional[int] = None
+
+class SchemeCSweepRequest(BaseModel):
+    base: SchemeCRequest             # 基准工况
+    axes: Dict[str, SweepAxis]       # 扫描字段 -> 轴定义 (最后一个轴变化最快)
+    fields: Optional[List[str]] = None  # 返回的结果列，默认全部
+
+class StandardSweepRequest(BaseModel):
+    base: StandardCalcRequest
+    axes: Dict[str, SweepAxis]
+
+# === 新增：连续求解 (沿单参数路径热启动) ===
+class ContinuationRequest(BaseModel):
+    base: SchemeCRequest             # 基准工况
+    parameter: str                   # 路径参数 (数值字段，如 sink_flow_kg_h)
+    axis: SweepAxis                  # 路径取值 (按给定顺序依次求解)
+    predictor: bool = True           # 用前两步的解线性外推初始猜测
+    compare: bool = True             # 同时冷启动求解，统计节省的迭代次数
+
+# === 新增：设计优化 (多目标，返回 Pareto 前沿) ===
+class OptimizeVariable(BaseModel):
+    # 二选一: min+max (连续) / values (离散枚举)
+    min: Optional[float] = None
+    max: Optional[float] = None
+    values: Optional[List[Union[float, str, bool]]] = None
+
+class OptimizeConstraint(BaseModel):
+    metric: str                      # 指标名 (见 app/core/optimize.py 的 METRICS)
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+class OptimizePrices(BaseModel):
+    elec_price: float = 0.7          # 电价 元/kWh
+    fuel_price: float = 4.0          # 燃料单价 元/单位
+    boiler_eff: float = 0.92         # 锅炉效率
+
+class SchemeCOptimizeRequest(BaseModel):
+    base: SchemeCRequest             # 基准工况 (设计变量以外的字段固定)
+    variables: Dict[str, OptimizeVariable]  # 设计变量，如 source_out_target / efficiency / recovery_type / strategy
+    objectives: List[str] = ["recovered_kw", "cop", "condensed_water"]
+    constraints: List[OptimizeConstraint] = []
+    prices: OptimizePrices = OptimizePrices()
+    starts: int = 16                 # 起点数
+    max_evaluations: int = 20000     # 评估次数预算
+    seed: int = 0                    # 随机种子 (结果可复现)
+
+# === 新增：不确定性分析 (Monte Carlo) ===
+class UncertainDistribution(BaseModel):
+    # normal(mean, std) / uniform(low, high) / triangular(low, mode, high) /
+    # lognormal(mean, sigma) / choice(values, weights?)；数值分布可选 min / max 截断
+    dist: str
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    sigma: Optional[float] = None
+    low: Optional[float] = None
+    mode: Optional[float] = None
+    high: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    values: Optional[List[Union[float, str, bool]]] = None
+    weights: Optional[List[float]] = None
+
+class UncertaintyRequest(BaseModel):
+    base: SchemeCRequest                          # 基准工况
+    distributions: Dict[str, UncertainDistribution]  # 不确定字段 -> 分布
+    metrics: List[str] = ["recovered_kw", "delivered_kw", "cop", "condensed_water"]
+    quantiles: List[float] = [0.1, 0.5, 0.9]
+    samples: int = 100000            # 最大样本数
+    batch_size: int = 10000          # 每批样本数
+    seed: int = 0                    # 随机种子 (结果可复现)
+    early_stop: bool = True          # 分位数置信区间足够窄时提前停止
+    rtol: float = 0.005              # 提前停止: 置信区间半宽 / 分位数
+    min_samples: int = 5000          # 提前停止前的最少样本数
+    bins: int = 20                   # 直方图分箱数
+    prices: OptimizePrices = OptimizePrices()  # 经济参数 (hourly_saving 指标用)
+
+# === 新增：系统经济性批量评估 (移植自 System.js / Boiler.js / HeatPump.js) ===
+class EconomicScenario(BaseModel):
+    topology: str = "RECOVERY"       # PARALLEL (方案A) / COUPLED (方案B) / RECOVERY (方案C)
+    mode: str = "STEAM"              # WATER 或 STEAM
+    strategy: str = "STRATEGY_PRE"   # STRATEGY_PRE 或 STRATEGY_GEN
+    recovery_type: str = "MVR"       # MVR 或 ABSORPTION_HP (仅方案C)
+    source_temp: float = 35.0        # 方案 A/B: 环境 / 余热源入口温度
+    source_out: float = 30.0         # 方案 B: 余热源出口温度
+    flue_in: float = 130.0           # 方案 C: 初始排烟温度
+    flue_out: float = 80.0           # 方案 C: 目标排烟温度
+    excess_air: float = 1.2          # 过量空气系数
+    target_temp: float = 2.5         # 热水供水温度 / 蒸汽压力 (MPa)
+    steam_pressure_type: str = "ABSOLUTE"  # ABSOLUTE (绝对压力) / GAUGE (表压) / AUTO (与前端一致: < 0.5 MPa 视为表压)
+    load_in: float = 70.0            # 方案 C: 补水 / 回水温度
+    load_out: float = 90.0           # 方案 C: 热水目标温度
+    load_value: float = 17500.0      # 设计热负荷 kW
+    perfection_degree: float = 0.45  # 热力完善度
+    is_manual_cop: bool = False
+    manual_cop: float = 3.5
+    fuel_type: str = "NATURAL_GAS"
+    fuel_cal_value: Optional[float] = None  # 低位热值，默认取燃料注册表
+    fuel_cal_unit: str = "MJ/unit"
+    fuel_co2_value: Optional[float] = None  # 碳排放因子，默认取燃料注册表
+    fuel_co2_unit: str = "kgCO2/unit"
+    elec_price: float = 0.7          # 电价 元/kWh
+    fuel_price: float = 4.0          # 燃料单价 元/单位
+    annual_hours: float = 6000.0     # 年运行小时
+    boiler_eff: float = 0.92         # 锅炉效率
+    capex_hp: float = 2500.0         # 热泵单位造价 元/kW
+    capex_base: float = 200.0        # 锅炉单位造价 元/kW
+    altitude: float = 0.0            # 海拔高度 (米)
+    pef_elec: float = 2.5            # 电网一次能源因子
+
+class EconomicsBatchRequest(BaseModel):
+    base: EconomicScenario = EconomicScenario()  # 基准情景
+    # 二选一: scenarios 逐个情景的覆盖字段 / axes 扫描轴 (全因子网格，最后一个轴变化最快)
+    scenarios: List[Dict[str, Union[float, str, bool, None]]] = []
+    axes: Dict[str, SweepAxis] = {}
+    fields: Optional[List[str]] = None  # 返回的结果列，默认全部
+
+# === 新增：代理模型 (交互式快速查询) ===
+class SurrogateRange(BaseModel):
+    min: float
+    max: float
+
+class SurrogateFitRequest(BaseModel):
+    base: SchemeCRequest             # 基准工况 (燃料 / 模式 / 策略 / 热泵类型及 domain 以外的字段固定)
+    domain: Dict[str, SurrogateRange]  # 输入字段 -> 拟合范围 (信任域)，如 sink_in_temp / source_flow_vol / efficiency
+    degree: int = 4                  # 多项式总次数
+    samples: int = 4000              # 训练样本数 (拉丁超立方)
+    validation: int = 1000           # 验证点数 (对照精确求解器)
+    seed: int = 0                    # 随机种子 (结果可复现)
+
+# === 新增：多机组厂站网络 ===
+class NetworkUnit(BaseModel):
+    id: str
+    type: str                        # boiler / sink / mixer / splitter / heat_pump
+    # boiler
+    fuel_type: Optional[str] = None  # 默认 NATURAL_GAS
+    flue_flow_vol: Optional[float] = None  # 标况烟气量 m3/h
+    flue_temp: Optional[float] = None      # 排烟温度
+    excess_air: Optional[float] = None     # 过量空气系数，默认 1.2
+    # sink (热水回路入口)
+    flow_kg_h: Optional[float] = None
+    temp: Optional[float] = None
+    # mixer / splitter
+    inputs: Optional[List[str]] = None     # 混合的流股名
+    input: Optional[str] = None            # 拆分的流股名
+    outputs: Optional[Dict[str, float]] = None  # 输出流股名 -> 分率
+    # heat_pump (产生 <id>.flue 与 <id>.water 流股)
+    source: Optional[str] = None           # 烟气流股名
+    sink: Optional[str] = None             # 热水流股名
+    target_temp: Optional[float] = None    # 目标出水温度
+    min_flue_out: Optional[float] = None   # 排烟温度下限，默认 30
+    efficiency: Optional[float] = None     # 热力完善度，默认 0.55
+    strategy: Optional[str] = None
+    recovery_type: Optional[str] = None
+    is_manual_cop: Optional[bool] = None
+    manual_cop: Optional[float] = None
+
+class NetworkSite(BaseModel):
+    id: str = ""
+    altitude: float = 0.0
+    units: List[NetworkUnit]
+
+class NetworkRequest(BaseModel):
+    sites: List[NetworkSite]
+    tolerance: float = 0.5           # 能量平衡容差 kW
+    max_iter: int = 50
+
+# === 新增：后台任务 (长时间研究 / 全年模拟) ===
+class JobSubmitRequest(BaseModel):
+    kind: str = "study"              # study (批量研究) 或 annual (全年逐时模拟)
+    items: List[Dict[str, Any]]      # study: 每条一个 SchemeCRequest；annual: 逐时时序行
+    chunk_size: int = 256            # 每个检查点包含的条目数
+    vectorized: bool = False         # study: 每块使用批量求解器
+    base: Dict[str, Any] = {}        # annual: 各时刻共用的字段
+    warm_start: bool = True          # annual: 以上一时刻的解热启动
+    step_hours: float = 1.0          # annual: 每行代表的小时数
@@ -0,0 +1,138 @@
+# app/serverless.py
+# Vercel 处理器 (api/calculate/*.py) 的共享冷启动路径
+# 模块级只导入标准库与轻量校验；求解器在首个请求时才导入，pydantic 不在此路径上
+import json
+from urllib.parse import parse_qs, urlparse
+
+from app.streaming import NDJSON_MEDIA_TYPE, encode_line, is_ndjson, iter_json_list, split_lines
+from app.validation import RequestValidationError, validate_scheme_c, validate_standard
+
+_SOLVER = None
+
+def get_scheme_c_solver():
+    """
+    首次调用时导入并创建求解器，之后在同一实例 (热启动) 内复用
+    """
+    global _SOLVER
+    if _SOLVER is None:
+        from app.core.solver import SchemeCSolver
+        _SOLVER = SchemeCSolver()
+    return _SOLVER
+
+def query_flag(path, name) -> bool:
+    query = parse_qs(urlparse(path).query)
+    return query.get(name, ['false'])[0].lower() in ('1', 'true')
+
+def compute_scheme_c(data, path):
+    # 灵敏度依赖 NumPy，而 Serverless 依赖 (根目录 requirements.txt) 不含 NumPy：直接返回 400
+    if query_flag(path, 'sensitivities'):
+        raise RequestValidationError([{
+            "loc": "query.sensitivities",
+            "msg": "Serverless 部署不支持灵敏度计算，请使用 FastAPI 后端 /calculate/scheme-c?sensitivities=true",
+        }])
+    req = validate_scheme_c(data)
+    # ?trace=true 时返回逐次迭代轨迹
+    return get_scheme_c_solver().solve(req, trace=query_flag(path, 'trace'))
+
+def compute_standard(data, path):
+    from app.core.cycles import calculate_cop
+
+    req = validate_standard(data)
+    # 估算蒸发和冷凝温度
+    t_evap = req.source_temp - 5.0
+    t_cond = req.target_temp + 5.0
+
+    # 调用算法核心
+    result = calculate_cop(
+        evap_temp=t_evap,
+        cond_temp=t_cond,
+        efficiency=req.efficiency,
+        mode=req.mode,
+        strategy=req.strategy
+    )
+    return {
+        "input_echo": {
+            "source": req.source_temp,
+            "target": req.target_temp
+        },
+        "simulation_result": result
+    }
+
+def send_json(handler, status, payload):
+    handler.send_response(status)
+    handler.send_header('Content-type', 'application/json')
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    handler.end_headers()
+    handler.wfile.write(json.dumps(payload).encode())
+
+def send_preflight(handler, methods='POST, OPTIONS'):
+    """处理 CORS 预检请求"""
+    handler.send_response(200)
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    handler.send_header('Access-Control-Allow-Methods', methods)
+    handler.send_header('Access-Control-Allow-Headers', 'Content-Type')
+    handler.end_headers()
+
+def handle_post(handler, compute):
+    """
+    读取 JSON 请求体 -> compute(data, path) -> JSON 响应
+    参数校验失败返回 400，其余异常返回 500
+    """
+    content_length = int(handler.headers.get('Content-Length', 0))
+    body = handler.rfile.read(content_length)
+
+    try:
+        data = json.loads(body.decode('utf-8'))
+        result = compute(data, handler.path)
+    except RequestValidationError as e:
+        send_json(handler, 400, {"error": "请求参数无效", "detail": e.errors})
+        return
+    except Exception as e:
+        send_json(handler, 500, {"error": str(e)})
+        return
+    send_json(handler, 200, result)
+
+def solve_batch_item(index, item) -> dict:
+    """
+    校验并求解单个批量条目 (与 app.streaming.solve_item 输出格式一致，校验用 validate_scheme_c)
+    item: NDJSON 原始行 (bytes) 或已解析的 dict
+    """
+    try:
+        if isinstance(item, (bytes, str)):
+            try:
+                item = json.loads(item)
+            except ValueError as e:
+                raise RequestValidationError([{"loc": "body", "msg": f"Invalid JSON: {e}"}])
+        req = validate_scheme_c(item)
+    except RequestValidationError as e:
+        return {"index": index, "error": "请求参数无效", "detail": e.errors}
+
+    try:
+        return {"index": index, "result": get_scheme_c_solver().solve(req)}
+    except Exception as e:
+        return {"index": index, "error": str(e)}
+
+def handle_batch_post(handler):
+    """
+    方案C 批量计算: JSON 数组或 NDJSON 输入，逐行输出 NDJSON
+    单条出错只记录在该行，不影响其余条目；请求体格式错误返回 400
+    """
+    content_length = int(handler.headers.get('Content-Length', 0))
+    body = handler.rfile.read(content_length)
+
+    try:
+        if is_ndjson(handler.headers.get('Content-Type')):
+            items, _ = split_lines(b"", body + b"\n")
+        else:
+            items = iter_json_list(body)
+    except ValueError as e:
+        send_json(handler, 400, {"error": str(e)})
+        return
+
+    handler.send_response(200)
+    handler.send_header('Content-type', NDJSON_MEDIA_TYPE)
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    handler.end_headers()
+    for index, item in enumerate(items):
+        handler.wfile.write(encode_line(solve_batch_item(index, item)))
+        handler.wfile.flush()
@@ -0,0 +1,82 @@
+# app/streaming.py
+# 批量接口的 NDJSON 流式读写 (FastAPI 与 Vercel 处理器共用)
+# 模块级只依赖标准库 (Vercel 冷启动路径)；pydantic 模型只在 solve_item 中导入
+import json
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+_NDJSON_TYPES = (NDJSON_MEDIA_TYPE, "application/jsonl", "application/ndjson")
+
+def is_ndjson(content_type) -> bool:
+    """
+    判断请求体是否为 NDJSON (每行一个 JSON 对象)
+    """
+    if not content_type:
+        return False
+    return content_type.split(";")[0].strip().lower() in _NDJSON_TYPES
+
+# 二进制列式结果 (见 app.core.columnar)
+COLUMNS_MEDIA_TYPE = "application/vnd.ies.columns"
+
+def accepts_columns(accept) -> bool:
+    """
+    Accept 头是否要求二进制列式结果 (其 q 值不低于 application/json 时选用)
+    """
+    if not accept:
+        return False
+    weights = {}
+    for part in accept.split(","):
+        media, *params = [item.strip() for item in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        weights[media.lower()] = max(q, weights.get(media.lower(), 0.0))
+    binary = weights.get(COLUMNS_MEDIA_TYPE, 0.0)
+    return binary > 0 and binary >= weights.get("application/json", 0.0)
+
+def encode_line(obj) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+def split_lines(buffer: bytes, chunk: bytes):
+    """
+    将新到达的数据块拼接到缓冲区，切出完整行
+    返回 (完整行列表, 剩余缓冲)
+    """
+    buffer += chunk
+    *lines, rest = buffer.split(b"\n")
+    return [line for line in lines if line.strip()], rest
+
+def iter_json_list(body: bytes):
+    """
+    解析 JSON 数组请求体，逐项返回 (字典)
+    """
+    items = json.loads(body)
+    if not isinstance(items, list):
+        raise ValueError("批量请求体必须是 JSON 数组或 NDJSON")
+    return items
+
+def solve_item(index, item, solver) -> dict:
+    """
+    校验并求解单个批量条目，错误只影响本条
+    item: NDJSON 原始行 (bytes/str) 或已解析的 dict
+    Vercel 处理器不加载 pydantic，使用 app.serverless.solve_batch_item
+    """
+    from pydantic import ValidationError
+
+    from app.models import SchemeCRequest
+
+    try:
+        if isinstance(item, (bytes, str)):
+            req = SchemeCRequest.model_validate_json(item)
+        else:
+            req = SchemeCRequest.model_validate(item)
+    except ValidationError as e:
+        return {"index": index, "error": "请求参数无效", "detail": json.loads(e.json(include_url=False))}
+
+    try:
+        return {"index": index, "result": solver.solve(req)}
+    except Exception as e:
+        return {"index": index, "error": str(e)}
@@ -0,0 +1,111 @@
+# app/validation.py
+# 轻量请求校验 (不依赖 pydantic)，供 Serverless 冷启动路径使用
+# 字段、默认值与转换规则与 app/models.py (pydantic 宽松模式) 保持一致
+
+REQUIRED = object()
+
+# (字段名, 类型, 默认值)
+SCHEME_C_FIELDS = (
+    ("sink_in_temp", float, REQUIRED),
+    ("sink_out_target", float, REQUIRED),
+    ("sink_flow_kg_h", float, REQUIRED),
+    ("source_in_temp", float, REQUIRED),
+    ("source_out_target", float, 30.0),
+    ("source_flow_vol", float, REQUIRED),
+    ("efficiency", float, 0.55),
+    ("mode", str, "WATER"),
+    ("strategy", str, "STRATEGY_PRE"),
+    ("fuel_type", str, "NATURAL_GAS"),
+    ("recovery_type", str, "MVR"),
+    ("is_manual_cop", bool, False),
+    ("manual_cop", float, 3.5),
+    ("excess_air", float, 1.2),
+    ("altitude", float, 0.0),
+)
+
+STANDARD_FIELDS = (
+    ("source_temp", float, REQUIRED),
+    ("target_temp", float, REQUIRED),
+    ("efficiency", float, 0.55),
+    ("mode", str, "WATER"),
+    ("strategy", str, "STRATEGY_PRE"),
+)
+
+_TRUE_STRINGS = {"1", "on", "t", "true", "y", "yes"}
+_FALSE_STRINGS = {"0", "off", "f", "false", "n", "no"}
+
+class RequestValidationError(ValueError):
+    def __init__(self, errors):
+        super().__init__("; ".join(f"{e['loc']}: {e['msg']}" for e in errors))
+        self.errors = errors
+
+class ValidatedRequest:
+    """
+    校验后的请求 (属性访问与 pydantic 模型一致)
+    """
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+    def model_dump(self) -> dict:
+        return dict(self.__dict__)
+
+def _to_float(value):
+    if isinstance(value, (bool, int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            raise ValueError("Input should be a valid number, unable to parse string as a number")
+    raise ValueError("Input should be a valid number")
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE_STRINGS:
+            return True
+        if lowered in _FALSE_STRINGS:
+            return False
+    raise ValueError("Input should be a valid boolean")
+
+def _to_str(value):
+    if isinstance(value, str):
+        return value
+    raise ValueError("Input should be a valid string")
+
+_CONVERTERS = {float: _to_float, bool: _to_bool, str: _to_str}
+
+def build_validator(fields):
+    """
+    预先生成校验函数，请求时只做逐字段转换
+    """
+    plan = tuple((name, _CONVERTERS[kind], default) for name, kind, default in fields)
+
+    def validate(data) -> ValidatedRequest:
+        if not isinstance(data, dict):
+            raise RequestValidationError([{"loc": "body", "msg": "Input should be a valid dictionary"}])
+        values = {}
+        errors = []
+        for name, convert, default in plan:
+            if name not in data:
+                if default is REQUIRED:
+                    errors.append({"loc": name, "msg": "Field required"})
+                else:
+                    values[name] = default
+                continue
+            try:
+                values[name] = convert(data[name])
+            except ValueError as e:
+                errors.append({"loc": name, "msg": str(e)})
+        if errors:
+            raise RequestValidationError(errors)
+        return ValidatedRequest(values)
+
+    return validate
+
+validate_scheme_c = build_validator(SCHEME_C_FIELDS)
+validate_standard = build_validator(STANDARD_FIELDS)
@@ -0,0 +1,336 @@
+# benchmarks/bench_core.py
+# 物理 / 循环 / 求解器核心函数基准
+#   calculate_cop、calculate_flue_heat_release、calculate_water_condensation、SchemeCSolver.solve、
+#   SurrogateSolver.solve (与同一语料上的精确求解对比)
+# 在固定的代表性语料上运行 (收敛/不收敛、热水/蒸汽、各燃料、吸收式/MVR)，
+# 输出 ops/sec、p50/p99 单次耗时与迭代次数，并可保存 / 对比 JSON 基线:
+#   python benchmarks/bench_core.py --save local            # 写入 benchmarks/baselines/local.json
+#   python benchmarks/bench_core.py --compare local         # 与基线对比，退化超过阈值时退出码为 1
+#
+# 耗时与机器相关，只应与同一台机器上保存的基线对比；迭代次数与机器无关，任何增加都视为退化
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.cycles import calculate_cop
+from app.core.physics import calculate_water_condensation
+from app.core.solver import SchemeCSolver
+from app.core.surrogate import SurrogateSolver
+from app.core.telemetry import SolverTelemetry
+from app.models import SchemeCRequest
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+
+MODES = ("WATER", "STEAM")
+STRATEGIES = ("STRATEGY_PRE", "STRATEGY_GEN")
+RECOVERY_TYPES = ("MVR", "ABSORPTION_HP")
+FUELS = ("NATURAL_GAS", "COAL", "DIESEL", "ELECTRICITY")
+
+# === 语料 (固定随机种子，保证每次运行完全相同) ===
+
+def cop_corpus(seed=0):
+    """
+    (evap, cond, efficiency, mode, strategy, recovery_type)
+    覆盖正常工况与三类物理检查分支 (蒸发过低 / 冷凝过高 / 温差过小)
+    """
+    rng = random.Random(seed)
+    cases = []
+    for mode, strategy, recovery in itertools.product(MODES, STRATEGIES, RECOVERY_TYPES):
+        for _ in range(20):
+            evap = rng.uniform(0, 80)
+            cases.append((evap, evap + rng.uniform(15, 110), rng.uniform(0.4, 0.65), mode, strategy, recovery))
+        cases.append((-35.0, 80.0, 0.55, mode, strategy, recovery))
+        cases.append((40.0, 170.0, 0.55, mode, strategy, recovery))
+        cases.append((60.0, 65.0, 0.55, mode, strategy, recovery))
+    return cases
+
+def flue_corpus(seed=1):
+    """
+    (t_in, t_out, flow_vol, fuel_type, excess_air)，排烟温度跨越露点上下
+    """
+    rng = random.Random(seed)
+    return [
+        (rng.uniform(80, 200), rng.uniform(5, 80), rng.uniform(2000, 60000), fuel, rng.uniform(1.0, 1.6))
+        for fuel in FUELS + ("OTHER",)
+        for _ in range(40)
+    ]
+
+def condensation_corpus(seed=2):
+    """
+    (flue_in, flue_out, flow_vol, h2o_percent, dew_point)，约一半低于露点
+    """
+    rng = random.Random(seed)
+    return [
+        (rng.uniform(80, 200), rng.uniform(5, 80), rng.uniform(2000, 60000), rng.uniform(8, 20), rng.uniform(40, 60))
+        for _ in range(200)
+    ]
+
+def solve_corpus(seed=3):
+    """
+    方案C 请求: 模式 x 策略 x 热泵类型 x 燃料 x 热源 (充足 / 不足)
+    返回 [(标签, 请求)]；收敛与否按实际求解结果另行标注
+    """
+    rng = random.Random(seed)
+    cases = []
+    for mode, strategy, recovery, fuel, source in itertools.product(
+        MODES, STRATEGIES, RECOVERY_TYPES, FUELS, ("ample", "scarce")
+    ):
+        for _ in range(3):
+            steam = mode == "STEAM"
+            req = SchemeCRequest(
+                sink_in_temp=rng.uniform(10, 30),
+                sink_out_target=rng.uniform(85, 110) if steam else rng.uniform(55, 80),
+                sink_flow_kg_h=rng.uniform(1500, 4000) if steam else rng.uniform(10000, 30000),
+                source_in_temp=rng.uniform(120, 180),
+                source_out_target=rng.uniform(20, 45),
+                source_flow_vol=rng.uniform(40000, 80000) if source == "ample" else rng.uniform(1000, 3000),
+                efficiency=rng.uniform(0.45, 0.6),
+                mode=mode, strategy=strategy, fuel_type=fuel, recovery_type=recovery,
+                excess_air=rng.uniform(1.05, 1.4), altitude=rng.uniform(0, 2000),
+            )
+            tags = (mode.lower(), strategy.lower(), fuel.lower(), "absorption" if recovery == "ABSORPTION_HP" else "mvr")
+            cases.append((tags, req))
+    return cases
+
+# 代理模型：交互式 what-if 查询 (热水模式，四个输入在信任域内变化)
+SURROGATE_BASE = dict(sink_in_temp=20, sink_out_target=70, sink_flow_kg_h=30000, source_in_temp=140,
+                      source_flow_vol=30000, source_out_target=30)
+SURROGATE_DOMAIN = {"sink_in_temp": (15, 25), "sink_out_target": (60, 80), "source_in_temp": (120, 160),
+                    "source_flow_vol": (20000, 40000)}
+
+def surrogate_corpus(seed=4, count=500):
+    """
+    信任域内均匀采样的请求 (含少量热源不足的点，走回退路径)
+    """
+    rng = random.Random(seed)
+    return [
+        SchemeCRequest(**{**SURROGATE_BASE, **{k: rng.uniform(lo, hi) for k, (lo, hi) in SURROGATE_DOMAIN.items()}})
+        for _ in range(count)
+    ]
+
+# === 计时 ===
+
+def _percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+def _summarize(latencies_ns, total_ns):
+    latencies = sorted(latencies_ns)
+    return {
+        "calls": len(latencies),
+        "ops_per_sec": round(len(latencies) / (total_ns / 1e9), 1),
+        "mean_us": round(statistics.fmean(latencies) / 1000, 3),
+        "p50_us": round(_percentile(latencies, 0.50) / 1000, 3),
+        "p99_us": round(_percentile(latencies, 0.99) / 1000, 3),
+    }
+
+def time_calls(fn, args_list, repeat):
+    """
+    对语料中的每组参数逐次计时，重复 repeat 轮；返回 (逐次耗时 ns, 总耗时 ns)
+    """
+    clock = time.perf_counter_ns
+    latencies = []
+    append = latencies.append
+    total_start = clock()
+    for _ in range(repeat):
+        for args in args_list:
+            t0 = clock()
+            fn(*args)
+            append(clock() - t0)
+    return latencies, clock() - total_start
+
+def bench_solve(repeat):
+    """
+    SchemeCSolver.solve：总体统计 + 按标签 (模式/策略/燃料/热泵类型/收敛与否) 分组
+    """
+    # 独立遥测实例，避免污染进程级计数
+    solver = SchemeCSolver(telemetry=SolverTelemetry())
+    cases = []
+    for tags, req in solve_corpus():
+        result = solver.solve(req)
+        outcome = "fallback" if "is_source_limited" in result else "converged"
+        cases.append((tags + (outcome,), req, result["iterations"]))
+
+    clock = time.perf_counter_ns
+    per_case = [[] for _ in cases]
+    total_start = clock()
+    for _ in range(repeat):
+        for i, (_, req, _) in enumerate(cases):
+            t0 = clock()
+            solver.solve(req)
+            per_case[i].append(clock() - t0)
+    total_ns = clock() - total_start
+
+    def iteration_stats(indices):
+        its = sorted(cases[i][2] for i in indices)
+        return {"iterations_mean": round(statistics.fmean(its), 3), "iterations_p50": _percentile(its, 0.5),
+                "iterations_max": its[-1]}
+
+    all_idx = range(len(cases))
+    summary = _summarize([t for ts in per_case for t in ts], total_ns)
+    summary.update(iteration_stats(all_idx))
+    summary["cases"] = len(cases)
+
+    groups = {}
+    for tag in sorted({t for tags, _, _ in cases for t in tags}):
+        idx = [i for i, (tags, _, _) in enumerate(cases) if tag in tags]
+        latencies = [t for i in idx for t in per_case[i]]
+        group = _summarize(latencies, sum(latencies))
+        group.update(iteration_stats(idx))
+        group["cases"] = len(idx)
+        groups[tag] = group
+    summary["groups"] = groups
+    return summary
+
+def bench_surrogate(repeat):
+    """
+    SurrogateSolver.solve (默认阶数) 与同一语料上的 SchemeCSolver.solve 对比；拟合耗时不计入
+    """
+    surrogate = SurrogateSolver(SchemeCSolver(telemetry=SolverTelemetry()))
+    surrogate.fit(SURROGATE_BASE, SURROGATE_DOMAIN)
+    exact = SchemeCSolver(telemetry=SolverTelemetry())
+    args_list = [(req,) for req in surrogate_corpus()]
+    hits = sum(surrogate.solve(req)["surrogate"]["used"] for (req,) in args_list)
+
+    summary = _summarize(*time_calls(surrogate.solve, args_list, repeat))
+    exact_summary = _summarize(*time_calls(exact.solve, args_list, repeat))
+    summary["hit_rate"] = round(hits / len(args_list), 3)
+    summary["exact_mean_us"] = exact_summary["mean_us"]
+    summary["speedup"] = round(exact_summary["mean_us"] / summary["mean_us"], 2)
+    return summary
+
+def run_all(repeat=50):
+    solver = SchemeCSolver(telemetry=SolverTelemetry())
+    results = {}
+    latencies, total = time_calls(calculate_cop, cop_corpus(), repeat * 20)
+    results["calculate_cop"] = _summarize(latencies, total)
+    latencies, total = time_calls(solver.calculate_flue_heat_release, flue_corpus(), repeat * 20)
+    results["calculate_flue_heat_release"] = _summarize(latencies, total)
+    latencies, total = time_calls(calculate_water_condensation, condensation_corpus(), repeat * 20)
+    results["calculate_water_condensation"] = _summarize(latencies, total)
+    results["solve"] = bench_solve(repeat)
+    results["surrogate_solve"] = bench_surrogate(repeat)
+    return results
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(__file__), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def collect(repeat=50):
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "benchmarks": run_all(repeat),
+    }
+
+# === 基线 ===
+
+def baseline_path(name):
+    """名称或路径 -> 基线文件路径"""
+    if name.endswith(".json") or os.sep in name:
+        return name
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+def save_baseline(report, name):
+    path = baseline_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+def compare(current, baseline, threshold=0.10):
+    """
+    对比两次结果，返回 [(名称, 指标, 基线值, 当前值, 变化比例, 是否退化)]
+    ops/sec 下降或 p50 上升超过 threshold 视为退化；迭代次数增加即视为退化
+    """
+    rows = []
+
+    def check(name, cur, base):
+        for metric, higher_is_better in (("ops_per_sec", True), ("p50_us", False)):
+            if metric not in base or metric not in cur or not base[metric]:
+                continue
+            change = (cur[metric] - base[metric]) / base[metric]
+            regressed = -change > threshold if higher_is_better else change > threshold
+            rows.append((name, metric, base[metric], cur[metric], change, regressed))
+        if "iterations_mean" in base and "iterations_mean" in cur:
+            change = (cur["iterations_mean"] - base["iterations_mean"]) / max(base["iterations_mean"], 1e-9)
+            rows.append((name, "iterations_mean", base["iterations_mean"], cur["iterations_mean"],
+                         change, cur["iterations_mean"] > base["iterations_mean"]))
+
+    for name, cur in current["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            continue
+        check(name, cur, base)
+        for tag, group in cur.get("groups", {}).items():
+            if tag in base.get("groups", {}):
+                check(f"{name}[{tag}]", group, base["groups"][tag])
+    return rows
+
+def print_report(report):
+    print(f"commit {report['meta']['commit']}  python {report['meta']['python']}  repeat {report['meta']['repeat']}")
+    print(f"{'benchmark':<32} {'ops/sec':>12} {'p50 us':>9} {'p99 us':>9} {'iters':>7}")
+    for name, r in report["benchmarks"].items():
+        rows = [(name, r)] + [(f"  [{tag}]", g) for tag, g in r.get("groups", {}).items()]
+        for label, s in rows:
+            iters = s.get("iterations_mean", "")
+            print(f"{label:<32} {s['ops_per_sec']:>12} {s['p50_us']:>9} {s['p99_us']:>9} {iters:>7}")
+    surrogate = report["benchmarks"].get("surrogate_solve")
+    if surrogate:
+        print(f"surrogate: 命中率 {surrogate['hit_rate']:.1%}  精确求解 {surrogate['exact_mean_us']} us/次  "
+              f"加速 {surrogate['speedup']}x")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="物理 / 循环 / 求解器核心基准")
+    parser.add_argument("--repeat", type=int, default=50, help="求解语料的重复轮数 (物性函数为其 20 倍)")
+    parser.add_argument("--save", metavar="NAME", help="保存为基线 (benchmarks/baselines/NAME.json 或文件路径)")
+    parser.add_argument("--compare", metavar="NAME", help="与已保存的基线对比")
+    parser.add_argument("--threshold", type=float, default=0.10, help="耗时退化阈值 (默认 10%%)")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args(argv)
+
+    report = collect(args.repeat)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+    if args.save:
+        print(f"\n基线已保存: {save_baseline(report, args.save)}")
+
+    if args.compare:
+        with open(baseline_path(args.compare), encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        regressions = [row for row in rows if row[5]]
+        print(f"\n对比基线 {args.compare} (commit {baseline['meta'].get('commit')}):")
+        for name, metric, base, cur, change, regressed in rows:
+            flag = "  <-- 退化" if regressed else ""
+            print(f"  {name:<32} {metric:<16} {base:>12} -> {cur:<12} {change:+.1%}{flag}")
+        if regressions:
+            print(f"\n{len(regressions)} 项退化超过阈值")
+            sys.exit(1)
+        print("\n无退化")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# benchmarks/cold_start.py
+# Vercel 处理器冷启动基准：每次在全新的 Python 进程中
+#   1) 加载处理器模块 (import 耗时)
+#   2) 处理第一个 POST 请求 (首响应耗时，含求解器的延迟导入)
+# 多次运行取中位数。可传入任意处理器文件路径，便于与旧版本对比:
+#   git show <commit>:api/calculate/scheme-c.py > /tmp/scheme-c-old.py
+#   python benchmarks/cold_start.py /tmp/scheme-c-old.py api/calculate/scheme-c.py
+# 加 --importtime 时额外以 python -X importtime 运行一次，列出累计耗时最高的模块
+# 加 --check 时改为逐项运行 SERVERLESS_CHECKS (查询参数 -> 预期状态码，且请求后未导入 NumPy)，不符时退出码为 1
+#
+# 注意：处理器通过 sys.path 定位 ies_backend，放在仓库外的旧版本文件需用 --backend 指定
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_HANDLERS = [
+    os.path.join(REPO_ROOT, 'api', 'calculate', 'scheme-c.py'),
+    os.path.join(REPO_ROOT, 'api', 'calculate', 'standard.py'),
+    os.path.join(REPO_ROOT, 'api', 'calculate', 'scheme-c', 'batch.py'),
+]
+
+# 各处理器的示例请求体 (按文件名匹配)
+SCHEME_C_BODY = {
+    "sink_in_temp": 50, "sink_out_target": 70, "sink_flow_kg_h": 10000,
+    "source_in_temp": 150, "source_flow_vol": 5000,
+}
+SAMPLE_BODIES = {
+    'scheme-c': SCHEME_C_BODY,
+    'standard': {"source_temp": 30, "target_temp": 70},
+    'batch': [SCHEME_C_BODY, {**SCHEME_C_BODY, "source_flow_vol": 20000}, {**SCHEME_C_BODY, "mode": "STEAM"}],
+}
+
+# Serverless 检查: (处理器文件, 请求路径, 预期状态码)
+# 根目录 requirements.txt 不含 NumPy，依赖 NumPy 的查询参数须以 400 拒绝，其余请求不得导入 NumPy
+SERVERLESS_CHECKS = [
+    (os.path.join(REPO_ROOT, 'api', 'calculate', 'scheme-c.py'), '/', 200),
+    (os.path.join(REPO_ROOT, 'api', 'calculate', 'scheme-c.py'), '/?trace=true', 200),
+    (os.path.join(REPO_ROOT, 'api', 'calculate', 'scheme-c.py'), '/?sensitivities=true', 400),
+    (os.path.join(REPO_ROOT, 'api', 'calculate', 'standard.py'), '/', 200),
+    (os.path.join(REPO_ROOT, 'api', 'calculate', 'scheme-c', 'batch.py'), '/', 200),
+]
+
+# 子进程内执行：不经过网络，直接以内存读写流驱动 do_POST
+CHILD_SCRIPT = r'''
+import time
+t0 = time.perf_counter()
+import importlib.util, io, json, sys
+path, body, backend, request_path = sys.argv[1], sys.argv[2].encode(), sys.argv[3], sys.argv[4]
+if backend:
+    sys.path.insert(0, backend)
+spec = importlib.util.spec_from_file_location("cold_start_handler", path)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+t1 = time.perf_counter()
+
+h = module.handler.__new__(module.handler)
+h.rfile, h.wfile = io.BytesIO(body), io.BytesIO()
+h.headers = {"Content-Length": str(len(body)), "Content-Type": "application/json"}
+h.path, h.command, h.request_version = request_path, "POST", "HTTP/1.1"
+h.requestline, h.client_address = "POST / HTTP/1.1", ("127.0.0.1", 0)
+h.log_message = lambda *args: None
+h.do_POST()
+t2 = time.perf_counter()
+status = int(h.wfile.getvalue().split(b" ", 2)[1])
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "first_response_ms": (t2 - t1) * 1000, "status": status,
+                  "numpy": "numpy" in sys.modules}))
+'''
+
+def _body_for(path):
+    name = os.path.basename(path)
+    for key, body in SAMPLE_BODIES.items():
+        if key in name:
+            return body
+    raise ValueError(f"无法为 {name} 选择示例请求体 (文件名需包含 {list(SAMPLE_BODIES)})")
+
+def run_once(path, body, backend="", request_path="/"):
+    """
+    启动一个新进程，返回 {import_ms, first_response_ms, process_ms, status, numpy}
+    process_ms 为从启动解释器到进程退出的总耗时
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, path, json.dumps(body), backend, request_path],
+        capture_output=True, text=True, check=True
+    )
+    sample = json.loads(proc.stdout.strip().splitlines()[-1])
+    sample["process_ms"] = (time.perf_counter() - start) * 1000
+    return sample
+
+def importtime_top(path, body, backend="", top=15):
+    """
+    python -X importtime 运行一次，返回累计耗时最高的顶层导入 [(模块, 累计 ms)]
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT, path, json.dumps(body), backend, "/"],
+        capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # 格式: "import time: <self us> | <cumulative us> | <缩进 + 模块名>"
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(cumulative_us) / 1000))
+    rows.sort(key=lambda r: r[1], reverse=True)
+    return rows[:top]
+
+def benchmark(path, runs=10, backend=""):
+    body = _body_for(path)
+    samples = [run_once(path, body, backend) for _ in range(runs)]
+    summary = {"handler": path, "runs": runs, "status": samples[-1]["status"]}
+    for key in ("import_ms", "first_response_ms", "process_ms"):
+        summary[key] = round(statistics.median(s[key] for s in samples), 1)
+    return summary
+
+def run_checks(backend=""):
+    """
+    逐项运行 SERVERLESS_CHECKS，返回 [(处理器, 请求路径, 预期状态码, 实际状态码, 是否导入 NumPy, 是否通过)]
+    """
+    rows = []
+    for path, request_path, expected in SERVERLESS_CHECKS:
+        sample = run_once(path, _body_for(path), backend, request_path)
+        passed = sample["status"] == expected and not sample["numpy"]
+        rows.append((path, request_path, expected, sample["status"], sample["numpy"], passed))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vercel 处理器冷启动基准")
+    parser.add_argument("handlers", nargs="*", default=DEFAULT_HANDLERS, help="处理器文件路径")
+    parser.add_argument("--runs", type=int, default=10, help="每个处理器的冷启动次数 (取中位数)")
+    parser.add_argument("--backend", default="", help="额外加入 sys.path 的 ies_backend 目录")
+    parser.add_argument("--importtime", action="store_true", help="额外输出 -X importtime 的主要模块")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    parser.add_argument("--check", action="store_true", help="运行 Serverless 检查 (状态码 / 未导入 NumPy)")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        rows = run_checks(args.backend)
+        for path, request_path, expected, status, numpy_loaded, passed in rows:
+            print(f"{'ok  ' if passed else 'FAIL'} {os.path.relpath(path):<32} {request_path:<24} "
+                  f"status {status} (预期 {expected})  numpy {'已导入' if numpy_loaded else '未导入'}")
+        if not all(row[5] for row in rows):
+            sys.exit(1)
+        return
+
+    results = []
+    for path in args.handlers:
+        summary = benchmark(os.path.abspath(path), args.runs, args.backend)
+        if args.importtime:
+            summary["importtime"] = importtime_top(os.path.abspath(path), _body_for(path), args.backend)
+        results.append(summary)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    print(f"{'handler':<40} {'import ms':>10} {'1st resp ms':>12} {'process ms':>11} {'status':>7}")
+    for r in results:
+        print(f"{os.path.relpath(r['handler']):<40} {r['import_ms']:>10} {r['first_response_ms']:>12} "
+              f"{r['process_ms']:>11} {r['status']:>7}")
+        for name, ms in r.get("importtime", []):
+            print(f"    {ms:>8.1f} ms  {name}")
+
+if __name__ == "__main__":
+    main()
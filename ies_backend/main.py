@@ -1,10 +1,33 @@
-from fastapi import FastAPI
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 
 # 引入我们刚才写的模块
-from app.models import StandardCalcRequest, SchemeCRequest
-from app.core.cycles import calculate_cop
-from app.core.solver import SchemeCSolver
+from app.models import StandardCalcRequest, SchemeCRequest, SchemeCSweepRequest, StandardSweepRequest, ContinuationRequest, SchemeCOptimizeRequest, UncertaintyRequest, EconomicsBatchRequest, SurrogateFitRequest, NetworkRequest, JobSubmitRequest
+from app.core.annual import AnnualSimulation, RowDecoder
+from app.core.cache import CachedSchemeCSolver, ResultCache, cop_fields
+from app.core.columnar import ColumnWriter, ResultColumns
+from app.core.continuation import continuation
+from app.core.dispatch import Overloaded, SolveDispatcher, calculate_cop_task, solve_scheme_c_task
+from app.core.economics import economics_batch
+from app.core.fuels import list_fuels
+from app.core.graph import SessionStore, scheme_c_graph
+from app.core.jobs import DEFAULT_LEASE, JobStore, JobWorker
+from app.core.metrics import METRICS_MEDIA_TYPE, MetricsMiddleware, RequestMetrics, render_metrics
+from app.core.network import solve_network
+from app.core.optimize import optimize_scheme_c
+from app.core.study import DEFAULT_CHUNK_SIZE, StudyRunner
+from app.core.surrogate import SurrogateSolver
+from app.core.sweep import sweep_scheme_c, sweep_scheme_c_grid, sweep_standard, to_jsonable
+from app.core.telemetry import SOLVER_TELEMETRY
+from app.core.uncertainty import uncertainty_scheme_c
+from app.streaming import COLUMNS_MEDIA_TYPE, NDJSON_MEDIA_TYPE, accepts_columns, encode_line, is_ndjson, iter_json_list, solve_item, split_lines
 
 app = FastAPI()
 
@@ -17,13 +40,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# === 请求指标 (/metrics) ===
+# 最外层中间件，按路由模板记录请求数与耗时 (只在事件循环线程中更新，无锁)
+REQUEST_METRICS = RequestMetrics()
+app.add_middleware(MetricsMiddleware, metrics=REQUEST_METRICS)
+
+# === 结果缓存 (环境变量配置) ===
+# IES_CACHE_SIZE: 内存条目上限；IES_CACHE_TTL: 有效期 (秒)
+# IES_CACHE_QUANTUM: 浮点字段量化步长；IES_CACHE_PATH: SQLite 持久化文件
+# IES_CACHE_DISK_SIZE: 持久化文件的条目上限 (默认 100000，超出时删除最早写入的条目)
+RESULT_CACHE = ResultCache(
+    maxsize=int(os.environ.get("IES_CACHE_SIZE", "4096")),
+    ttl=float(os.environ["IES_CACHE_TTL"]) if os.environ.get("IES_CACHE_TTL") else None,
+    quantum=float(os.environ["IES_CACHE_QUANTUM"]) if os.environ.get("IES_CACHE_QUANTUM") else None,
+    path=os.environ.get("IES_CACHE_PATH") or None,
+    disk_maxsize=int(os.environ.get("IES_CACHE_DISK_SIZE", "100000")),
+)
+
+# === 增量求解会话 (环境变量配置) ===
+# IES_SESSION_LIMIT: 保留的会话数上限 (最久未用的先淘汰)
+SESSIONS = SessionStore(maxsize=int(os.environ.get("IES_SESSION_LIMIT", "256")))
+
+# === 代理模型 (环境变量配置) ===
+# IES_SURROGATE_PATH: 代理模型文件 (启动时存在则加载，/surrogate/fit 拟合后写回)
+SURROGATE_PATH = os.environ.get("IES_SURROGATE_PATH") or None
+SURROGATE = SurrogateSolver()
+if SURROGATE_PATH and os.path.exists(SURROGATE_PATH):
+    SURROGATE.load(SURROGATE_PATH)
+
+# === 单次计算的进程池调度 (环境变量配置) ===
+# IES_SOLVE_WORKERS: 进程数，默认 CPU 核数 (进程池首次请求时创建)
+# IES_SOLVE_QUEUE: 在途求解数上限 (含排队)，超出返回 429 + Retry-After，默认进程数 x 8
+DISPATCHER = SolveDispatcher(
+    workers=int(os.environ.get("IES_SOLVE_WORKERS", "0")) or os.cpu_count() or 1,
+    max_pending=int(os.environ.get("IES_SOLVE_QUEUE", "0")) or None,
+)
+SCHEME_C_SOLVER = CachedSchemeCSolver(RESULT_CACHE)
+SCHEME_C_CONFIG = (SCHEME_C_SOLVER.solver.tolerance, SCHEME_C_SOLVER.solver.max_iter, SCHEME_C_SOLVER.solver.method)
+
+async def dispatch(key, func, *args):
+    """
+    交给进程池求解；键相同的在途请求共享结果，队列已满时返回 429
+    """
+    try:
+        return await DISPATCHER.submit(key, func, *args)
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
 @app.get("/")
 def read_root():
     return {"status": "System Online", "version": "v9.1-Python"}
 
 # === 新增：标准计算接口 ===
 @app.post("/calculate/standard")
-def run_standard_simulation(data: StandardCalcRequest):
+async def run_standard_simulation(data: StandardCalcRequest):
     """
     接收前端参数，计算 COP
     """
@@ -31,14 +101,19 @@ def run_standard_simulation(data: StandardCalcRequest):
     t_evap = data.source_temp - 5.0
     t_cond = data.target_temp + 5.0
     
-    # 2. 调用算法核心
-    result = calculate_cop(
+    # 2. 调用算法核心 (带缓存，未命中时交给进程池)
+    fields = cop_fields(
         evap_temp=t_evap,
         cond_temp=t_cond,
         efficiency=data.efficiency,
         mode=data.mode,
         strategy=data.strategy
     )
+    key = RESULT_CACHE.make_key("cop", fields)
+    result = RESULT_CACHE.get(key)
+    if result is None:
+        result = await dispatch(key, calculate_cop_task, fields)
+        RESULT_CACHE.put(key, result)
     
     # 3. 返回结果给前端
     return {
@@ -52,11 +127,518 @@ def run_standard_simulation(data: StandardCalcRequest):
 # === 新增：方案C 接口 ===
 # 👇 这里必须顶格写，不能有空格！
 @app.post("/calculate/scheme-c")
-def run_scheme_c(data: SchemeCRequest):
-    solver = SchemeCSolver()
-    result = solver.solve(data)
+async def run_scheme_c(data: SchemeCRequest, trace: bool = False, sensitivities: bool = False,
+                       surrogate: bool = False, accuracy: Optional[float] = None):
+    # trace=true 时返回逐次迭代轨迹与单次求解统计 (不走缓存，不合并)
+    # sensitivities=true 时附带结果对各数值输入的偏导数
+    # surrogate=true 时优先用代理模型作答 (排烟温度误差界 <= accuracy °C)，信任域外回退精确求解
+    if surrogate and not (trace or sensitivities):
+        return await run_in_threadpool(SURROGATE.solve, data, accuracy=accuracy)
+    rate = SOLVER_TELEMETRY.trace_sample_rate
+    if trace:
+        return await dispatch(None, solve_scheme_c_task, data, SCHEME_C_CONFIG, rate, True, sensitivities)
+    key = SCHEME_C_SOLVER.key(data, sensitivities)
+    result = RESULT_CACHE.get(key)
+    if result is None:
+        result = await dispatch(key, solve_scheme_c_task, data, SCHEME_C_CONFIG, rate, False, sensitivities)
+        RESULT_CACHE.put(key, result)
     return result
 
+# === 新增：方案C 增量求解会话 (依赖图，只重算受变化字段影响的节点) ===
+@app.post("/calculate/scheme-c/session/{session_id}")
+def run_scheme_c_session(session_id: str, data: SchemeCRequest, values: Optional[str] = None):
+    """
+    在会话中求解：与上一次相比只重算受变化字段影响的中间节点
+    返回 result (与 /calculate/scheme-c 相同)、changed (变化的字段)、recomputed / reused (重算 / 复用的节点)
+    values: 逗号分隔的中间节点名，返回其取值 (如 q_sink_target_kw,actual_dew_point)
+    """
+    names = [name.strip() for name in values.split(",") if name.strip()] if values else []
+    try:
+        return SESSIONS.get(session_id).solve(data, values=names)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/calculate/scheme-c/session/{session_id}")
+def read_scheme_c_session(session_id: str):
+    """
+    会话的当前输入与已缓存的节点
+    """
+    session = SESSIONS.find(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"会话不存在: {session_id}")
+    return session.nodes()
+
+@app.delete("/calculate/scheme-c/session/{session_id}")
+def delete_scheme_c_session(session_id: str):
+    return {"deleted": SESSIONS.discard(session_id)}
+
+@app.get("/calculate/scheme-c/graph")
+def read_scheme_c_graph():
+    """
+    方案C 依赖图：各节点及其依赖的字段 / 节点
+    """
+    return scheme_c_graph(SESSIONS.solver).describe()
+
+# === 新增：燃料注册表 ===
+@app.get("/fuels")
+def read_fuels():
+    """
+    已注册的燃料 (内置 + register_fuel 注册的自定义燃料)，id 可直接用作批量求解的 fuel_type 列
+    """
+    return list_fuels()
+
+# === 新增：求解器遥测 ===
+@app.get("/telemetry/solver")
+def read_solver_telemetry():
+    """
+    本进程的求解计数 (迭代次数、收敛/回退、耗时) 与抽样轨迹
+    抽样比例由环境变量 IES_TRACE_SAMPLE_RATE 设置
+    """
+    return SOLVER_TELEMETRY.snapshot()
+
+@app.get("/telemetry/executor")
+def read_executor_stats():
+    """
+    单次计算进程池的队列状态与合并 / 拒绝计数
+    """
+    return DISPATCHER.stats()
+
+# === 新增：Prometheus 指标 ===
+@app.get("/metrics")
+async def read_metrics():
+    """
+    Prometheus 文本格式指标：按路由的请求数与延迟直方图、求解器迭代次数 / 收敛 / 回退 / 热源限制、
+    结果缓存、进程池与代理模型计数、进程内存
+    在事件循环中生成 (与中间件的更新不并发)；进程池子进程的求解计入本进程的求解器指标
+    """
+    text = render_metrics(
+        REQUEST_METRICS,
+        SOLVER_TELEMETRY.snapshot(traces=False),
+        cache=RESULT_CACHE.stats(),
+        executor=DISPATCHER.stats(),
+        surrogate={"hits": SURROGATE.hits, "fallbacks": SURROGATE.fallbacks, "outside": SURROGATE.outside},
+    )
+    return Response(text, media_type=METRICS_MEDIA_TYPE)
+
+# === 新增：方案C 批量接口 (NDJSON 流式返回) ===
+BATCH_CHUNK_SIZE = 64  # JSON 数组输入时每次送入线程池的条目数
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    边读请求体边输出的流式响应
+    StreamingResponse 在 ASGI spec < 2.4 (uvicorn 为 2.3) 时会并发监听断开事件，
+    与 request.stream() 争抢 receive 消息导致死锁；这里只发送数据，
+    客户端断开时由 send / request.stream() 抛出异常结束生成器
+    """
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+@app.post("/calculate/scheme-c/batch")
+async def run_scheme_c_batch(request: Request):
+    """
+    请求体: JSON 数组，或 NDJSON (Content-Type: application/x-ndjson，每行一个 SchemeCRequest)
+    响应: NDJSON，每行 {"index": i, "result": {...}} 或 {"index": i, "error": "..."}
+    NDJSON 输入按网络数据块边读边算，服务端内存与批量大小无关
+    Accept: application/vnd.ies.columns 时整批求解后以二进制列式格式返回 (见 app.core.columnar)；
+    按块编码到 ColumnWriter 的临时文件，再流式返回，内存只保留当前块
+    """
+    solver = CachedSchemeCSolver(RESULT_CACHE)
+
+    if accepts_columns(request.headers.get("accept")):
+        writer = ColumnWriter()
+
+        def encode_chunk(start, items):
+            writer.append_records([solve_item(start + k, item, solver) for k, item in enumerate(items)])
+
+        try:
+            if is_ndjson(request.headers.get("content-type")):
+                buffer = b""
+                async for chunk in request.stream():
+                    lines, buffer = split_lines(buffer, chunk)
+                    if lines:
+                        await run_in_threadpool(encode_chunk, writer.rows, lines)
+                if buffer.strip():
+                    await run_in_threadpool(encode_chunk, writer.rows, [buffer])
+            else:
+                try:
+                    items = iter_json_list(await request.body())
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                for start in range(0, len(items), BATCH_CHUNK_SIZE):
+                    await run_in_threadpool(encode_chunk, start, items[start:start + BATCH_CHUNK_SIZE])
+        except BaseException:
+            writer.discard()
+            raise
+        return StreamingResponse(iterate_in_threadpool(writer.iter_bytes()), media_type=COLUMNS_MEDIA_TYPE)
+
+    def solve_chunk(start, items):
+        return b"".join(encode_line(solve_item(start + k, item, solver)) for k, item in enumerate(items))
+
+    if is_ndjson(request.headers.get("content-type")):
+        async def stream():
+            index = 0
+            buffer = b""
+            async for chunk in request.stream():
+                lines, buffer = split_lines(buffer, chunk)
+                if lines:
+                    yield await run_in_threadpool(solve_chunk, index, lines)
+                    index += len(lines)
+            if buffer.strip():
+                yield await run_in_threadpool(solve_chunk, index, [buffer])
+    else:
+        try:
+            items = iter_json_list(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        async def stream():
+            for start in range(0, len(items), BATCH_CHUNK_SIZE):
+                yield await run_in_threadpool(solve_chunk, start, items[start:start + BATCH_CHUNK_SIZE])
+
+    return DuplexStreamingResponse(stream(), media_type=NDJSON_MEDIA_TYPE)
+
+# === 新增：大规模研究 (多进程，NDJSON 流式返回) ===
+# IES_STUDY_WORKERS: 进程池大小，默认 CPU 核数；进程池首次请求时创建，各请求共享
+STUDY_WORKERS = int(os.environ.get("IES_STUDY_WORKERS", "0")) or os.cpu_count() or 1
+_STUDY_POOL = None
+
+def get_study_pool():
+    global _STUDY_POOL
+    if _STUDY_POOL is None:
+        _STUDY_POOL = ProcessPoolExecutor(max_workers=STUDY_WORKERS)
+    return _STUDY_POOL
+
+@app.post("/calculate/scheme-c/study")
+async def run_scheme_c_study(request: Request, ordered: bool = True, vectorized: bool = False,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE, progress: bool = False):
+    """
+    请求体: JSON 数组，或 NDJSON (每行一个 SchemeCRequest)
+    响应: NDJSON，每行 {"index": i, "result": {...}} 或 {"index": i, "error": "..."}
+    ordered=false 按完成顺序输出；vectorized=true 每块使用批量求解器；
+    progress=true 时每块后追加一行 {"progress": {...}}；客户端断开即取消剩余块
+    """
+    body = await request.body()
+    if is_ndjson(request.headers.get("content-type")):
+        # 原始行直接交给子进程解析
+        items = [line for line in body.split(b"\n") if line.strip()]
+    else:
+        try:
+            items = iter_json_list(body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    runner = StudyRunner(
+        workers=STUDY_WORKERS, chunk_size=chunk_size, ordered=ordered,
+        vectorized=vectorized, executor=get_study_pool(),
+    )
+
+    async def stream():
+        chunks = runner.run(items, encode=True)
+        try:
+            async for output in iterate_in_threadpool(chunks):
+                yield output
+                if progress:
+                    yield encode_line({"progress": runner.progress()})
+        finally:
+            runner.cancel()
+            chunks.close()
+
+    return DuplexStreamingResponse(stream(), media_type=NDJSON_MEDIA_TYPE)
+
+# === 新增：后台任务 (SQLite 任务队列，分块检查点，崩溃后续算) ===
+# IES_JOB_PATH: 任务库文件 (默认 ies_jobs.sqlite)；IES_JOB_LEASE: 租约秒数 (执行进程超时没有心跳的任务被重新认领)
+# IES_JOB_WORKER=0 时本进程不执行任务 (由 python run_jobs.py 单独执行)
+JOB_PATH = os.environ.get("IES_JOB_PATH") or "ies_jobs.sqlite"
+JOB_LEASE = float(os.environ.get("IES_JOB_LEASE", str(DEFAULT_LEASE)))
+JOB_RESULTS_PAGE = 1000  # 列式结果按页编码的条数
+_JOB_STORE = None
+_JOB_WORKER = None
+
+def get_job_store():
+    global _JOB_STORE, _JOB_WORKER
+    if _JOB_STORE is None:
+        _JOB_STORE = JobStore(JOB_PATH)
+        if os.environ.get("IES_JOB_WORKER", "1") != "0":
+            _JOB_WORKER = JobWorker(_JOB_STORE, workers=STUDY_WORKERS, executor=get_study_pool(), lease=JOB_LEASE)
+            _JOB_WORKER.start()
+    return _JOB_STORE
+
+def read_job_or_404(job_id):
+    job = get_job_store().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在: {job_id}")
+    return job
+
+@app.post("/jobs", status_code=202)
+def submit_job(data: JobSubmitRequest):
+    """
+    提交后台任务，立即返回任务状态 (含 id)；用 GET /jobs/{id} 查询进度，GET /jobs/{id}/results 取结果
+    """
+    if data.kind == "study":
+        params = {"chunk_size": data.chunk_size, "vectorized": data.vectorized}
+    else:
+        params = {"chunk_size": data.chunk_size, "base": data.base,
+                  "warm_start": data.warm_start, "step_hours": data.step_hours}
+    try:
+        job = get_job_store().submit(data.kind, data.items, params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if _JOB_WORKER is not None:
+        _JOB_WORKER.wake()
+    return job
+
+@app.get("/jobs")
+def list_jobs(status: Optional[str] = None, limit: int = 50):
+    return get_job_store().list(status=status, limit=limit)
+
+@app.get("/jobs/{job_id}")
+def read_job(job_id: str):
+    return read_job_or_404(job_id)
+
+@app.get("/jobs/{job_id}/results")
+def read_job_results(job_id: str, request: Request, offset: int = 0, limit: int = 1000, stream: bool = False):
+    """
+    已提交的结果 (运行中也可读取已完成的部分)
+    分页: {"job", "offset", "records", "next_offset"}；stream=true 时从 offset 起以 NDJSON 流式返回全部结果
+    Accept: application/vnd.ies.columns 时 (仅 study 任务) 以二进制列式格式返回 offset 起的全部结果
+    (按页编码到 ColumnWriter 的临时文件，再流式返回，内存只保留当前页)
+    """
+    job = read_job_or_404(job_id)
+    store = get_job_store()
+    if accepts_columns(request.headers.get("accept")):
+        if job["kind"] != "study":
+            raise HTTPException(status_code=400, detail="二进制列式格式仅支持 study 任务")
+        writer = ColumnWriter()
+        try:
+            page = []
+            for line in store.iter_results(job_id, offset, page=JOB_RESULTS_PAGE):
+                page.append(json.loads(line))
+                if len(page) == JOB_RESULTS_PAGE:
+                    writer.append_records(page)
+                    page = []
+            writer.append_records(page)
+        except BaseException:
+            writer.discard()
+            raise
+        return StreamingResponse(iterate_in_threadpool(writer.iter_bytes()), media_type=COLUMNS_MEDIA_TYPE)
+    if stream:
+        return StreamingResponse(
+            iterate_in_threadpool(store.iter_results(job_id, offset)), media_type=NDJSON_MEDIA_TYPE
+        )
+    records = store.results(job_id, offset, limit)
+    return {
+        "job": job,
+        "offset": offset,
+        "records": records,
+        "next_offset": offset + len(records) if offset + len(records) < job["completed"] else None,
+    }
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    """
+    取消任务：排队中的直接取消，运行中的在下一个检查点停止 (已完成的结果保留)
+    """
+    read_job_or_404(job_id)
+    return get_job_store().cancel(job_id)
+
+# === 新增：全年逐时运行模拟 (时序流式输入，NDJSON 流式输出) ===
+@app.post("/calculate/scheme-c/annual")
+async def run_scheme_c_annual(request: Request, base: str = "{}", warm_start: bool = True,
+                              step_hours: float = 1.0, summary_every: int = 0):
+    """
+    请求体: 逐时时序 (Content-Type: text/csv 带表头，或 NDJSON 每行一个对象)，
+            列为 SchemeCRequest 字段 (source_in_temp、source_flow_vol、sink_flow_kg_h、sink_in_temp 等)，可含 timestamp
+    base: URL 编码的 JSON 对象，各时刻共用的字段 (时序中的同名字段优先)
+    响应: NDJSON，每行一个时刻 {"hour", "result", "delivered_kw", "condensed_water_kg_h", ...}，
+          summary_every > 0 时每 N 小时追加一行 {"summary": {...}}，最后一行为全年汇总
+    """
+    try:
+        base_fields = json.loads(base)
+        if not isinstance(base_fields, dict):
+            raise ValueError("base 必须是 JSON 对象")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"base 参数无效: {e}")
+    content_type = (request.headers.get("content-type") or "").split(";")[0].strip().lower()
+    decoder = RowDecoder("csv" if content_type == "text/csv" else "ndjson")
+    simulation = AnnualSimulation(base_fields, warm_start=warm_start, step_hours=step_hours)
+
+    def simulate(lines):
+        out = []
+        for line in lines:
+            try:
+                row = decoder.decode(line)
+            except ValueError as e:
+                record = simulation.reject(f"时序行解析失败: {e}")
+            else:
+                if row is None:
+                    continue
+                record = simulation.step(simulation.aggregates.hours, row)
+            out.append(encode_line(record))
+            if summary_every > 0 and simulation.aggregates.hours % summary_every == 0:
+                out.append(encode_line({"summary": simulation.summary()}))
+        return b"".join(out)
+
+    async def stream():
+        buffer = b""
+        async for chunk in request.stream():
+            lines, buffer = split_lines(buffer, chunk)
+            if lines:
+                yield await run_in_threadpool(simulate, lines)
+        if buffer.strip():
+            yield await run_in_threadpool(simulate, [buffer])
+        yield encode_line({"summary": simulation.summary()})
+
+    return DuplexStreamingResponse(stream(), media_type=NDJSON_MEDIA_TYPE)
+
+# === 新增：缓存统计 ===
+@app.get("/cache/stats")
+def read_cache_stats():
+    return RESULT_CACHE.stats()
+
+@app.delete("/cache")
+def clear_cache():
+    RESULT_CACHE.clear()
+    return RESULT_CACHE.stats()
+
+# === 新增：参数扫描接口 (列式返回) ===
+def _sweep_axes(axes):
+    return {name: axis.model_dump(exclude_none=True) for name, axis in axes.items()}
+
+@app.post("/calculate/sweep/scheme-c")
+def run_scheme_c_sweep(data: SchemeCSweepRequest, request: Request):
+    """
+    基准 SchemeCRequest + 扫描轴，返回全网格结果
+    columns 中每列按行优先 (C 顺序) 展平，形状见 shape
+    Accept: application/vnd.ies.columns 时以二进制列式格式返回全部结果列 (网格形状与各轴取值在 meta 中)
+    """
+    try:
+        if accepts_columns(request.headers.get("accept")):
+            grid_axes, shape, result = sweep_scheme_c_grid(data.base.model_dump(), _sweep_axes(data.axes))
+            meta = {"shape": list(shape), "axes": {name: to_jsonable(values) for name, values in grid_axes.items()}}
+            return Response(ResultColumns.from_batch(result, meta).to_bytes(), media_type=COLUMNS_MEDIA_TYPE)
+        return sweep_scheme_c(data.base.model_dump(), _sweep_axes(data.axes), data.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/calculate/sweep/standard")
+def run_standard_sweep(data: StandardSweepRequest):
+    """
+    基准 StandardCalcRequest + 扫描轴，返回 COP / 温升 / 错误码网格
+    """
+    try:
+        return sweep_standard(data.base.model_dump(), _sweep_axes(data.axes))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# === 新增：连续求解 (沿参数路径热启动) ===
+@app.post("/calculate/scheme-c/continuation")
+def run_scheme_c_continuation(data: ContinuationRequest):
+    """
+    沿 parameter 的取值路径依次求解，每步以前一步的解为初始猜测
+    summary 中给出总迭代次数；compare=true 时同时给出冷启动迭代次数与节省量
+    """
+    try:
+        return continuation(
+            data.base.model_dump(), data.parameter, data.axis.model_dump(exclude_none=True),
+            predictor=data.predictor, compare=data.compare
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# === 新增：设计优化 (多目标 Pareto 前沿) ===
+@app.post("/calculate/scheme-c/optimize")
+def run_scheme_c_optimize(data: SchemeCOptimizeRequest):
+    """
+    在 variables 给定的范围 / 取值内搜索设计参数，返回 objectives 的 Pareto 前沿
+    前沿各点附带指标 (metrics) 与 SchemeCSolver 复核结果 (result)；best 为各目标单独的最优点
+    """
+    try:
+        return optimize_scheme_c(
+            data.base.model_dump(),
+            {name: spec.model_dump(exclude_none=True) for name, spec in data.variables.items()},
+            objectives=data.objectives,
+            constraints=[item.model_dump(exclude_none=True) for item in data.constraints],
+            prices=data.prices.model_dump(),
+            starts=data.starts, max_evaluations=data.max_evaluations, seed=data.seed,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# === 新增：不确定性分析 (Monte Carlo) ===
+@app.post("/calculate/scheme-c/uncertainty")
+def run_scheme_c_uncertainty(data: UncertaintyRequest):
+    """
+    按 distributions 抽样，批量求解后返回各指标的分位数 (含 95% 置信区间) 与直方图
+    early_stop=true 时分位数估计收敛即停止 (samples 为上限)
+    """
+    try:
+        return uncertainty_scheme_c(
+            data.base.model_dump(),
+            {name: spec.model_dump(exclude_none=True) for name, spec in data.distributions.items()},
+            metrics=data.metrics, quantiles=data.quantiles, samples=data.samples,
+            batch_size=data.batch_size, seed=data.seed, early_stop=data.early_stop,
+            rtol=data.rtol, min_samples=data.min_samples, bins=data.bins,
+            prices=data.prices.model_dump(),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# === 新增：系统经济性批量评估 ===
+@app.post("/calculate/economics/batch")
+def run_economics_batch(data: EconomicsBatchRequest):
+    """
+    方案 A/B/C 经济性 (基准燃料费、年收益、回收期、CO2 减排、推荐等级) 批量评估，列式返回
+    scenarios 为逐个情景的覆盖字段，axes 为扫描轴 (如电价 x 燃料价 x 拓扑)
+    """
+    try:
+        return economics_batch(
+            data.base.model_dump(), scenarios=data.scenarios,
+            axes={name: axis.model_dump(exclude_none=True) for name, axis in data.axes.items()},
+            fields=data.fields,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# === 新增：多机组厂站网络 ===
+@app.post("/calculate/network")
+def run_network(data: NetworkRequest):
+    """
+    多台锅炉共用烟道、多台热泵串联 / 并联的厂站整体求解 (各站点流股温度一并牛顿迭代)
+    """
+    try:
+        return solve_network(
+            [site.model_dump(exclude_none=True) for site in data.sites],
+            tolerance=data.tolerance, max_iter=data.max_iter,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# === 新增：代理模型 ===
+@app.post("/surrogate/fit")
+def fit_surrogate(data: SurrogateFitRequest):
+    """
+    在 domain 范围内为 base 的配置 (燃料 / 模式 / 策略 / 热泵类型) 拟合代理模型，返回验证误差
+    设置了 IES_SURROGATE_PATH 时写回文件
+    """
+    try:
+        model = SURROGATE.fit(
+            data.base.model_dump(),
+            {name: spec.model_dump() for name, spec in data.domain.items()},
+            degree=data.degree, samples=data.samples, validation=data.validation, seed=data.seed,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if SURROGATE_PATH:
+        SURROGATE.save(SURROGATE_PATH)
+    return model.summary()
+
+@app.get("/surrogate")
+def read_surrogate():
+    """
+    已加载的代理模型 (配置、信任域、验证误差) 与本进程的命中 / 回退计数
+    """
+    return SURROGATE.summary()
+
 # === 启动服务器 ===
 if __name__ == "__main__":
     import uvicorn
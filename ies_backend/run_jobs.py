@@ -0,0 +1,34 @@
+# run_jobs.py
+# 命令行执行后台任务队列 (与 Web 进程共用同一个 SQLite 任务库)
+#   python run_jobs.py ies_jobs.sqlite --workers 8
+#   python run_jobs.py ies_jobs.sqlite --once     # 执行完当前排队的任务后退出
+# Web 进程设置 IES_JOB_WORKER=0 时由本脚本负责执行；进程被杀后重启即从检查点续算
+import argparse
+import sys
+
+from app.core.jobs import DEFAULT_LEASE, JobStore, JobWorker
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="方案C 后台任务执行进程")
+    parser.add_argument("path", nargs="?", default="ies_jobs.sqlite", help="任务库文件，默认 ies_jobs.sqlite")
+    parser.add_argument("--workers", type=int, default=None, help="study 任务的进程数，默认 CPU 核数")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE, help="租约秒数 (执行进程超时没有心跳的任务被重新认领)")
+    parser.add_argument("--poll", type=float, default=1.0, help="没有任务时的轮询间隔 (秒)")
+    parser.add_argument("--once", action="store_true", help="没有可认领的任务时退出")
+    args = parser.parse_args(argv)
+
+    store = JobStore(args.path)
+    worker = JobWorker(store, workers=args.workers, lease=args.lease, poll=args.poll)
+    try:
+        if args.once:
+            while worker.run_once():
+                pass
+        else:
+            worker.run_forever()
+    except KeyboardInterrupt:
+        sys.stderr.write("\n已停止 (运行中的任务在租约过期后由其他执行进程续算)\n")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# run_study.py
+# 命令行运行大规模方案C 研究 (多进程)
+#   python run_study.py cases.ndjson -o results.ndjson --workers 8
+#   cat cases.json | python run_study.py - --unordered --vectorized
+#   python run_study.py cases.ndjson -o results.iesc --format columns   # 二进制列式文件 (见 app.core.columnar)
+# 输入: NDJSON (每行一个 SchemeCRequest) 或 JSON 数组；输出 NDJSON (与 /calculate/scheme-c/batch 相同)
+# 进度输出到 stderr；Ctrl+C 取消，已完成的结果保留在输出中
+import argparse
+import json
+import sys
+
+from app.core.study import DEFAULT_CHUNK_SIZE, StudyRunner
+
+FORMATS = ("ndjson", "columns")
+
+def read_items(stream):
+    """
+    NDJSON 按行惰性读取 (原始行交给子进程解析)；首个非空字符为 '[' 时按 JSON 数组整体读取
+    """
+    first = stream.readline()
+    while first and not first.strip():
+        first = stream.readline()
+    if first.lstrip().startswith(b"["):
+        yield from json.loads(first + stream.read())
+        return
+    if first.strip():
+        yield first
+    for line in stream:
+        if line.strip():
+            yield line
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="方案C 多进程批量研究")
+    parser.add_argument("input", help="输入文件 (NDJSON 或 JSON 数组)，'-' 表示标准输入")
+    parser.add_argument("-o", "--output", default="-", help="输出 NDJSON 文件，默认标准输出")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="每块条目数")
+    parser.add_argument("--unordered", action="store_true", help="按完成顺序输出 (吞吐更高)")
+    parser.add_argument("--vectorized", action="store_true", help="每块使用 NumPy 批量求解器")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson",
+                        help="输出格式: ndjson，或 columns (二进制列式文件，可内存映射读取，须指定 -o)")
+    parser.add_argument("--quiet", action="store_true", help="不输出进度")
+    args = parser.parse_args(argv)
+    if args.format == "columns" and args.output == "-":
+        parser.error("--format columns 需要用 -o 指定输出文件")
+
+    runner = StudyRunner(
+        workers=args.workers, chunk_size=args.chunk_size,
+        ordered=not args.unordered, vectorized=args.vectorized,
+    )
+
+    def report(progress):
+        if not args.quiet:
+            sys.stderr.write(
+                f"\r已完成 {progress['completed']} 条 / 已分发 {progress['submitted']} 条 "
+                f"({progress['cases_per_sec']:.0f} 条/秒)"
+            )
+            sys.stderr.flush()
+
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    if args.format == "columns":
+        # 按块追加到列式文件，内存只保留当前块
+        from app.core.columnar import ColumnWriter
+        sink = ColumnWriter(args.output)
+        outputs = runner.run(read_items(source), encode=False, on_progress=report)
+        write = sink.append_records
+    else:
+        sink = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+        outputs = runner.run(read_items(source), encode=True, on_progress=report)
+        write = sink.write
+    try:
+        for output in outputs:
+            write(output)
+    except KeyboardInterrupt:
+        runner.cancel()
+        sys.stderr.write("\n已取消\n")
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if args.format == "columns":
+            sink.close()
+        else:
+            sink.flush()
+            if sink is not sys.stdout.buffer:
+                sink.close()
+
+    if not args.quiet and not runner.cancelled:
+        progress = runner.progress()
+        sys.stderr.write(f"\n完成: {progress['completed']} 条，用时 {progress['elapsed_s']} 秒\n")
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,10 @@ print("=== 开始物理引擎验算 ===")
 # 测试 1: 压力转温度
 # 假设前端输入 0.5 MPa，我们看看 Python 算出来是多少
 p_input = 0.5
-t_result = get_sat_temp_from_pressure(p_input)
+t_result = get_sat_temp_from_pressure(p_input, gauge=False)
 print(f"输入压力: {p_input} MPa")
 print(f"Python计算饱和温度: {t_result} °C")
-# 您的 JS 逻辑在这个压力下应该接近 151.8°C 左右 (对于水/Antoine公式)
+# IF97: 0.5 MPa (绝对压力) 饱和温度 151.8°C；表压用 gauge=True
 
 # 测试 2: 焓值计算
 t_input = 90.0
@@ -18,4 +18,11 @@ print(f"\n输入温度: {t_input} °C (热水)")
 print(f"Python计算焓值: {h_water} kJ/kg")
 # 预期: 90 * 4.187 = 376.83
 
+# 测试 3: IF97 蒸汽物性 (参考公式 vs 官方验证值，插值表 vs 参考公式)
+from app.core import steam
+print(f"\n180 °C 饱和蒸汽焓: {estimate_enthalpy(180.0, is_steam=True):.2f} kJ/kg")  # 预期约 2777.2
+print(f"IF97 验证值最大相对偏差: {steam.verify()['max_rel_error']:.2e}")
+for name, err in steam.error_report().items():
+    print(f"{name}: 最大绝对误差 {err['max_abs_error']:.2e}")
+
 print("\n=== 验算结束 ===")
\ No newline at end of file